@@ -3,16 +3,29 @@
 # This program is licensed under the Apache License version 2.
 # See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
 
+import json
+import struct
 import numpy as np
 import matplotlib.pyplot as plt
-from typing import Tuple, Dict, List, Any, Optional, Union
+from typing import Tuple, Dict, List, Any, Optional, Union, Iterator, TextIO
 
 from doctr.utils.geometry import resolve_enclosing_bbox, resolve_enclosing_rbbox
 from doctr.utils.visualization import visualize_page
 from doctr.utils.common_types import BoundingBox, RotatedBbox
 from doctr.utils.repr import NestedObject
 
-__all__ = ['Element', 'Word', 'Artefact', 'Line', 'Block', 'Page', 'Document']
+__all__ = ['Element', 'Word', 'Artefact', 'Line', 'Block', 'Page', 'Document', 'ColumnarDocument']
+
+
+def _to_builtin(obj: Any) -> Any:
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+_json_encoder = json.JSONEncoder(default=_to_builtin)
 
 
 class Element(NestedObject):
@@ -35,6 +48,39 @@ class Element(NestedObject):
 
         return export_dict
 
+    def _iter_json(self) -> Iterator[str]:
+        """Yields the JSON encoding of `self.export()` chunk by chunk"""
+
+        yield "{"
+        sep = ""
+        for k in self._exported_keys:
+            yield f"{sep}{_json_encoder.encode(k)}: {_json_encoder.encode(getattr(self, k))}"
+            sep = ", "
+        for children_name in self._children_names:
+            yield f"{sep}{_json_encoder.encode(children_name)}: ["
+            for idx, child in enumerate(getattr(self, children_name)):
+                if idx > 0:
+                    yield ", "
+                yield from child._iter_json()
+            yield "]"
+            sep = ", "
+        yield "}"
+
+    def to_json(self, fp: Optional[TextIO] = None) -> Optional[str]:
+        """Serializes the object in JSON, without building the nested dict of `export`
+
+        Args:
+            fp: text stream to write the JSON into. If not specified, the JSON string is returned
+
+        Returns:
+            the JSON string, if no stream was specified
+        """
+
+        if fp is None:
+            return "".join(self._iter_json())
+        fp.writelines(self._iter_json())
+        return None
+
     def render(self) -> str:
         raise NotImplementedError
 
@@ -234,3 +280,389 @@ class Document(Element):
         """
         for img, result in zip(pages, self.pages):
             result.show(img, **kwargs)
+
+    def to_bytes(self) -> bytes:
+        """Serializes the document in a compact binary format, with the geometry stored as raw float32 buffers.
+        Line and block geometries are not stored, and resolved again as the smallest box enclosing their words.
+
+        Returns:
+            the serialized document
+        """
+        return ColumnarDocument.from_document(self).to_bytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'ColumnarDocument':
+        """Loads a document serialized with `Document.to_bytes`
+
+        Example::
+            >>> from doctr.documents import Document
+            >>> with open("path/to/your/doc.bin", "rb") as f:
+            ...     doc = Document.from_bytes(f.read())
+
+        Args:
+            data: the serialized document
+
+        Returns:
+            the document, stored as a `ColumnarDocument`
+        """
+        return ColumnarDocument.from_bytes(data)
+
+
+class _WordView(Word):
+    """Lazy view over a word of a columnar document"""
+
+    _children_names: List[str] = []
+
+    def __init__(self, doc: 'ColumnarDocument', idx: int) -> None:
+        self._doc = doc
+        self._idx = idx
+
+    @property
+    def value(self) -> str:
+        start, end = self._doc._value_offsets[self._idx: self._idx + 2]
+        return self._doc._text[start: end].decode('utf-8')
+
+    @value.setter
+    def value(self, value: str) -> None:
+        encoded = value.encode('utf-8')
+        start, end = self._doc._value_offsets[self._idx: self._idx + 2]
+        self._doc._text = self._doc._text[:start] + encoded + self._doc._text[end:]
+        self._doc._value_offsets[self._idx + 1:] += len(encoded) - (end - start)
+
+    @property
+    def confidence(self) -> float:
+        return float(self._doc.confidences[self._idx])
+
+    @confidence.setter
+    def confidence(self, confidence: float) -> None:
+        self._doc.confidences[self._idx] = confidence
+
+    @property
+    def geometry(self) -> Union[BoundingBox, RotatedBbox]:
+        return self._doc.resolve_geometry(self._idx, self._idx + 1)
+
+    @geometry.setter
+    def geometry(self, geometry: Union[BoundingBox, RotatedBbox]) -> None:
+        self._doc.geometry[self._idx] = np.asarray(geometry, dtype=np.float32).reshape(-1)
+
+
+class _LineView(Line):
+    """Lazy view over a line of a columnar document"""
+
+    _children_names: List[str] = ['words']
+
+    def __init__(self, doc: 'ColumnarDocument', idx: int) -> None:
+        self._doc = doc
+        self._idx = idx
+
+    @property
+    def words(self) -> List[Word]:  # type: ignore[override]
+        start, end = self._doc._line_offsets[self._idx: self._idx + 2]
+        return [_WordView(self._doc, idx) for idx in range(start, end)]
+
+    @property
+    def geometry(self) -> Union[BoundingBox, RotatedBbox]:
+        return self._doc.resolve_geometry(*self._doc._line_offsets[self._idx: self._idx + 2])
+
+    @geometry.setter
+    def geometry(self, geometry: Union[BoundingBox, RotatedBbox]) -> None:
+        raise AttributeError("the geometry of a line is resolved from its words in a columnar document")
+
+
+class _BlockView(Block):
+    """Lazy view over a block of a columnar document"""
+
+    _children_names: List[str] = ['lines', 'artefacts']
+
+    def __init__(self, doc: 'ColumnarDocument', idx: int) -> None:
+        self._doc = doc
+        self._idx = idx
+
+    @property
+    def lines(self) -> List[Line]:  # type: ignore[override]
+        start, end = self._doc._block_offsets[self._idx: self._idx + 2]
+        return [_LineView(self._doc, idx) for idx in range(start, end)]
+
+    @property
+    def artefacts(self) -> List[Artefact]:  # type: ignore[override]
+        return []
+
+    @property
+    def geometry(self) -> Union[BoundingBox, RotatedBbox]:
+        # Words of a block are contiguous
+        start, end = self._doc._block_offsets[self._idx: self._idx + 2]
+        return self._doc.resolve_geometry(self._doc._line_offsets[start], self._doc._line_offsets[end])
+
+    @geometry.setter
+    def geometry(self, geometry: Union[BoundingBox, RotatedBbox]) -> None:
+        raise AttributeError("the geometry of a block is resolved from its words in a columnar document")
+
+
+class _PageView(Page):
+    """Lazy view over a page of a columnar document"""
+
+    _children_names: List[str] = ['blocks']
+
+    def __init__(self, doc: 'ColumnarDocument', idx: int) -> None:
+        self._doc = doc
+        self._idx = idx
+
+    @property
+    def blocks(self) -> List[Block]:  # type: ignore[override]
+        start, end = self._doc._page_offsets[self._idx: self._idx + 2]
+        return [_BlockView(self._doc, idx) for idx in range(start, end)]
+
+    @property
+    def page_idx(self) -> int:
+        return self._doc.page_idxs[self._idx]
+
+    @page_idx.setter
+    def page_idx(self, page_idx: int) -> None:
+        self._doc.page_idxs[self._idx] = page_idx
+
+    @property
+    def dimensions(self) -> Tuple[int, int]:
+        return self._doc.dimensions[self._idx]
+
+    @dimensions.setter
+    def dimensions(self, dimensions: Tuple[int, int]) -> None:
+        self._doc.dimensions[self._idx] = dimensions
+
+    @property
+    def orientation(self) -> Dict[str, Any]:
+        return self._doc.orientations[self._idx]
+
+    @orientation.setter
+    def orientation(self, orientation: Dict[str, Any]) -> None:
+        self._doc.orientations[self._idx] = orientation
+
+    @property
+    def language(self) -> Dict[str, Any]:
+        return self._doc.languages[self._idx]
+
+    @language.setter
+    def language(self, language: Dict[str, Any]) -> None:
+        self._doc.languages[self._idx] = language
+
+
+class ColumnarDocument(Document):
+    """Implements a document stored as a struct of arrays. Its pages, blocks, lines and words are lazy views
+    built on access, which keeps the number of live Python objects independent from the number of words.
+
+    Example::
+        >>> import numpy as np
+        >>> from doctr.documents import ColumnarDocument
+        >>> doc = ColumnarDocument(
+        ...     values=["Hello", "world"],
+        ...     confidences=np.array([.9, .8]),
+        ...     geometry=np.array([[.1, .1, .2, .15], [.25, .1, .35, .15]]),
+        ...     word_lines=np.array([0, 0]),
+        ...     line_blocks=np.array([0]),
+        ...     block_pages=np.array([0]),
+        ...     dimensions=[(1024, 768)],
+        ... )
+        >>> doc.render()
+
+    Args:
+        values: text of each word, of size N, or its UTF-8 encoding as a single buffer along with the offsets of the
+            words in it, of shape (N + 1,)
+        confidences: confidence of each word, of shape (N,)
+        geometry: relative bounding box of each word, of shape (N, 4) in format (xmin, ymin, xmax, ymax),
+            or (N, 5) in format (x, y, w, h, alpha) for rotated boxes
+        word_lines: index of the line of each word, of shape (N,)
+        line_blocks: index of the block of each line, of shape (L,)
+        block_pages: index of the page of each block, of shape (B,)
+        dimensions: size of each page
+        page_idxs: index of each page in the input raw document, defaults to the page position
+        orientations: orientation of each page
+        languages: language of each page
+    """
+
+    _children_names: List[str] = ['pages']
+    # Magic string, format version, number of coordinates per box, number of words, lines, blocks and pages
+    _header = struct.Struct('<4sBBIIII')
+    _magic = b'DTRD'
+    _version = 2
+
+    def __init__(
+        self,
+        values: Union[List[str], Tuple[bytes, np.ndarray]],
+        confidences: np.ndarray,
+        geometry: np.ndarray,
+        word_lines: np.ndarray,
+        line_blocks: np.ndarray,
+        block_pages: np.ndarray,
+        dimensions: List[Tuple[int, int]],
+        page_idxs: Optional[List[int]] = None,
+        orientations: Optional[List[Dict[str, Any]]] = None,
+        languages: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+
+        # Words are stored as a single UTF-8 buffer, without any per-word padding or Python object
+        if isinstance(values, tuple):
+            self._text, value_offsets = values
+            self._value_offsets = np.array(value_offsets, dtype=np.int64)
+        else:
+            encoded = [value.encode('utf-8') for value in values]
+            self._text = b''.join(encoded)
+            self._value_offsets = np.concatenate(([0], np.cumsum([len(value) for value in encoded], dtype=np.int64)))
+        num_words = self._value_offsets.shape[0] - 1
+
+        if num_words != confidences.shape[0] or num_words != geometry.shape[0] or num_words != word_lines.shape[0]:
+            raise ValueError("all word arrays are expected to have the same length")
+        if geometry.ndim != 2 or geometry.shape[1] not in (4, 5):
+            raise ValueError("geometry is expected to be of shape (N, 4) or (N, 5)")
+        if any(np.any(np.diff(parents) < 0) for parents in (word_lines, line_blocks, block_pages)):
+            raise ValueError("words, lines and blocks are expected to be sorted by parent element")
+
+        self.confidences = confidences.astype(np.float32)
+        self.geometry = geometry.astype(np.float32)
+        self.page_idxs = list(range(len(dimensions))) if page_idxs is None else page_idxs
+        self.dimensions = dimensions
+        self.orientations = [
+            dict(value=None, confidence=None) for _ in dimensions
+        ] if orientations is None else orientations
+        self.languages = [dict(value=None, confidence=None) for _ in dimensions] if languages is None else languages
+
+        # Range of children of each element
+        self._line_offsets = self._get_offsets(word_lines, line_blocks.shape[0])
+        self._block_offsets = self._get_offsets(line_blocks, block_pages.shape[0])
+        self._page_offsets = self._get_offsets(block_pages, len(dimensions))
+
+    @staticmethod
+    def _get_offsets(parents: np.ndarray, num_parents: int) -> List[int]:
+        counts = np.bincount(parents.astype(np.int64), minlength=num_parents)
+        return np.concatenate(([0], np.cumsum(counts))).tolist()
+
+    @property
+    def pages(self) -> List[Page]:  # type: ignore[override]
+        return [_PageView(self, idx) for idx in range(len(self.dimensions))]
+
+    @property
+    def values(self) -> List[str]:
+        """Text of each word"""
+        return [
+            self._text[start: end].decode('utf-8')
+            for start, end in zip(self._value_offsets[:-1].tolist(), self._value_offsets[1:].tolist())
+        ]
+
+    def resolve_geometry(self, start: int, end: int) -> Union[BoundingBox, RotatedBbox]:
+        """Resolve the smallest box enclosing a range of words
+
+        Args:
+            start: index of the first word
+            end: index following the last word
+
+        Returns:
+            the enclosing bounding box
+        """
+        if self.geometry.shape[1] == 5:
+            if end - start == 1:
+                return tuple(self.geometry[start].tolist())  # type: ignore[return-value]
+            return resolve_enclosing_rbbox([tuple(box) for box in self.geometry[start: end].tolist()])
+        xmin, ymin = self.geometry[start: end, :2].min(axis=0).tolist()
+        xmax, ymax = self.geometry[start: end, 2:].max(axis=0).tolist()
+        return (xmin, ymin), (xmax, ymax)
+
+    @classmethod
+    def from_document(cls, doc: Document) -> 'ColumnarDocument':
+        """Converts a document made of elements into its columnar version
+
+        Args:
+            doc: the document to convert, whose blocks contain no artefacts
+
+        Returns:
+            the columnar document
+        """
+        if isinstance(doc, ColumnarDocument):
+            return doc
+        if any(len(block.artefacts) > 0 for page in doc.pages for block in page.blocks):
+            raise ValueError("artefacts cannot be stored in a columnar document")
+
+        words = [
+            (word, line_idx) for line_idx, line in enumerate(
+                line for page in doc.pages for block in page.blocks for line in block.lines
+            ) for word in line.words
+        ]
+        num_coords = 5 if len(words) > 0 and len(words[0][0].geometry) == 5 else 4
+        geometry = np.asarray([word.geometry for word, _ in words], dtype=np.float32).reshape(-1, num_coords)
+
+        return cls(
+            [word.value for word, _ in words],
+            np.asarray([word.confidence for word, _ in words], dtype=np.float32),
+            geometry,
+            np.asarray([line_idx for _, line_idx in words], dtype=np.int64),
+            np.asarray([block_idx for block_idx, block in enumerate(
+                block for page in doc.pages for block in page.blocks
+            ) for _ in block.lines], dtype=np.int64),
+            np.asarray([page_idx for page_idx, page in enumerate(doc.pages) for _ in page.blocks], dtype=np.int64),
+            [page.dimensions for page in doc.pages],
+            [page.page_idx for page in doc.pages],
+            [page.orientation for page in doc.pages],
+            [page.language for page in doc.pages],
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serializes the document in a compact binary format, see `Document.to_bytes`"""
+        page_meta = _json_encoder.encode(dict(
+            page_idxs=self.page_idxs,
+            dimensions=self.dimensions,
+            orientations=self.orientations,
+            languages=self.languages,
+        )).encode('utf-8')
+        # Number of children of each line, block and page
+        num_children = np.concatenate([
+            np.diff(offsets) for offsets in (self._line_offsets, self._block_offsets, self._page_offsets)
+        ])
+
+        return b''.join([
+            self._header.pack(
+                self._magic, self._version, self.geometry.shape[1], self.confidences.shape[0],
+                len(self._line_offsets) - 1, len(self._block_offsets) - 1, len(self._page_offsets) - 1,
+            ),
+            self.geometry.astype('<f4').tobytes(),
+            self.confidences.astype('<f4').tobytes(),
+            num_children.astype('<u4').tobytes(),
+            self._value_offsets.astype('<i8').tobytes(),
+            struct.pack('<I', len(page_meta)),
+            page_meta,
+            self._text,
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ColumnarDocument':  # type: ignore[override]
+        """Loads a document serialized with `Document.to_bytes`"""
+        magic, version, num_coords, num_words, num_lines, num_blocks, num_pages = cls._header.unpack_from(data)
+        if magic != cls._magic or version != cls._version:
+            raise ValueError("unsupported binary format")
+
+        offset = cls._header.size
+
+        def _read(dtype: str, count: int) -> np.ndarray:
+            nonlocal offset
+            arr = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            offset += arr.nbytes
+            return arr
+
+        geometry = _read('<f4', num_words * num_coords).reshape(num_words, num_coords)
+        confidences = _read('<f4', num_words)
+        num_children = _read('<u4', num_lines + num_blocks + num_pages).astype(np.int64)
+        value_offsets = _read('<i8', num_words + 1)
+        meta_length, = struct.unpack_from('<I', data, offset)
+        offset += 4
+        page_meta = json.loads(data[offset: offset + meta_length].decode('utf-8'))
+        offset += meta_length
+        text = data[offset: offset + int(value_offsets[-1])]
+
+        return cls(
+            (text, value_offsets),
+            confidences,
+            geometry,
+            np.repeat(np.arange(num_lines), num_children[:num_lines]),
+            np.repeat(np.arange(num_blocks), num_children[num_lines: num_lines + num_blocks]),
+            np.repeat(np.arange(num_pages), num_children[num_lines + num_blocks:]),
+            [tuple(dims) for dims in page_meta['dimensions']],
+            page_meta['page_idxs'],
+            page_meta['orientations'],
+            page_meta['languages'],
+        )
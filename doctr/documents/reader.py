@@ -8,7 +8,7 @@ import cv2
 from pathlib import Path
 import fitz
 from weasyprint import HTML
-from typing import List, Tuple, Optional, Any, Union, Sequence, Dict
+from typing import List, Tuple, Optional, Any, Union, Sequence, Dict, Iterator
 
 __all__ = ['read_pdf', 'read_img', 'read_html', 'DocumentFile', 'PDF']
 
@@ -168,6 +168,22 @@ class PDF:
         """
         return [convert_page_to_numpy(page, **kwargs) for page in self.doc]
 
+    def iter_images(self, **kwargs) -> Iterator[np.ndarray]:
+        """Lazily convert document pages to images, one page at a time
+
+        Example::
+            >>> from doctr.documents import DocumentFile
+            >>> for page in DocumentFile.from_pdf("path/to/your/doc.pdf").iter_images():
+            ...     print(page.shape)
+
+        Args:
+            kwargs: keyword arguments of `convert_page_to_numpy`
+        Returns:
+            an iterator over the pages decoded as numpy ndarray of shape H x W x 3
+        """
+        for page in self.doc:
+            yield convert_page_to_numpy(page, **kwargs)
+
     def get_page_words(self, idx, **kwargs) -> List[Tuple[Bbox, str]]:
         """Get the annotations for all words of a given page"""
 
@@ -1,4 +1,5 @@
 from .preprocessor import *
+from .blank_page import *
 from .core import *
 from . import artefacts
 from . import utils
@@ -6,19 +6,22 @@
 import numpy as np
 import cv2
 from math import floor
-from typing import List
+from typing import List, Tuple, Optional
 from statistics import median_low
 
-__all__ = ['estimate_orientation', 'extract_crops', 'extract_rcrops', 'rotate_page', 'get_bitmap_angle']
+__all__ = ['estimate_orientation', 'estimate_text_height', 'extract_crops', 'extract_rcrops', 'extract_crops_batch',
+           'rotate_page', 'get_bitmap_angle']
 
 
-def extract_crops(img: np.ndarray, boxes: np.ndarray) -> List[np.ndarray]:
+def extract_crops(img: np.ndarray, boxes: np.ndarray, angle: float = 0.) -> List[np.ndarray]:
     """Created cropped images from list of bounding boxes
 
     Args:
         img: input image
         boxes: bounding boxes of shape (N, 4) where N is the number of boxes, and the relative
             coordinates (xmin, ymin, xmax, ymax)
+        angle: if the boxes were predicted on the page rotated by `rotate_page(img, angle)`, the crops are directly
+            extracted from the unrotated image
 
     Returns:
         list of cropped images
@@ -36,16 +39,31 @@ def extract_crops(img: np.ndarray, boxes: np.ndarray) -> List[np.ndarray]:
         _boxes = _boxes.round().astype(int)
         # Add last index
         _boxes[2:] += 1
-    return [img[box[1]: box[3], box[0]: box[2]] for box in _boxes]
 
+    rot_mat = get_rotation_matrix(img.shape[:2], angle)
+    if rot_mat is None:
+        return [img[box[1]: box[3], box[0]: box[2]] for box in _boxes]
 
-def extract_rcrops(img: np.ndarray, boxes: np.ndarray) -> List[np.ndarray]:
+    crops = []
+    for xmin, ymin, xmax, ymax in _boxes:
+        if xmax <= xmin or ymax <= ymin:
+            crops.append(np.zeros((max(ymax - ymin, 0), max(xmax - xmin, 0), *img.shape[2:]), dtype=img.dtype))
+            continue
+        # Single warp composing the page rotation and the box translation
+        M = _compose_affine(np.array([[1, 0, -xmin], [0, 1, -ymin]], dtype=np.float64), rot_mat)
+        crops.append(cv2.warpAffine(img, M, (int(xmax - xmin), int(ymax - ymin))))
+    return crops
+
+
+def extract_rcrops(img: np.ndarray, boxes: np.ndarray, angle: float = 0.) -> List[np.ndarray]:
     """Created cropped images from list of rotated bounding boxes
 
     Args:
         img: input image
         boxes: bounding boxes of shape (N, 5) where N is the number of boxes, and the relative
             coordinates (x, y, w, h, alpha)
+        angle: if the boxes were predicted on the page rotated by `rotate_page(img, angle)`, the crops are directly
+            extracted from the unrotated image
 
     Returns:
         list of cropped images
@@ -64,30 +82,138 @@ def extract_rcrops(img: np.ndarray, boxes: np.ndarray) -> List[np.ndarray]:
     crops = []
     # Determine rotation direction (clockwise/counterclockwise)
     # Angle coverage: [-90°, +90°], half of the quadrant
-    clockwise = False
-    if np.sum(boxes[:, 2]) > np.sum(boxes[:, 3]):
-        clockwise = True
+    clockwise = bool(np.sum(boxes[:, 2]) > np.sum(boxes[:, 3]))
+    rot_mat = get_rotation_matrix(img.shape[:2], angle)
 
     for box in _boxes:
-        x, y, w, h, alpha = box.astype(np.float32)
-        src_pts = cv2.boxPoints(((x, y), (w, h), alpha))[1:, :]
-        # Preserve size
-        if clockwise:
-            dst_pts = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1]], dtype=np.float32)
-        else:
-            dst_pts = np.array([[h - 1, 0], [h - 1, w - 1], [0, w - 1]], dtype=np.float32)
-        # The transformation matrix
-        M = cv2.getAffineTransform(src_pts, dst_pts)
+        M, crop_size = _get_rcrop_transform(box, clockwise)
+        if rot_mat is not None:
+            M = _compose_affine(M, rot_mat)
         # Warp the rotated rectangle
-        if clockwise:
-            crop = cv2.warpAffine(img, M, (int(w), int(h)))
-        else:
-            crop = cv2.warpAffine(img, M, (int(h), int(w)))
-        crops.append(crop)
+        crops.append(cv2.warpAffine(img, M, crop_size))
 
     return crops
 
 
+def _get_rcrop_transform(box: np.ndarray, clockwise: bool) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Compute the affine transformation extracting a rotated box from an image
+
+    Args:
+        box: absolute rotated box (x, y, w, h, alpha)
+        clockwise: whether the rotation is clockwise
+
+    Returns:
+        the (2, 3) transformation matrix, and the size (width, height) of the crop
+    """
+    x, y, w, h, alpha = box.astype(np.float32)
+    src_pts = cv2.boxPoints(((x, y), (w, h), alpha))[1:, :]
+    # Preserve size
+    if clockwise:
+        dst_pts = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1]], dtype=np.float32)
+        crop_size = (int(w), int(h))
+    else:
+        dst_pts = np.array([[h - 1, 0], [h - 1, w - 1], [0, w - 1]], dtype=np.float32)
+        crop_size = (int(h), int(w))
+    # The transformation matrix
+    return cv2.getAffineTransform(src_pts, dst_pts), crop_size
+
+
+def _compose_affine(outer: np.ndarray, inner: np.ndarray) -> np.ndarray:
+    """Compose two (2, 3) affine transformations, the inner one being applied first"""
+    return outer @ np.concatenate((inner, [[0, 0, 1]]), axis=0)
+
+
+def extract_crops_batch(
+    img: np.ndarray,
+    boxes: np.ndarray,
+    output_size: Tuple[int, int],
+    preserve_aspect_ratio: bool = True,
+    out: Optional[np.ndarray] = None,
+    angle: float = 0.,
+) -> np.ndarray:
+    """Crop and resize straight or rotated boxes of an image directly into a batch buffer,
+    with a single warp per crop and no intermediate crop copies.
+
+    Example::
+        >>> import numpy as np
+        >>> from doctr.models import extract_crops_batch
+        >>> page = (255 * np.random.rand(600, 800, 3)).astype(np.uint8)
+        >>> boxes = np.array([[.1, .1, .3, .15], [.5, .5, .8, .6]], dtype=np.float32)
+        >>> batch = extract_crops_batch(page, boxes, (32, 128))
+
+    Args:
+        img: input image of shape (H, W, C)
+        boxes: bounding boxes of shape (N, 4) in relative coordinates (xmin, ymin, xmax, ymax),
+            or rotated boxes of shape (N, 5) in relative coordinates (x, y, w, h, alpha)
+        output_size: size of each crop in the batch, in format (H, W)
+        preserve_aspect_ratio: if True, crops are resized without deformation and padded with zeros on the right
+            or at the bottom, as done by `PreProcessor`
+        out: optional preallocated buffer of shape (N, H, W, C) and dtype uint8, to write the crops into
+        angle: if the boxes were predicted on the page rotated by `rotate_page(img, angle)`, the crops are directly
+            extracted from the unrotated image
+
+    Returns:
+        the batch of crops, of shape (N, H, W, C)
+    """
+    if boxes.ndim != 2 or boxes.shape[1] not in (4, 5):
+        raise AssertionError("boxes are expected to be relative and in order (xmin, ymin, xmax, ymax) "
+                             "or (x, y, w, h, alpha)")
+
+    height, width = output_size
+    if out is None:
+        out = np.empty((boxes.shape[0], height, width, img.shape[-1]), dtype=np.uint8)
+    elif out.shape != (boxes.shape[0], height, width, img.shape[-1]) or out.dtype != np.uint8:
+        raise AssertionError("the output buffer is expected to be of shape (N, H, W, C) and dtype uint8")
+    if boxes.shape[0] == 0:
+        return out
+
+    # Project relative coordinates
+    _boxes = boxes.copy()
+    if _boxes.dtype != np.int:
+        _boxes[:, [0, 2]] *= img.shape[1]
+        _boxes[:, [1, 3]] *= img.shape[0]
+
+    rotated = boxes.shape[1] == 5
+    if rotated:
+        clockwise = bool(np.sum(boxes[:, 2]) > np.sum(boxes[:, 3]))
+    else:
+        _boxes = _boxes.round().astype(int)
+    rot_mat = get_rotation_matrix(img.shape[:2], angle)
+
+    for box, crop in zip(_boxes, out):
+        # Transformation from the image to the unscaled crop
+        if rotated:
+            M, (crop_w, crop_h) = _get_rcrop_transform(box, clockwise)
+        else:
+            xmin, ymin, xmax, ymax = box
+            crop_w, crop_h = xmax - xmin, ymax - ymin
+            M = np.array([[1, 0, -xmin], [0, 1, -ymin]], dtype=np.float64)
+        if crop_w <= 0 or crop_h <= 0:
+            crop.fill(0)
+            continue
+        if rot_mat is not None:
+            M = _compose_affine(M, rot_mat)
+
+        # Size of the resized crop
+        if not preserve_aspect_ratio:
+            new_h, new_w = height, width
+        elif crop_h / crop_w > height / width:
+            new_h, new_w = height, max(1, int(height * crop_w / crop_h))
+        else:
+            new_h, new_w = max(1, int(width * crop_h / crop_w)), width
+        # Compose with the scaling (aligned on pixel centers, like bilinear resizing)
+        scale_x, scale_y = new_w / crop_w, new_h / crop_h
+        S = np.array([[scale_x, 0, .5 * scale_x - .5], [0, scale_y, .5 * scale_y - .5]], dtype=np.float64)
+        M = _compose_affine(S, M)
+
+        cv2.warpAffine(img, M, (width, height), dst=crop, flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+        # Padding
+        crop[new_h:] = 0
+        crop[:, new_w:] = 0
+
+    return out
+
+
 def rotate_page(
     image: np.ndarray,
     angle: float = 0.,
@@ -103,15 +229,37 @@ def rotate_page(
     Returns:
         Rotated array or tf.Tensor, padded by 0 by default.
     """
-    if abs(angle) < min_angle or abs(angle) > 90 - min_angle:
+    rot_mat = get_rotation_matrix(image.shape[:2], angle, min_angle)
+    if rot_mat is None:
         return image
 
     height, width = image.shape[:2]
-    center = (height / 2, width / 2)
-    rot_mat = cv2.getRotationMatrix2D(center, angle, 1.0)
     return cv2.warpAffine(image, rot_mat, (width, height))
 
 
+def get_rotation_matrix(
+    image_shape: Tuple[int, int],
+    angle: float = 0.,
+    min_angle: float = 1.
+) -> Optional[np.ndarray]:
+    """Compute the transformation used by `rotate_page` to rotate an image counterclockwise by an angle alpha.
+
+    Args:
+        image_shape: shape of the image (H, W)
+        angle: rotation angle in degrees, between -90 and +90
+        min_angle: min. angle in degrees to rotate a page
+
+    Returns:
+        the (2, 3) rotation matrix, or None if the page doesn't need to be rotated
+    """
+    if abs(angle) < min_angle or abs(angle) > 90 - min_angle:
+        return None
+
+    height, width = image_shape
+    center = (height / 2, width / 2)
+    return cv2.getRotationMatrix2D(center, angle, 1.0)
+
+
 def get_max_width_length_ratio(contour: np.ndarray) -> float:
     """
     Get the maximum shape ratio of a contour.
@@ -163,6 +311,35 @@ def estimate_orientation(img: np.ndarray, n_ct: int = 50, ratio_threshold_for_li
     return -median_low(angles)
 
 
+def estimate_text_height(img: np.ndarray, max_size: int = 1024) -> float:
+    """Estimate the median height of the characters of a page, from the connected components of its binarized
+    (downscaled) grayscale version
+
+    Args:
+        img: the img to analyze
+        max_size: size of the longest side of the image analyzed, larger images are downscaled first
+
+    Returns:
+        the median height of the characters in pixels of `img`, 0 if no character was found
+    """
+    gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.shape[-1] == 3 else img[..., 0]
+    scale = min(1., max_size / max(img.shape[:2]))
+    if scale < 1:
+        gray_img = cv2.resize(
+            gray_img, (max(1, round(img.shape[1] * scale)), max(1, round(img.shape[0] * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+    thresh = cv2.threshold(gray_img, thresh=0, maxval=255, type=cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(thresh, connectivity=8)
+    # Skip the background, and the components shaped like rules, pictures or noise
+    widths, heights = stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_HEIGHT]
+    is_char = (heights >= 2) & (heights <= gray_img.shape[0] / 10) & (widths <= 10 * heights)
+    if not np.any(is_char):
+        return 0.
+    return float(np.median(heights[is_char])) / scale
+
+
 def get_bitmap_angle(bitmap: np.ndarray, n_ct: int = 20, std_max: float = 3.) -> float:
     """From a binarized segmentation map, find contours and fit min area rectangles to determine page angle
 
@@ -0,0 +1,78 @@
+# Copyright (C) 2021, Mindee.
+
+# This program is licensed under the Apache License version 2.
+# See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
+
+import cv2
+import numpy as np
+from typing import List
+
+from doctr.utils.repr import NestedObject
+
+__all__ = ['BlankPageDetector']
+
+
+class BlankPageDetector(NestedObject):
+    """Implements a cheap classifier of blank pages, based on the ink density of a downscaled grayscale thumbnail
+
+    Example::
+        >>> import numpy as np
+        >>> from doctr.models import BlankPageDetector
+        >>> detector = BlankPageDetector()
+        >>> detector([np.full((1024, 768, 3), 255, dtype=np.uint8)])
+        [True]
+
+    Args:
+        thumbnail_size: size of the longest side of the thumbnail
+        ink_thresh: minimum difference between the intensity of a pixel and the one of the page background (median)
+            to consider it as ink
+        min_ink_ratio: minimum fraction of ink pixels on the thumbnail for a page not to be blank
+    """
+
+    def __init__(
+        self,
+        thumbnail_size: int = 256,
+        ink_thresh: int = 40,
+        min_ink_ratio: float = 1e-3,
+    ) -> None:
+
+        self.thumbnail_size = thumbnail_size
+        self.ink_thresh = ink_thresh
+        self.min_ink_ratio = min_ink_ratio
+
+    def extra_repr(self) -> str:
+        return (f"thumbnail_size={self.thumbnail_size}, ink_thresh={self.ink_thresh}, "
+                f"min_ink_ratio={self.min_ink_ratio}")
+
+    def ink_ratio(self, page: np.ndarray) -> float:
+        """Computes the fraction of ink pixels on the thumbnail of a page
+
+        Args:
+            page: uint8 image of shape (H, W, C)
+
+        Returns:
+            the ink density of the page
+        """
+        height, width = page.shape[:2]
+        gray = cv2.cvtColor(page, cv2.COLOR_RGB2GRAY) if page.shape[-1] == 3 else page[..., 0]
+        # Area interpolation averages the pixels, so that thin strokes still show on the thumbnail
+        scale = min(1., self.thumbnail_size / max(height, width))
+        thumbnail = cv2.resize(
+            gray, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA
+        )
+        background = np.median(thumbnail)
+        return float(np.mean(np.abs(thumbnail.astype(np.int16) - background) > self.ink_thresh))
+
+    def __call__(
+        self,
+        pages: List[np.ndarray],
+    ) -> List[bool]:
+        """Classify pages as blank or not
+
+        Args:
+            pages: list of uint8 images of shape (H, W, C)
+
+        Returns:
+            whether each page is blank
+        """
+        return [self.ink_ratio(page) < self.min_ink_ratio for page in pages]
@@ -5,13 +5,16 @@
 
 
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from scipy.cluster.hierarchy import fclusterdata
-from typing import List, Any, Tuple, Dict
+from typing import List, Any, Tuple, Dict, Iterable, Iterator, Optional
+from .blank_page import BlankPageDetector
 from .detection import DetectionPredictor
 from .recognition import RecognitionPredictor
-from ._utils import extract_crops, extract_rcrops, rotate_page
-from doctr.documents.elements import Word, Line, Block, Page, Document
+from ._utils import extract_crops, extract_rcrops, extract_crops_batch
+from doctr.documents.elements import Word, Line, Block, Page, Document, ColumnarDocument
 from doctr.utils.repr import NestedObject
+from doctr.utils.profiling import stage
 from doctr.utils.geometry import resolve_enclosing_bbox, resolve_enclosing_rbbox, rotate_boxes
 
 __all__ = ['OCRPredictor', 'DocumentBuilder']
@@ -23,6 +26,12 @@ class OCRPredictor(NestedObject):
     Args:
         det_predictor: detection module
         reco_predictor: recognition module
+        rotated_bbox: whether the detection module predicts rotated boxes
+        pipelined: whether the detection of a page batch should overlap with the recognition of the previous one
+        fuse_crops: whether crops should be resized straight into the recognition batch (single warp per crop)
+        columnar: whether predictions should be stored in a `ColumnarDocument`
+        blank_page_detector: if specified, the pages it classifies as blank skip detection & recognition, and are
+            returned empty. Their total number is kept in the `skipped_pages` attribute of the predictor
     """
 
     _children_names: List[str] = ['det_predictor', 'reco_predictor', 'doc_builder']
@@ -31,13 +40,83 @@ class OCRPredictor(NestedObject):
         self,
         det_predictor: DetectionPredictor,
         reco_predictor: RecognitionPredictor,
-        rotated_bbox: bool = False
+        rotated_bbox: bool = False,
+        pipelined: bool = False,
+        fuse_crops: bool = False,
+        columnar: bool = False,
+        blank_page_detector: Optional[BlankPageDetector] = None,
     ) -> None:
 
         self.det_predictor = det_predictor
         self.reco_predictor = reco_predictor
-        self.doc_builder = DocumentBuilder(rotated_bbox=rotated_bbox)
+        self.doc_builder = DocumentBuilder(rotated_bbox=rotated_bbox, columnar=columnar)
         self.extract_crops_fn = extract_rcrops if rotated_bbox else extract_crops
+        self.pipelined = pipelined
+        self.fuse_crops = fuse_crops
+        self.blank_page_detector = blank_page_detector
+        # Number of blank pages skipped by the predictor since its instantiation
+        self.skipped_pages = 0
+
+    def extra_repr(self) -> str:
+        return ", ".join(
+            f"{key}={getattr(self, key)}" for key in ('pipelined', 'fuse_crops', 'blank_page_detector')
+            if getattr(self, key)
+        )
+
+    def _recognize(
+        self,
+        pages: List[np.ndarray],
+        boxes: List[Tuple[np.ndarray, float]],
+        **kwargs: Any,
+    ) -> List[Tuple[str, float]]:
+        with stage("crop_extraction", pages=len(pages)) as info:
+            if self.fuse_crops:
+                # Write all crops straight into a single batch buffer
+                num_crops = sum(_boxes.shape[0] for _boxes, _ in boxes)
+                num_channels = pages[0].shape[-1] if len(pages) > 0 else 3
+                crops = np.empty((num_crops, *self.reco_predictor.input_size, num_channels), dtype=np.uint8)
+                preserve_aspect_ratio = self.reco_predictor.pre_processor.resize.preserve_aspect_ratio
+                crop_idx = 0
+                for page, (_boxes, angle) in zip(pages, boxes):
+                    extract_crops_batch(
+                        page, _boxes[:, :-1], self.reco_predictor.input_size, preserve_aspect_ratio,
+                        out=crops[crop_idx: crop_idx + _boxes.shape[0]], angle=-angle,
+                    )
+                    crop_idx += _boxes.shape[0]
+            else:
+                # Crop images, the page rotation is composed with the transformation of each crop
+                crops = [crop for page, (_boxes, angle) in zip(pages, boxes) for crop in
+                         self.extract_crops_fn(page, _boxes[:, :-1], angle=-angle)]
+            info["crops"] = len(crops)
+        # Identify character sequences
+        return self.reco_predictor(crops, **kwargs)
+
+    def _pipelined_predict(
+        self,
+        pages: List[np.ndarray],
+        **kwargs: Any,
+    ) -> Tuple[List[Tuple[np.ndarray, float]], List[Tuple[str, float]]]:
+        """Localize text elements of the next page batch while the current one is being recognized"""
+
+        batch_size = self.det_predictor.pre_processor.batch_size
+        page_batches = [pages[idx: idx + batch_size] for idx in range(0, len(pages), batch_size)]
+
+        boxes: List[Tuple[np.ndarray, float]] = []
+        word_preds: List[Tuple[str, float]] = []
+        if len(page_batches) == 0:
+            return boxes, word_preds
+
+        # A single detection worker keeps at most one batch ahead of the recognition
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            det_future = executor.submit(self.det_predictor, page_batches[0], **kwargs)
+            for idx, page_batch in enumerate(page_batches):
+                batch_boxes = det_future.result()
+                if idx + 1 < len(page_batches):
+                    det_future = executor.submit(self.det_predictor, page_batches[idx + 1], **kwargs)
+                word_preds.extend(self._recognize(page_batch, batch_boxes, **kwargs))
+                boxes.extend(batch_boxes)
+
+        return boxes, word_preds
 
     def __call__(
         self,
@@ -49,20 +128,79 @@ class OCRPredictor(NestedObject):
         if any(page.ndim != 3 for page in pages):
             raise ValueError("incorrect input shape: all pages are expected to be multi-channel 2D images.")
 
-        # Localize text elements
-        boxes = self.det_predictor(pages, **kwargs)
-        # Crop images, rotate page if necessary
-        crops = [crop for page, (_boxes, angle) in zip(pages, boxes) for crop in
-                 self.extract_crops_fn(rotate_page(page, -angle), _boxes[:, :-1])]
-        # Identify character sequences
-        word_preds = self.reco_predictor(crops, **kwargs)
+        is_blank = [False] * len(pages)
+        if self.blank_page_detector is not None:
+            with stage("blank_page_detection", pages=len(pages)) as info:
+                is_blank = self.blank_page_detector(pages)
+                info["skipped"] = sum(is_blank)
+            self.skipped_pages += info["skipped"]
+        text_pages = [page for page, blank in zip(pages, is_blank) if not blank]
+
+        boxes: List[Tuple[np.ndarray, float]] = []
+        word_preds: List[Tuple[str, float]] = []
+        if self.pipelined:
+            boxes, word_preds = self._pipelined_predict(text_pages, **kwargs)
+        elif len(text_pages) > 0:
+            # Localize text elements
+            boxes = self.det_predictor(text_pages, **kwargs)
+            # Identify character sequences
+            word_preds = self._recognize(text_pages, boxes, **kwargs)
+
+        if any(is_blank):
+            # Blank pages have no words
+            _boxes = iter(boxes)
+            empty = (np.zeros((0, 6 if self.doc_builder.rotated_bbox else 5), dtype=np.float32), 0.)
+            boxes = [empty if blank else next(_boxes) for blank in is_blank]
 
         # Rotate back boxes if necessary
-        boxes, angles = zip(*boxes)
-        boxes = [rotate_boxes(boxes_page, angle) for boxes_page, angle in zip(boxes, angles)]
-        out = self.doc_builder(boxes, word_preds, [page.shape[:2] for page in pages])
+        boxes = [rotate_boxes(boxes_page, angle) for boxes_page, angle in boxes]
+        with stage("document_builder", pages=len(pages), words=len(word_preds)):
+            out = self.doc_builder(boxes, word_preds, [page.shape[:2] for page in pages])
         return out
 
+    def stream(
+        self,
+        pages: Iterable[np.ndarray],
+        window: int = 4,
+        **kwargs: Any,
+    ) -> Iterator[Page]:
+        """Analyze a lazy source of pages, yielding each finished page in order
+
+        Example::
+            >>> from doctr.documents import DocumentFile
+            >>> from doctr.models import ocr_predictor
+            >>> model = ocr_predictor(pretrained=True)
+            >>> for page in model.stream(DocumentFile.from_pdf("path/to/your/doc.pdf").iter_images()):
+            ...     print(page.render())
+
+        Args:
+            pages: iterable of pages (e.g. `PDF.iter_images()`), consumed lazily
+            window: maximum number of pages being processed at the same time
+
+        Returns:
+            an iterator over the analyzed pages
+        """
+
+        if window < 1:
+            raise ValueError("the page window is expected to be a strictly positive integer.")
+
+        page_offset = 0
+        chunk: List[np.ndarray] = []
+        for page in pages:
+            chunk.append(page)
+            if len(chunk) == window:
+                yield from self._stream_chunk(chunk, page_offset, **kwargs)
+                page_offset += len(chunk)
+                chunk = []
+        if len(chunk) > 0:
+            yield from self._stream_chunk(chunk, page_offset, **kwargs)
+
+    def _stream_chunk(self, pages: List[np.ndarray], page_offset: int, **kwargs: Any) -> Iterator[Page]:
+        for page in self(pages, **kwargs).pages:
+            # Page indices are relative to the chunk
+            page.page_idx += page_offset
+            yield page
+
 
 class DocumentBuilder(NestedObject):
     """Implements a document builder
@@ -71,20 +209,33 @@ class DocumentBuilder(NestedObject):
         resolve_lines: whether words should be automatically grouped into lines
         resolve_blocks: whether lines should be automatically grouped into blocks
         paragraph_break: relative length of the minimum space separating paragraphs
+        rotated_bbox: whether the boxes are rotated boxes
+        block_resolver: method used to group lines into blocks, either 'clustering' (hierarchical clustering,
+            quadratic in the number of lines) or 'xy_cut' (recursive XY-cut, suited to pages with many lines)
+        columnar: whether to build a `ColumnarDocument`, whose elements are lazy views over arrays
     """
 
+    block_resolvers = ('clustering', 'xy_cut')
+
     def __init__(
         self,
         resolve_lines: bool = False,
         resolve_blocks: bool = False,
         paragraph_break: float = 0.035,
-        rotated_bbox: bool = False
+        rotated_bbox: bool = False,
+        block_resolver: str = 'clustering',
+        columnar: bool = False,
     ) -> None:
 
+        if block_resolver not in self.block_resolvers:
+            raise ValueError(f"unknown block resolver '{block_resolver}'")
+
         self.resolve_lines = resolve_lines
         self.resolve_blocks = resolve_blocks
         self.paragraph_break = paragraph_break
         self.rotated_bbox = rotated_bbox
+        self.block_resolver = block_resolver
+        self.columnar = columnar
 
     def _sort_boxes(self, boxes: np.ndarray) -> np.ndarray:
         """Sort bounding boxes from top to bottom, left to right
@@ -99,45 +250,27 @@ class DocumentBuilder(NestedObject):
             return (boxes[:, 0] + 2 * boxes[:, 1] / np.median(boxes[:, 3])).argsort()
         return (boxes[:, 0] + 2 * boxes[:, 3] / np.median(boxes[:, 3] - boxes[:, 1])).argsort()
 
-    def _resolve_sub_lines(self, boxes: np.ndarray, words: List[int]) -> List[List[int]]:
-        """Split a line in sub_lines
+    def _resolve_sub_lines(self, boxes: np.ndarray, line_ids: np.ndarray) -> List[List[int]]:
+        """Split lines in sub-lines
 
         Args:
             boxes: bounding boxes of shape (N, 4) or (N, 5) in case of rotated bbox
-            words: list of indexes for the words of the line
+            line_ids: index of the line of each box, of shape (N,)
 
         Returns:
-            A list of (sub-)lines computed from the original line (words)
+            A list of (sub-)lines, each of them being a list of box indices sorted horizontally
         """
-        lines = []
-        # Sort words horizontally
-        words = [words[j] for j in np.argsort([boxes[i, 0] for i in words]).tolist()]
-        # Eventually split line horizontally
-        if len(words) < 2:
-            lines.append(words)
+        # Sort words by line, then horizontally
+        idxs = np.lexsort((boxes[:, 0], line_ids))
+        # Compute distance between consecutive boxes
+        if self.rotated_bbox:
+            dist = boxes[idxs[1:], 0] - (boxes[idxs[:-1], 0] + boxes[idxs[:-1], 2])
         else:
-            sub_line = [words[0]]
-            for i in words[1:]:
-                horiz_break = True
-
-                prev_box = boxes[sub_line[-1]]
-                # Compute distance between boxes
-                if self.rotated_bbox:
-                    dist = boxes[i, 0] - prev_box[2] / 2 - (prev_box[0] + prev_box[2] / 2)
-                else:
-                    dist = boxes[i, 0] - prev_box[2]
-                # If distance between boxes is lower than paragraph break, same sub-line
-                if dist < self.paragraph_break:
-                    horiz_break = False
-
-                if horiz_break:
-                    lines.append(sub_line)
-                    sub_line = []
-
-                sub_line.append(i)
-            lines.append(sub_line)
+            dist = boxes[idxs[1:], 0] - boxes[idxs[:-1], 2]
+        # Break on line changes, and where the distance between boxes exceeds the paragraph break
+        breaks = (line_ids[idxs[1:]] != line_ids[idxs[:-1]]) | (dist >= self.paragraph_break)
 
-        return lines
+        return [sub_line.tolist() for sub_line in np.split(idxs, np.flatnonzero(breaks) + 1)]
 
     def _resolve_lines(self, boxes: np.ndarray) -> List[List[int]]:
         """Order boxes to group them in lines
@@ -150,45 +283,26 @@ class DocumentBuilder(NestedObject):
         """
         # Compute median for boxes heights
         y_med = np.median(boxes[:, 3] if self.rotated_bbox else boxes[:, 3] - boxes[:, 1])
-
-        # Sort boxes
-        idxs = (boxes[:, 0] + 2 * boxes[:, 1 if self.rotated_bbox else 3] / y_med).argsort()
-
-        lines = []
-        words = [idxs[0]]  # Assign the top-left word to the first line
-        # Define a mean y-center for the line
-        if self.rotated_bbox:
-            y_center_sum = boxes[idxs[0]][1]
-        else:
-            y_center_sum = boxes[idxs[0]][[1, 3]].mean()
-
-        for idx in idxs[1:]:
-            vert_break = True
-
-            # Compute y_dist
-            if self.rotated_bbox:
-                y_dist = abs(boxes[idx][1] - y_center_sum / len(words))
-            else:
-                y_dist = abs(boxes[idx][[1, 3]].mean() - y_center_sum / len(words))
-            # If y-center of the box is close enough to mean y-center of the line, same line
-            if y_dist < y_med / 2:
-                vert_break = False
-
-            if vert_break:
-                # Compute sub-lines (horizontal split)
-                lines.extend(self._resolve_sub_lines(boxes, words))
-                words = []
-                y_center_sum = 0
-
-            words.append(idx)
-            y_center_sum = boxes[idxs[0]][1 if self.rotated_bbox else [1, 3]].mean()
-
-        # Use the remaining words to form the last(s) line(s)
-        if len(words) > 0:
-            # Compute sub-lines (horizontal split)
-            lines.extend(self._resolve_sub_lines(boxes, words))
-
-        return lines
+        # Sort boxes vertically
+        y_centers = boxes[:, 1] if self.rotated_bbox else boxes[:, [1, 3]].mean(axis=1)
+        idxs = np.argsort(y_centers, kind='stable')
+
+        sorted_centers = y_centers[idxs]
+
+        # Each line starts with its topmost word, and gathers the words whose y-center is closer than half the median
+        # height to the one of this reference word (comparing consecutive words would chain distinct lines)
+        line_starts = np.zeros(boxes.shape[0], dtype=np.int64)
+        start = 0
+        while True:
+            start = max(start + 1, int(np.searchsorted(sorted_centers, sorted_centers[start] + y_med / 2)))
+            if start >= boxes.shape[0]:
+                break
+            line_starts[start] = 1
+        line_ids = np.empty(boxes.shape[0], dtype=np.int64)
+        line_ids[idxs] = np.cumsum(line_starts)
+
+        # Compute sub-lines (horizontal split)
+        return self._resolve_sub_lines(boxes, line_ids)
 
     def _resolve_blocks(self, boxes: np.ndarray, lines: List[List[int]]) -> List[List[List[int]]]:
         """Order lines to group them in blocks
@@ -214,6 +328,17 @@ class DocumentBuilder(NestedObject):
             ]
             box_lines = np.asarray([(x1, y1, x2, y2) for ((x1, y1), (x2, y2)) in _box_lines])
 
+        if self.block_resolver == 'xy_cut':
+            if self.rotated_bbox:
+                # Use the extent of the lines
+                box_lines = np.stack((
+                    box_lines[:, 0] - box_lines[:, 2] / 2,
+                    box_lines[:, 1] - box_lines[:, 3] / 2,
+                    box_lines[:, 0] + box_lines[:, 2] / 2,
+                    box_lines[:, 1] + box_lines[:, 3] / 2,
+                ), axis=-1)
+            return [[lines[idx] for idx in block] for block in self._xy_cut(box_lines)]
+
         # Compute geometrical features of lines to clusterize
         # Clusterizing only with box centers yield to poor results for complex documents
         box_features = np.stack(
@@ -242,6 +367,97 @@ class DocumentBuilder(NestedObject):
 
         return blocks
 
+    def _xy_cut(self, box_lines: np.ndarray) -> List[List[int]]:
+        """Recursively split lines into blocks along the widest empty horizontal and vertical bands
+
+        Args:
+            box_lines: enclosing boxes of the lines, of shape (N, 4) in format (xmin, ymin, xmax, ymax)
+
+        Returns:
+            list of blocks, each of them being a list of line indices
+        """
+        # Vertical gaps must be larger than a line height, horizontal ones larger than a paragraph break
+        min_gaps = (self.paragraph_break, np.median(box_lines[:, 3] - box_lines[:, 1]))
+
+        blocks = []
+        # Line indices, axis to cut along (0: x, 1: y), whether the other axis couldn't be cut
+        stack = [(np.arange(box_lines.shape[0]), 1, False)]
+        while len(stack) > 0:
+            idxs, axis, other_failed = stack.pop()
+            starts, ends = box_lines[idxs, axis], box_lines[idxs, axis + 2]
+            order = np.argsort(starts, kind='stable')
+            # Empty bands between the furthest end so far and the next start
+            gaps = starts[order[1:]] - np.maximum.accumulate(ends[order])[:-1]
+            cuts = np.flatnonzero(gaps > min_gaps[axis]) + 1
+            if cuts.size == 0:
+                if other_failed:
+                    blocks.append(np.sort(idxs).tolist())
+                else:
+                    stack.append((idxs, 1 - axis, True))
+                continue
+            # Push the sub-blocks in reverse order to pop them from top-left to bottom-right
+            stack.extend((idxs[sub_order], 1 - axis, False) for sub_order in reversed(np.split(order, cuts)))
+
+        return blocks
+
+    def _resolve_structure(self, boxes: np.ndarray) -> List[List[List[int]]]:
+        """Group the words of a page into lines and blocks
+
+        Args:
+            boxes: bounding boxes of all detected words of the page, of shape (N, 5) or (N, 6)
+
+        Returns:
+            nested list of box indices
+        """
+        # Decide whether we try to form lines
+        if self.resolve_lines:
+            lines = self._resolve_lines(boxes[:, :-1])
+            # Decide whether we try to form blocks
+            if self.resolve_blocks:
+                return self._resolve_blocks(boxes[:, :-1], lines)
+            return [lines]
+        # Sort bounding boxes, one line for all boxes, one block for the line
+        return [[self._sort_boxes(boxes[:, :-1]).tolist()]]
+
+    def _build_columnar(
+        self,
+        boxes: List[np.ndarray],
+        word_preds: List[Tuple[str, float]],
+        page_shapes: List[Tuple[int, int]]
+    ) -> ColumnarDocument:
+        """Arrange detected words into a columnar document, without instantiating any element"""
+
+        word_idxs: List[np.ndarray] = []
+        word_lines: List[np.ndarray] = []
+        line_blocks: List[int] = []
+        block_pages: List[int] = []
+        crop_idx = 0
+        for page_idx, page_boxes in enumerate(boxes):
+            if page_boxes.shape[0] != len(word_preds[crop_idx: crop_idx + page_boxes.shape[0]]):
+                raise ValueError(f"Incompatible argument lengths: {page_boxes.shape[0]}, {len(word_preds)}")
+            if page_boxes.shape[0] > 0:
+                for block in self._resolve_structure(page_boxes):
+                    for line in block:
+                        word_idxs.append(crop_idx + np.asarray(line, dtype=np.int64))
+                        word_lines.append(np.full(len(line), len(line_blocks), dtype=np.int64))
+                        line_blocks.append(len(block_pages))
+                    block_pages.append(page_idx)
+            crop_idx += page_boxes.shape[0]
+
+        num_coords = 5 if self.rotated_bbox else 4
+        _idxs = np.concatenate(word_idxs) if len(word_idxs) > 0 else np.zeros(0, dtype=np.int64)
+        geometry = np.concatenate(boxes)[:, :num_coords] if len(boxes) > 0 else np.zeros((0, num_coords))
+
+        return ColumnarDocument(
+            [word_preds[idx][0] for idx in _idxs],
+            np.asarray([word_preds[idx][1] for idx in _idxs], dtype=np.float32),
+            geometry[_idxs],
+            np.concatenate(word_lines) if len(word_lines) > 0 else np.zeros(0, dtype=np.int64),
+            np.asarray(line_blocks, dtype=np.int64),
+            np.asarray(block_pages, dtype=np.int64),
+            page_shapes[:len(boxes)],
+        )
+
     def _build_blocks(self, boxes: np.ndarray, word_preds: List[Tuple[str, float]]) -> List[Block]:
         """Gather independent words in structured blocks
 
@@ -259,18 +475,7 @@ class DocumentBuilder(NestedObject):
         if boxes.shape[0] == 0:
             return []
 
-        # Decide whether we try to form lines
-        if self.resolve_lines:
-            lines = self._resolve_lines(boxes[:, :-1])
-            # Decide whether we try to form blocks
-            if self.resolve_blocks:
-                _blocks = self._resolve_blocks(boxes[:, :-1], lines)
-            else:
-                _blocks = [lines]
-        else:
-            # Sort bounding boxes, one line for all boxes, one block for the line
-            lines = [self._sort_boxes(boxes[:, :-1])]
-            _blocks = [lines]
+        _blocks = self._resolve_structure(boxes)
 
         blocks = [
             Block(
@@ -292,8 +497,13 @@ class DocumentBuilder(NestedObject):
         return blocks
 
     def extra_repr(self) -> str:
-        return (f"resolve_lines={self.resolve_lines}, resolve_blocks={self.resolve_blocks}, "
-                f"paragraph_break={self.paragraph_break}")
+        _repr = (f"resolve_lines={self.resolve_lines}, resolve_blocks={self.resolve_blocks}, "
+                 f"paragraph_break={self.paragraph_break}")
+        if self.block_resolver != 'clustering':
+            _repr += f", block_resolver='{self.block_resolver}'"
+        if self.columnar:
+            _repr += ", columnar=True"
+        return _repr
 
     def __call__(
         self,
@@ -312,6 +522,9 @@ class DocumentBuilder(NestedObject):
             list of documents
         """
 
+        if self.columnar:
+            return self._build_columnar(boxes, word_preds, page_shapes)
+
         # Check the number of crops for each page
         page_idx, crop_idx = 0, 0
         _pages = []
@@ -3,13 +3,25 @@
 # This program is licensed under the Apache License version 2.
 # See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
 
+import sys
+import multiprocessing
 import numpy as np
 import cv2
-from typing import List, Any, Optional, Dict, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Any, Optional, Dict, Set, Tuple
 
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None  # type: ignore[assignment]
+
+from doctr.file_utils import is_tf_available
 from doctr.utils.repr import NestedObject
-from .._utils import rotate_page, get_bitmap_angle
+from doctr.utils.profiling import stage
+from doctr.utils.metrics import nms, rbox_nms
+from .._utils import get_rotation_matrix, get_bitmap_angle, estimate_text_height
 from .. import PreProcessor
+from ..utils import binarize_prob_maps
 
 
 __all__ = ['DetectionModel', 'DetectionPostProcessor', 'DetectionPredictor']
@@ -23,6 +35,28 @@ class DetectionModel(NestedObject):
         self.cfg = cfg
 
 
+def _crop(page: np.ndarray, size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    """Crop a map to the valid (unpadded) region of the page"""
+    return page if size is None else page[:size[0], :size[1]]
+
+
+def _process_shared_page(
+    postprocessor: 'DetectionPostProcessor',
+    shm_name: str,
+    shape: Tuple[int, ...],
+    dtype: str,
+    idx: int,
+    size: Optional[Tuple[int, int]] = None,
+) -> Tuple[np.ndarray, float]:
+    """Postprocess a page of a batch of probability maps stored in shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # The outputs don't reference the shared buffer, which can then be closed
+        return postprocessor.process_page(_crop(np.ndarray(shape, dtype=dtype, buffer=shm.buf)[idx], size))
+    finally:
+        shm.close()
+
+
 class DetectionPostProcessor(NestedObject):
     """Abstract class to postprocess the raw output of the model
 
@@ -30,21 +64,55 @@ class DetectionPostProcessor(NestedObject):
         min_size_box (int): minimal length (pix) to keep a box
         max_candidates (int): maximum boxes to consider in a single page
         box_thresh (float): minimal objectness score to consider a box
+        num_workers (int): number of processes postprocessing the pages of a batch in parallel, the probability maps
+            being handed over through shared memory. The pages are processed sequentially when lower than 2.
+            The process pool is started on first use, and released by `close` or when leaving a `with` block
     """
 
     def __init__(
         self,
         box_thresh: float = 0.5,
         bin_thresh: float = 0.5,
-        rotated_bbox: bool = False
+        rotated_bbox: bool = False,
+        num_workers: int = 0,
     ) -> None:
 
         self.box_thresh = box_thresh
         self.bin_thresh = bin_thresh
         self.rotated_bbox = rotated_bbox
+        self.num_workers = num_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._shared_blocks: Set[str] = set()
 
     def extra_repr(self) -> str:
-        return f"box_thresh={self.box_thresh}"
+        _repr = f"box_thresh={self.box_thresh}"
+        if self.num_workers > 1:
+            _repr += f", num_workers={self.num_workers}"
+        return _repr
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The process pool stays in the parent process
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_shared_blocks'] = set()
+        return state
+
+    def __enter__(self) -> 'DetectionPostProcessor':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the process pool, and release the shared memory blocks still allocated"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for shm_name in list(self._shared_blocks):
+            shm = shared_memory.SharedMemory(name=shm_name)
+            shm.close()
+            shm.unlink()
+        self._shared_blocks.clear()
 
     @staticmethod
     def box_score(
@@ -56,64 +124,241 @@ class DetectionPostProcessor(NestedObject):
 
         Args:
             pred (np.ndarray): p map returned by the model
+            points (np.ndarray): absolute polygon of shape (N, 2) or (N, 1, 2)
+            rotated_bbox (bool): whether to average on the polygon itself rather than on its bounding box
 
         Returns:
             polygon objectness
         """
         h, w = pred.shape[:2]
+        _points = points.reshape(-1, 2)
+
+        xmin = np.clip(np.floor(_points[:, 0].min()).astype(np.int32), 0, w - 1)
+        xmax = np.clip(np.ceil(_points[:, 0].max()).astype(np.int32), 0, w - 1)
+        ymin = np.clip(np.floor(_points[:, 1].min()).astype(np.int32), 0, h - 1)
+        ymax = np.clip(np.ceil(_points[:, 1].max()).astype(np.int32), 0, h - 1)
 
         if not rotated_bbox:
-            xmin = np.clip(np.floor(points[:, 0].min()).astype(np.int32), 0, w - 1)
-            xmax = np.clip(np.ceil(points[:, 0].max()).astype(np.int32), 0, w - 1)
-            ymin = np.clip(np.floor(points[:, 1].min()).astype(np.int32), 0, h - 1)
-            ymax = np.clip(np.ceil(points[:, 1].max()).astype(np.int32), 0, h - 1)
             return pred[ymin:ymax + 1, xmin:xmax + 1].mean()
 
         else:
-            mask = np.zeros((h, w), np.int32)
-            cv2.fillPoly(mask, [points.astype(np.int32)], 1.0)
-            product = pred * mask
+            # Fill the polygon on its bounding region only
+            mask = np.zeros((ymax - ymin + 1, xmax - xmin + 1), np.int32)
+            cv2.fillPoly(mask, [_points.astype(np.int32) - np.array([xmin, ymin], dtype=np.int32)], 1.0)
+            product = pred[ymin:ymax + 1, xmin:xmax + 1] * mask
             return np.sum(product) / np.count_nonzero(product)
 
+    @staticmethod
+    def box_scores(
+        pred: np.ndarray,
+        boxes: np.ndarray,
+    ) -> np.ndarray:
+        """Compute the confidence score of straight boxes all at once: mean of the p values on each box,
+        using a summed-area table of the p map
+
+        Args:
+            pred (np.ndarray): p map returned by the model
+            boxes (np.ndarray): absolute boxes of shape (N, 4) in format (xmin, ymin, xmax, ymax), bounds included
+
+        Returns:
+            box objectness of shape (N,)
+        """
+        h, w = pred.shape[:2]
+        integral = cv2.integral(pred.astype(np.float32), sdepth=cv2.CV_64F)
+        xmin = np.clip(np.floor(boxes[:, 0]).astype(np.int32), 0, w - 1)
+        xmax = np.clip(np.ceil(boxes[:, 2]).astype(np.int32), 0, w - 1) + 1
+        ymin = np.clip(np.floor(boxes[:, 1]).astype(np.int32), 0, h - 1)
+        ymax = np.clip(np.ceil(boxes[:, 3]).astype(np.int32), 0, h - 1) + 1
+        sums = integral[ymax, xmax] - integral[ymin, xmax] - integral[ymax, xmin] + integral[ymin, xmin]
+        return sums / ((ymax - ymin) * (xmax - xmin))
+
+    def get_candidates(
+        self,
+        pred: np.ndarray,
+        bitmap: np.ndarray,
+        rot_mat: Optional[np.ndarray] = None,
+    ) -> Tuple[List[np.ndarray], np.ndarray]:
+        """Find candidate polygons on the bitmap and compute their objectness
+
+        Args:
+            pred: p map returned by the model
+            bitmap: binarized p map
+            rot_mat: optional (2, 3) transformation deskewing the page, polygons are then expressed on the deskewed page
+
+        Returns:
+            list of absolute polygons (4 corners of shape (4, 2) for straight boxes, contours of shape (N, 1, 2)
+            for rotated boxes), and their scores of shape (N,)
+        """
+        min_size_box = 1 + int(bitmap.shape[0] / 512)
+
+        if not self.rotated_bbox and rot_mat is None:
+            # Bounding rectangles of connected components, all scored at once with a summed-area table
+            _, _, stats, _ = cv2.connectedComponentsWithStats(bitmap.astype(np.uint8), connectivity=8)
+            x, y, w, h = stats[1:, :4].T
+            # Check whether smallest enclosing bounding box is not too small
+            keep = (w - 1 >= min_size_box) & (h - 1 >= min_size_box)
+            x, y, w, h = x[keep], y[keep], w[keep], h[keep]
+            scores = self.box_scores(pred, np.stack((x, y, x + w, y + h), axis=1))
+            corners = np.stack((
+                np.stack((x, y), axis=1), np.stack((x, y + h), axis=1),
+                np.stack((x + w, y + h), axis=1), np.stack((x + w, y), axis=1),
+            ), axis=1)
+            return list(corners), scores
+
+        polygons, scores = [], []
+        # get contours from connected components on the bitmap
+        contours, _ = cv2.findContours(bitmap.astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        inv_mat = None if rot_mat is None else cv2.invertAffineTransform(rot_mat)
+        for contour in contours:
+            # Contour on the deskewed page
+            _contour = contour if rot_mat is None else self.transform_points(contour, rot_mat)
+            # Check whether smallest enclosing bounding box is not too small
+            if np.any(_contour[:, 0].max(axis=0) - _contour[:, 0].min(axis=0) < min_size_box):
+                continue
+            # Compute objectness
+            if self.rotated_bbox:
+                polygons.append(_contour)
+                scores.append(self.box_score(pred, contour, rotated_bbox=True))
+            else:
+                x, y, w, h = cv2.boundingRect(_contour)
+                points = np.array([[x, y], [x, y + h], [x + w, y + h], [x + w, y]])
+                polygons.append(points)
+                # The straight box is a rotated polygon on the unrotated map
+                scores.append(self.box_score(pred, self.transform_points(points, inv_mat), rotated_bbox=True))
+
+        return polygons, np.asarray(scores, dtype=np.float64)
+
+    @staticmethod
+    def transform_points(
+        points: np.ndarray,
+        mat: np.ndarray,
+    ) -> np.ndarray:
+        """Apply an affine transformation to a set of absolute points (contour or polygon)
+
+        Args:
+            points: integer points of shape (N, 2) or (N, 1, 2)
+            mat: (2, 3) transformation matrix
+
+        Returns:
+            the transformed points, rounded to the nearest pixel, with the same shape
+        """
+        _points = cv2.transform(points.reshape(-1, 1, 2).astype(np.float32), mat)
+        return np.round(_points).astype(np.int32).reshape(points.shape)
+
     def bitmap_to_boxes(
         self,
         pred: np.ndarray,
         bitmap: np.ndarray,
+        rot_mat: Optional[np.ndarray] = None,
     ) -> np.ndarray:
         raise NotImplementedError
 
     def __call__(
         self,
         proba_map: np.ndarray,
+        sizes: Optional[List[Tuple[int, int]]] = None,
+        bitmaps: Optional[np.ndarray] = None,
     ) -> Tuple[List[np.ndarray], List[float]]:
         """Performs postprocessing for a list of model outputs
 
         Args:
-            proba_map: probability map of shape (N, H, W)
+            proba_map: probability map of shape (N, H, W), either float32 or quantized as uint8
+            sizes: size (H, W) of the valid region of each page, the bottom and right padding being ignored
+            bitmaps: binarized & opened probability maps of shape (N, H, W) (e.g. computed on the device by
+                `binarize_prob_maps`), otherwise computed from the probability maps
 
         returns:
             list of N tensors (for each input sample), with each tensor of shape (*, 5) or (*, 6),
             and a list of N angles (page orientations).
         """
 
-        bitmap = (proba_map > self.bin_thresh).astype(np.float32)
+        with stage("detection.postprocessing", pages=proba_map.shape[0]) as info:
+            _sizes: List[Optional[Tuple[int, int]]] = [None] * proba_map.shape[0] if sizes is None else list(sizes)
+            if self.num_workers > 1 and proba_map.shape[0] > 1:
+                results = self._parallel_process(proba_map, _sizes, bitmaps)
+            else:
+                results = [
+                    self.process_page(_crop(p_, size), None if bitmaps is None else _crop(bitmaps[idx], size))
+                    for idx, (p_, size) in enumerate(zip(proba_map, _sizes))
+                ]
+            boxes_batch = [boxes for boxes, _ in results]
+            angles_batch = [angle for _, angle in results]
+            info["boxes"] = sum(boxes.shape[0] for boxes in boxes_batch)
+
+        return boxes_batch, angles_batch
+
+    def process_page(
+        self,
+        proba_map: np.ndarray,
+        bitmap: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, float]:
+        """Performs postprocessing for a single page
 
-        boxes_batch, angles_batch = [], []
-        # Kernel for opening, empirical law for ksize
-        k_size = 1 + int(proba_map[0].shape[0] / 512)
-        kernel = np.ones((k_size, k_size), np.uint8)
+        Args:
+            proba_map: probability map of shape (H, W), either float32 or quantized as uint8
+            bitmap: binarized & opened probability map of shape (H, W), computed from `proba_map` if unspecified
 
-        for p_, bitmap_ in zip(proba_map, bitmap):
+        Returns:
+            boxes of shape (*, 5) or (*, 6), and the page orientation
+        """
+        if proba_map.dtype == np.uint8:
+            proba_map = proba_map.astype(np.float32) / 255
+        if bitmap is None:
+            bitmap = (proba_map > self.bin_thresh).astype(np.float32)
+            # Kernel for opening, empirical law for ksize
+            k_size = 1 + int(proba_map.shape[0] / 512)
+            kernel = np.ones((k_size, k_size), np.uint8)
             # Perform opening (erosion + dilatation)
-            bitmap_ = cv2.morphologyEx(bitmap_, cv2.MORPH_OPEN, kernel)
-            # Rotate bitmap and proba_map
-            angle = get_bitmap_angle(bitmap_)
-            angles_batch.append(angle)
-            bitmap_, p_ = rotate_page(bitmap_, -angle), rotate_page(p_, -angle)
-            boxes = self.bitmap_to_boxes(pred=p_, bitmap=bitmap_)
-            boxes_batch.append(boxes)
+            bitmap = cv2.morphologyEx(bitmap, cv2.MORPH_OPEN, kernel)
+        # Boxes are expressed on the deskewed page, without rotating the maps
+        angle = get_bitmap_angle(bitmap)
+        rot_mat = get_rotation_matrix(proba_map.shape, -angle)
+        boxes = self.bitmap_to_boxes(pred=proba_map, bitmap=bitmap, rot_mat=rot_mat)
 
-        return boxes_batch, angles_batch
+        return boxes, angle
+
+    def _parallel_process(
+        self,
+        proba_map: np.ndarray,
+        sizes: List[Optional[Tuple[int, int]]],
+        bitmaps: Optional[np.ndarray] = None,
+    ) -> List[Tuple[np.ndarray, float]]:
+        """Postprocess the pages of a batch in a process pool"""
+
+        if self._executor is None:
+            # Forking a process holding framework threads (and possibly a device context) is unsafe
+            pool_kwargs: Dict[str, Any] = {}
+            if sys.version_info >= (3, 7):
+                pool_kwargs['mp_context'] = multiprocessing.get_context('spawn')
+            self._executor = ProcessPoolExecutor(max_workers=self.num_workers, **pool_kwargs)
+
+        if shared_memory is None or bitmaps is not None:
+            # Compact maps (or no shared memory support) are simply copied to the workers
+            futures = [
+                self._executor.submit(
+                    self.process_page, _crop(p_, size), None if bitmaps is None else _crop(bitmaps[idx], size)
+                )
+                for idx, (p_, size) in enumerate(zip(proba_map, sizes))
+            ]
+            return [future.result() for future in futures]
+
+        proba_map = np.ascontiguousarray(proba_map)
+        shm = shared_memory.SharedMemory(create=True, size=proba_map.nbytes)
+        self._shared_blocks.add(shm.name)
+        try:
+            np.ndarray(proba_map.shape, dtype=proba_map.dtype, buffer=shm.buf)[:] = proba_map
+            futures = [
+                self._executor.submit(
+                    _process_shared_page, self, shm.name, proba_map.shape, proba_map.dtype.str, idx, size
+                )
+                for idx, size in enumerate(sizes)
+            ]
+            # Results are gathered in order
+            return [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+            self._shared_blocks.discard(shm.name)
 
 
 class DetectionPredictor(NestedObject):
@@ -122,6 +367,21 @@ class DetectionPredictor(NestedObject):
     Args:
         pre_processor: transform inputs for easier batched model inference
         model: core detection architecture
+        post_processor: converts the probability maps of the model into boxes. Defaults to the postprocessor
+            of the model
+        tiled: whether pages larger than the input size of the model should be processed at their native resolution,
+            as overlapping tiles
+        tile_overlap: minimum overlap between neighbouring tiles, as a fraction of the tile size
+        nms_thresh: IoU threshold to suppress the duplicate boxes of neighbouring tiles
+        dynamic_shapes: whether pages should be resized with their aspect ratio preserved, padded to a multiple of
+            the network stride, and batched by padded size, rather than squashed to the input size of the model
+        min_text_height: if specified, each page is resized (as with `dynamic_shapes`) to the smallest resolution
+            keeping its estimated character height above this number of pixels
+        long_side_range: bounds of the longest side of the pages resized according to their text height
+        binarize_on_device: whether the binarization and opening of the probability maps should be performed
+            batch-wise by the framework, only moving the uint8 bitmaps to the host
+        quantize_maps: whether the probability maps should be moved to the host as uint8 rather than float32, when
+            binarized on the device
     """
 
     _children_names: List[str] = ['pre_processor', 'model']
@@ -130,10 +390,190 @@ class DetectionPredictor(NestedObject):
         self,
         pre_processor: PreProcessor,
         model: DetectionModel,
+        post_processor: Optional[DetectionPostProcessor] = None,
+        tiled: bool = False,
+        tile_overlap: float = .2,
+        nms_thresh: float = .5,
+        dynamic_shapes: bool = False,
+        min_text_height: Optional[float] = None,
+        long_side_range: Tuple[int, int] = (256, 2048),
+        binarize_on_device: bool = False,
+        quantize_maps: bool = True,
     ) -> None:
 
         self.pre_processor = pre_processor
         self.model = model
+        self.post_processor = model.postprocessor if post_processor is None else post_processor  # type: ignore
+        if not 0 <= tile_overlap < 1:
+            raise ValueError("tile_overlap is expected to be in [0, 1)")
+        self.tiled = tiled
+        self.tile_overlap = tile_overlap
+        self.nms_thresh = nms_thresh
+        self.dynamic_shapes = dynamic_shapes
+        self.min_text_height = min_text_height
+        self.long_side_range = long_side_range
+        self.binarize_on_device = binarize_on_device
+        self.quantize_maps = quantize_maps
+
+    def extra_repr(self) -> str:
+        _repr = [f"tiled=True, tile_overlap={self.tile_overlap}"] if self.tiled else []
+        if self.dynamic_shapes:
+            _repr.append("dynamic_shapes=True")
+        if self.min_text_height is not None:
+            _repr.append(f"min_text_height={self.min_text_height}")
+        if self.binarize_on_device:
+            _repr.append(f"binarize_on_device=True, quantize_maps={self.quantize_maps}")
+        return ", ".join(_repr)
+
+    def __enter__(self) -> 'DetectionPredictor':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the resources held by the postprocessing (process pool and shared memory)"""
+        self.post_processor.close()
+
+    @property
+    def input_size(self) -> Tuple[int, int]:
+        """Size (H, W) of the samples fed to the model"""
+        if is_tf_available():
+            return self.pre_processor.resize.output_size
+        return self.pre_processor.resize.size  # type: ignore[attr-defined]
+
+    @staticmethod
+    def _to_numpy(out_map: Any) -> np.ndarray:
+        """Moves a batch of probability maps to the host, as a (N, H, W) array"""
+        if is_tf_available():
+            return np.squeeze(out_map.numpy(), axis=-1)
+        return out_map.squeeze(1).detach().cpu().numpy()
+
+    def _adaptive_long_side(self, page: np.ndarray, stride: int = 32) -> int:
+        """Smallest size of the longest side of a page keeping its characters above the minimum text height"""
+        text_height = estimate_text_height(page) if isinstance(page, np.ndarray) else 0.
+        if text_height == 0:
+            # Nothing to measure, fall back on the input size of the model
+            return max(self.input_size)
+        long_side = max(page.shape[:2]) * self.min_text_height / text_height  # type: ignore[operator]
+        return stride * round(min(max(long_side, self.long_side_range[0]), self.long_side_range[1]) / stride)
+
+    def _tile_starts(self, size: int, tile_size: int) -> List[int]:
+        """Offsets of the tiles covering a page dimension, the last tile being aligned on the page border"""
+        if size <= tile_size:
+            return [0]
+        stride = max(1, int(tile_size * (1 - self.tile_overlap)))
+        return list(range(0, size - tile_size, stride)) + [size - tile_size]
+
+    def _split_page(self, page: np.ndarray) -> Tuple[List[np.ndarray], List[int], List[int]]:
+        """Split a page into tiles of the input size of the model, at native resolution
+
+        Args:
+            page: image of shape (H, W, C)
+
+        Returns:
+            the tiles (padded like the preprocessor does when the page is smaller than the tile along a dimension),
+            and the vertical and horizontal offsets of the tile grid
+        """
+        tile_h, tile_w = self.input_size
+        ys, xs = self._tile_starts(page.shape[0], tile_h), self._tile_starts(page.shape[1], tile_w)
+        tiles = []
+        for y in ys:
+            for x in xs:
+                tile = page[y: y + tile_h, x: x + tile_w]
+                if tile.shape[:2] != (tile_h, tile_w):
+                    tile = np.pad(
+                        tile, ((0, tile_h - tile.shape[0]), (0, tile_w - tile.shape[1]), (0, 0)),
+                        constant_values=self.pre_processor.pad_value,
+                    )
+                tiles.append(tile)
+        return tiles, ys, xs
+
+    @staticmethod
+    def _core_bounds(starts: List[int], tile_size: int) -> np.ndarray:
+        """Limits of the part of each tile closer to its center than to the center of its neighbours"""
+        starts_ = np.asarray(starts, dtype=np.float32)
+        inner = (starts_[:-1] + tile_size + starts_[1:]) / 2
+        return np.concatenate(([-np.inf], inner, [np.inf]))
+
+    def _merge_tiles(
+        self,
+        preds: List[Tuple[np.ndarray, float]],
+        page_shape: Tuple[int, int],
+        ys: List[int],
+        xs: List[int],
+    ) -> Tuple[np.ndarray, float]:
+        """Map the predictions of the tiles of a page back to the page, and remove duplicates
+
+        Args:
+            preds: boxes & angle of each tile, in row-major order
+            page_shape: size (H, W) of the page
+            ys: vertical offsets of the tile grid
+            xs: horizontal offsets of the tile grid
+
+        Returns:
+            the boxes of the page relatively to its size, and its angle
+        """
+        height, width = page_shape
+        tile_h, tile_w = self.input_size
+        rotated = self.post_processor.rotated_bbox
+        # Tiles are expected to agree on the angle of the page
+        num_boxes = [boxes.shape[0] for boxes, _ in preds]
+        angle = float(np.average([angle for _, angle in preds], weights=num_boxes)) if sum(num_boxes) > 0 else 0.
+        page_mat = get_rotation_matrix((height, width), -angle)
+        y_bounds, x_bounds = self._core_bounds(ys, tile_h), self._core_bounds(xs, tile_w)
+
+        page_boxes, near_seams = [], []
+        for idx, (boxes, tile_angle) in enumerate(preds):
+            if boxes.shape[0] == 0:
+                continue
+            row, col = divmod(idx, len(xs))
+            # Box centers & sizes in absolute coordinates, on the deskewed tile
+            scale = np.array([tile_w, tile_h], dtype=np.float32)
+            if rotated:
+                centers, sizes = boxes[:, :2] * scale, boxes[:, 2:4] * scale
+            else:
+                centers, sizes = (boxes[:, :2] + boxes[:, 2:4]) / 2 * scale, (boxes[:, 2:4] - boxes[:, :2]) * scale
+            # Centers on the page
+            tile_mat = get_rotation_matrix((tile_h, tile_w), -tile_angle)
+            if tile_mat is not None:
+                centers = cv2.transform(centers[:, None].astype(np.float32), cv2.invertAffineTransform(tile_mat))[:, 0]
+            centers = centers + np.array([xs[col], ys[row]], dtype=np.float32)
+            # Each box is kept by the tile it is the most central to
+            is_kept = (
+                (centers[:, 0] >= x_bounds[col]) & (centers[:, 0] < x_bounds[col + 1]) &
+                (centers[:, 1] >= y_bounds[row]) & (centers[:, 1] < y_bounds[row + 1])
+            )
+            # Whether the box may reach past the limits of the tile core (its radius bounds its extent)
+            radii = np.linalg.norm(sizes, axis=1) / 2
+            near_seams.append((
+                (np.abs(centers[:, :1] - x_bounds[1:-1]).min(axis=1, initial=np.inf) < radii) |
+                (np.abs(centers[:, 1:2] - y_bounds[1:-1]).min(axis=1, initial=np.inf) < radii)
+            )[is_kept])
+            if page_mat is not None:
+                centers = cv2.transform(centers[:, None].astype(np.float32), page_mat)[:, 0]
+            page_boxes.append(np.concatenate((centers, sizes, boxes[:, 4:]), axis=1)[is_kept])
+
+        if len(page_boxes) == 0:
+            return np.zeros((0, 6 if rotated else 5), dtype=np.float32), angle
+        # (x, y, w, h, [alpha,] score) in absolute coordinates
+        _boxes = np.concatenate(page_boxes).astype(np.float32)
+        # Duplicates come from distinct tiles, so one of them reaches past a seam, and the other one is within its
+        # reach: only those boxes go through the suppression
+        seam_idxs = np.where(np.concatenate(near_seams))[0]
+        radii = np.linalg.norm(_boxes[:, 2:4], axis=1) / 2
+        dists = np.linalg.norm(_boxes[:, None, :2] - _boxes[None, seam_idxs, :2], axis=-1)
+        is_candidate = (dists < radii[:, None] + radii[None, seam_idxs]).any(axis=1)
+        candidates = np.where(is_candidate)[0]
+        if not rotated:
+            _boxes = np.concatenate((_boxes[:, :2] - _boxes[:, 2:4] / 2, _boxes[:, :2] + _boxes[:, 2:4] / 2,
+                                     _boxes[:, 4:]), axis=1)
+        if candidates.size > 0:
+            keep = (rbox_nms if rotated else nms)(_boxes[candidates], self.nms_thresh)
+            _boxes = _boxes[np.sort(np.concatenate((np.where(~is_candidate)[0], candidates[keep])))]
+        _boxes[:, :4] = np.clip(_boxes[:, :4] / np.array([width, height, width, height]), 0, 1)
+
+        return _boxes, angle
 
     def __call__(
         self,
@@ -145,9 +585,81 @@ class DetectionPredictor(NestedObject):
         if any(page.ndim != 3 for page in pages):
             raise ValueError("incorrect input shape: all pages are expected to be multi-channel 2D images.")
 
-        processed_batches = self.pre_processor(pages)
-        predicted_batches = [
-            self.model(batch, return_boxes=True, **kwargs)['preds']  # type:ignore[operator]
-            for batch in processed_batches
-        ]
-        return [pred for batch in predicted_batches for pred in zip(*batch)]
+        # Pages larger than the model input are split into tiles
+        layouts: List[Optional[Tuple[List[int], List[int]]]] = [None] * len(pages)
+        samples = pages
+        if self.tiled and isinstance(pages, list):
+            tile_h, tile_w = self.input_size
+            samples = []
+            for idx, page in enumerate(pages):
+                if page.shape[0] > tile_h or page.shape[1] > tile_w:
+                    tiles, ys, xs = self._split_page(page)
+                    samples.extend(tiles)
+                    layouts[idx] = (ys, xs)
+                else:
+                    samples.append(page)
+
+        dynamic_shapes = (self.dynamic_shapes or self.min_text_height is not None) and isinstance(samples, list)
+        long_sides = None
+        if dynamic_shapes and self.min_text_height is not None:
+            with stage("detection.text_height_estimation", pages=len(samples)):
+                long_sides = [self._adaptive_long_side(sample) for sample in samples]
+
+        with stage("detection.preprocessing", pages=len(pages)) as info:
+            if dynamic_shapes:
+                # Samples are batched by shape, the padding being ignored by the postprocessing
+                processed_batches, order, sizes = self.pre_processor.dynamic_batches(samples, long_sides=long_sides)
+            else:
+                processed_batches = self.pre_processor(samples)
+            info["batches"] = len(processed_batches)
+
+        predicted_batches = []
+        # The postprocessing of a batch runs in the background while the next one goes through the model
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending: Optional[Future] = None
+            offset = 0
+            for batch in processed_batches:
+                with stage("detection.forward", shape=batch.shape):
+                    out_map = self.model(batch, return_model_output=True, **kwargs)['out_map']  # type:ignore[operator]
+                    bitmaps: Optional[np.ndarray] = None
+                    if self.binarize_on_device:
+                        # Only compact maps cross into numpy
+                        prob_map, bitmaps = binarize_prob_maps(
+                            out_map, self.post_processor.bin_thresh, self.quantize_maps
+                        )
+                    else:
+                        prob_map = self._to_numpy(out_map)
+                batch_sizes: Optional[List[Tuple[int, int]]] = None
+                if dynamic_shapes:
+                    batch_sizes = [sizes[idx] for idx in order[offset: offset + prob_map.shape[0]]]
+                offset += prob_map.shape[0]
+                # Wait for the previous batch, so that at most one probability map is pending
+                if pending is not None:
+                    predicted_batches.append(pending.result())
+                pending = executor.submit(self.post_processor, prob_map, batch_sizes, bitmaps)
+            if pending is not None:
+                predicted_batches.append(pending.result())
+
+        preds = [pred for batch in predicted_batches for pred in zip(*batch)]
+        if dynamic_shapes:
+            # Restore the order of the samples
+            sorted_preds = preds.copy()
+            for pred, idx in zip(sorted_preds, order):
+                preds[idx] = pred
+        if all(layout is None for layout in layouts):
+            return preds
+
+        # Gather the tiles of each page
+        out, offset = [], 0
+        for page, layout in zip(pages, layouts):
+            if layout is None:
+                out.append(preds[offset])
+                offset += 1
+            else:
+                ys, xs = layout
+                num_tiles = len(ys) * len(xs)
+                with stage("detection.tile_merging", tiles=num_tiles):
+                    out.append(self._merge_tiles(preds[offset: offset + num_tiles], page.shape[:2], ys, xs))
+                offset += num_tiles
+
+        return out
@@ -76,16 +76,40 @@ class DBPostProcessor(DetectionPostProcessor):
             return None
         return fit_rbbox(expanded_points) if self.rotated_bbox else cv2.boundingRect(expanded_points)
 
+    def unclip_rectangles(
+        self,
+        rects: np.ndarray,
+    ) -> np.ndarray:
+        """Expand straight rectangles in closed form, equivalently to `polygon_to_box`: a round-joined offset of a
+        rectangle by a distance d has the rectangle grown by d on each side as bounding box
+
+        Args:
+            rects: absolute rectangles of shape (N, 4), in format (xmin, ymin, xmax, ymax)
+
+        Returns:
+            the expanded boxes of shape (N, 4) in format (x, y, w, h), following `cv2.boundingRect` conventions
+        """
+        widths, heights = rects[:, 2] - rects[:, 0], rects[:, 3] - rects[:, 1]
+        # distance = area * unclip_ratio / perimeter
+        distances = widths * heights * self.unclip_ratio / (2 * (widths + heights))
+        # Offset corners are rounded half away from zero, as in pyclipper
+        _rects = rects + distances[:, None] * np.array([-1, -1, 1, 1])
+        _rects = np.sign(_rects) * np.floor(np.abs(_rects) + .5)
+        # Bounding rectangles include both extreme pixels
+        return np.concatenate((_rects[:, :2], _rects[:, 2:] - _rects[:, :2] + 1), axis=1)
+
     def bitmap_to_boxes(
         self,
         pred: np.ndarray,
         bitmap: np.ndarray,
+        rot_mat: Optional[np.ndarray] = None,
     ) -> np.ndarray:
         """Compute boxes from a bitmap/pred_map
 
         Args:
             pred: Pred map from differentiable binarization output
             bitmap: Bitmap map computed from pred (binarized)
+            rot_mat: optional (2, 3) transformation deskewing the page, boxes are then expressed on the deskewed page
 
         Returns:
             np tensor boxes for the bitmap, each box is a 5-element list
@@ -94,47 +118,38 @@ class DBPostProcessor(DetectionPostProcessor):
         height, width = bitmap.shape[:2]
         min_size_box = 1 + int(height / 512)
         boxes = []
-        # get contours from connected components on the bitmap
-        contours, _ = cv2.findContours(bitmap.astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        for contour in contours:
-            # Check whether smallest enclosing bounding box is not too small
-            if np.any(contour[:, 0].max(axis=0) - contour[:, 0].min(axis=0) < min_size_box):
-                continue
-            # Compute objectness
-            if self.rotated_bbox:
-                score = self.box_score(pred, contour, rotated_bbox=True)
-            else:
-                x, y, w, h = cv2.boundingRect(contour)
-                points = np.array([[x, y], [x, y + h], [x + w, y + h], [x + w, y]])
-                score = self.box_score(pred, points, rotated_bbox=False)
-
+        polygons, scores = self.get_candidates(pred, bitmap, rot_mat)
+
+        if not self.rotated_bbox:
+            if len(polygons) == 0:
+                return np.zeros((0, 5), dtype=np.float32)
+            # Straight candidates are rectangles, all expanded at once
+            corners = np.asarray(polygons)
+            x, y, w, h = self.unclip_rectangles(np.concatenate((corners.min(axis=1), corners.max(axis=1)), axis=1)).T
+            # remove polygons with a weak objectness, and too small boxes
+            keep = (scores >= self.box_thresh) & (w >= min_size_box) & (h >= min_size_box)
+            # compute relative boxes to get rid of img shape
+            _boxes = np.stack((x / width, y / height, (x + w) / width, (y + h) / height, scores), axis=1)
+            return np.clip(_boxes[keep], 0, 1)
+
+        for polygon, score in zip(polygons, scores):
             if self.box_thresh > score:   # remove polygons with a weak objectness
                 continue
 
-            _box = self.polygon_to_box(np.squeeze(contour)) if self.rotated_bbox else self.polygon_to_box(points)
+            _box = self.polygon_to_box(np.squeeze(polygon))
 
             if _box is None or _box[2] < min_size_box or _box[3] < min_size_box:  # remove to small boxes
                 continue
 
-            if self.rotated_bbox:
-                x, y, w, h, alpha = _box  # type: ignore[misc]
-                # compute relative box to get rid of img shape
-                x, y, w, h = x / width, y / height, w / width, h / height
-                boxes.append([x, y, w, h, alpha, score])
-            else:
-                x, y, w, h = _box  # type: ignore[misc]
-                # compute relative polygon to get rid of img shape
-                xmin, ymin, xmax, ymax = x / width, y / height, (x + w) / width, (y + h) / height
-                boxes.append([xmin, ymin, xmax, ymax, score])
-
-        if self.rotated_bbox:
-            if len(boxes) == 0:
-                return np.zeros((0, 6), dtype=np.float32)
-            coord = np.clip(np.asarray(boxes)[:, :4], 0, 1)  # clip boxes coordinates
-            boxes = np.concatenate((coord, np.asarray(boxes)[:, 4:]), axis=1)
-            return boxes
-        else:
-            return np.clip(np.asarray(boxes), 0, 1) if len(boxes) > 0 else np.zeros((0, 5), dtype=np.float32)
+            x, y, w, h, alpha = _box  # type: ignore[misc]
+            # compute relative box to get rid of img shape
+            x, y, w, h = x / width, y / height, w / width, h / height
+            boxes.append([x, y, w, h, alpha, score])
+
+        if len(boxes) == 0:
+            return np.zeros((0, 6), dtype=np.float32)
+        coord = np.clip(np.asarray(boxes)[:, :4], 0, 1)  # clip boxes coordinates
+        return np.concatenate((coord, np.asarray(boxes)[:, 4:]), axis=1)
 
 
 class _DBNet:
@@ -171,11 +171,11 @@ class DBNet(_DBNet, nn.Module):
         if return_model_output or target is None or return_boxes:
             prob_map = torch.sigmoid(logits)
 
-        if return_model_output:
+        if return_model_output or target is None:
             out["out_map"] = prob_map
 
-        if target is None or return_boxes:
-            # Post-process boxes
+        if return_boxes:
+            # Post-process boxes (inference goes through the postprocessing stage of the predictor instead)
             out["preds"] = self.postprocessor(prob_map.squeeze(1).detach().cpu().numpy())
 
         if target is not None:
@@ -220,11 +220,11 @@ class DBNet(_DBNet, keras.Model, NestedObject):
         if return_model_output or target is None or return_boxes:
             prob_map = tf.math.sigmoid(logits)
 
-        if return_model_output:
+        if return_model_output or target is None:
             out["out_map"] = prob_map
 
-        if target is None or return_boxes:
-            # Post-process boxes
+        if return_boxes:
+            # Post-process boxes (inference goes through the postprocessing stage of the predictor instead)
             out["preds"] = self.postprocessor(tf.squeeze(prob_map, axis=-1).numpy())
 
         if target is not None:
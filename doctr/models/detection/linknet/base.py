@@ -7,7 +7,7 @@
 
 import numpy as np
 import cv2
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 
 from doctr.utils.geometry import fit_rbbox, rbbox_to_polygon
 from ..core import DetectionModel, DetectionPostProcessor
@@ -41,55 +41,43 @@ class LinkNetPostProcessor(DetectionPostProcessor):
         self,
         pred: np.ndarray,
         bitmap: np.ndarray,
+        rot_mat: Optional[np.ndarray] = None,
     ) -> np.ndarray:
         """Compute boxes from a bitmap/pred_map: find connected components then filter boxes
 
         Args:
             pred: Pred map from differentiable linknet output
             bitmap: Bitmap map computed from pred (binarized)
+            rot_mat: optional (2, 3) transformation deskewing the page, boxes are then expressed on the deskewed page
 
         Returns:
             np tensor boxes for the bitmap, each box is a 6-element list
                 containing x, y, w, h, alpha, score for the box
         """
         height, width = bitmap.shape[:2]
-        min_size_box = 1 + int(height / 512)
-        boxes = []
-        # get contours from connected components on the bitmap
-        contours, _ = cv2.findContours(bitmap.astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        for contour in contours:
-            # Check whether smallest enclosing bounding box is not too small
-            if np.any(contour[:, 0].max(axis=0) - contour[:, 0].min(axis=0) < min_size_box):
-                continue
-            # Compute objectness
-            if self.rotated_bbox:
-                score = self.box_score(pred, contour, rotated_bbox=True)
-            else:
-                x, y, w, h = cv2.boundingRect(contour)
-                points = np.array([[x, y], [x, y + h], [x + w, y + h], [x + w, y]])
-                score = self.box_score(pred, points, rotated_bbox=False)
-
-            if self.box_thresh > score:   # remove polygons with a weak objectness
-                continue
-
-            if self.rotated_bbox:
-                x, y, w, h, alpha = fit_rbbox(contour)
-                # compute relative box to get rid of img shape
-                x, y, w, h = x / width, y / height, w / width, h / height
-                boxes.append([x, y, w, h, alpha, score])
-            else:
-                # compute relative polygon to get rid of img shape
-                xmin, ymin, xmax, ymax = x / width, y / height, (x + w) / width, (y + h) / height
-                boxes.append([xmin, ymin, xmax, ymax, score])
+        polygons, scores = self.get_candidates(pred, bitmap, rot_mat)
+        # remove polygons with a weak objectness
+        keep = scores >= self.box_thresh
 
         if self.rotated_bbox:
+            boxes = []
+            for polygon, score in zip([poly for poly, _keep in zip(polygons, keep) if _keep], scores[keep]):
+                x, y, w, h, alpha = fit_rbbox(polygon)
+                # compute relative box to get rid of img shape
+                boxes.append([x / width, y / height, w / width, h / height, alpha, score])
             if len(boxes) == 0:
                 return np.zeros((0, 6), dtype=np.float32)
             coord = np.clip(np.asarray(boxes)[:, :4], 0, 1)  # clip boxes coordinates
-            boxes = np.concatenate((coord, np.asarray(boxes)[:, 4:]), axis=1)
-            return boxes
-        else:
-            return np.clip(np.asarray(boxes), 0, 1) if len(boxes) > 0 else np.zeros((0, 5), dtype=np.float32)
+            return np.concatenate((coord, np.asarray(boxes)[:, 4:]), axis=1)
+
+        if not np.any(keep):
+            return np.zeros((0, 5), dtype=np.float32)
+        # Top-left & bottom-right corners
+        corners = np.stack(polygons)[keep][:, [0, 2]].reshape(-1, 4).astype(np.float64)
+        # compute relative polygon to get rid of img shape
+        corners[:, [0, 2]] /= width
+        corners[:, [1, 3]] /= height
+        return np.clip(np.concatenate((corners, scores[keep, None]), axis=1), 0, 1)
 
 
 class _LinkNet(DetectionModel):
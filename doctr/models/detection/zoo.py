@@ -27,12 +27,21 @@ def _predictor(arch: str, pretrained: bool, **kwargs: Any) -> DetectionPredictor
 
     # Detection
     _model = detection.__dict__[arch](pretrained=pretrained)
+    _model.postprocessor.num_workers = kwargs.pop('postprocessing_workers', 0)
+    tiled = kwargs.pop('tiled', False)
+    dynamic_shapes = kwargs.pop('dynamic_shapes', False)
+    min_text_height = kwargs.pop('min_text_height', None)
+    binarize_on_device = kwargs.pop('binarize_on_device', False)
     kwargs['mean'] = kwargs.get('mean', _model.cfg['mean'])
     kwargs['std'] = kwargs.get('std', _model.cfg['std'])
     kwargs['batch_size'] = kwargs.get('batch_size', 1)
     predictor = DetectionPredictor(
         PreProcessor(_model.cfg['input_shape'][:2], **kwargs),
-        _model
+        _model,
+        tiled=tiled,
+        dynamic_shapes=dynamic_shapes,
+        min_text_height=min_text_height,
+        binarize_on_device=binarize_on_device,
     )
     return predictor
 
@@ -50,6 +59,16 @@ def detection_predictor(arch: str = 'db_resnet50', pretrained: bool = False, **k
     Args:
         arch: name of the architecture to use ('db_resnet50')
         pretrained: If True, returns a model pre-trained on our text detection dataset
+        postprocessing_workers: number of processes postprocessing the pages of a batch in parallel. The process pool
+            is kept alive across calls, and is released by `close()` or by using the predictor as a context manager
+        tiled: whether pages larger than the input size of the model should be processed as overlapping tiles,
+            at their native resolution
+        dynamic_shapes: whether pages should be resized with their aspect ratio preserved and batched by shape,
+            rather than squashed to the input size of the model
+        min_text_height: if specified, each page is resized to the smallest resolution keeping its estimated
+            character height above this number of pixels
+        binarize_on_device: whether the probability maps should be binarized by the framework, only moving compact
+            uint8 maps to the host
 
     Returns:
         Detection predictor
@@ -7,9 +7,11 @@ import math
 import torch
 from torch import nn
 import numpy as np
-from typing import List, Tuple, Union, Any
+from itertools import groupby
+from typing import List, Tuple, Union, Any, Optional
 from torchvision.transforms import transforms as T
 from torchvision.transforms import functional as F
+from torch.nn.functional import pad
 
 from doctr.transforms import Resize
 from doctr.utils.multithreading import multithread_exec
@@ -26,6 +28,8 @@ class PreProcessor(nn.Module):
         mean: mean value of the training distribution by channel
         std: standard deviation of the training distribution by channel
     """
+    # Value of the pixels added by the padding of the resizing, before normalization
+    pad_value: int = 0
 
     def __init__(
         self,
@@ -75,6 +79,65 @@ class PreProcessor(nn.Module):
 
         return x
 
+    def dynamic_batches(
+        self,
+        x: List[Union[np.ndarray, torch.Tensor]],
+        stride: int = 32,
+        long_sides: Optional[List[int]] = None,
+    ) -> Tuple[List[torch.Tensor], List[int], List[Tuple[int, int]]]:
+        """Resize samples with their aspect ratio preserved, their longest side matching the largest dimension of
+        the output size, pad them to a multiple of the stride, and batch the samples of identical padded size
+
+        Args:
+            x: list of images of shape (H, W, C) for arrays, (C, H, W) for tensors
+            stride: the padded sizes are multiples of it
+            long_sides: target size of the longest side of each sample, instead of the largest dimension of the
+                output size
+
+        Returns:
+            list of batches, the index in `x` of each batched sample, and the resized size of each sample of `x`
+        """
+
+        if long_sides is None:
+            long_sides = [max(self.resize.size)] * len(x)
+        sizes, padded_sizes = [], []
+        for sample, long_side in zip(x, long_sides):
+            height, width = sample.shape[:2] if isinstance(sample, np.ndarray) else sample.shape[-2:]
+            scale = long_side / max(height, width)
+            size = (max(1, round(height * scale)), max(1, round(width * scale)))
+            sizes.append(size)
+            padded_sizes.append((stride * math.ceil(size[0] / stride), stride * math.ceil(size[1] / stride)))
+        # Samples of the same padded size are batched together
+        order = sorted(range(len(x)), key=lambda idx: padded_sizes[idx])
+
+        def _transform(idx: int) -> torch.Tensor:
+            sample = x[idx]
+            if sample.ndim != 3:
+                raise AssertionError("expected list of 3D Tensors")
+            if isinstance(sample, np.ndarray):
+                sample = torch.from_numpy(sample.copy()).permute(2, 0, 1)
+            sample = F.resize(sample, sizes[idx], interpolation=self.resize.interpolation)
+            if sample.dtype == torch.uint8:
+                sample = sample.to(dtype=torch.float32).div(255).clip(0, 1)
+            # Pad on the bottom & right sides (inverted in pytorch)
+            return pad(sample, (0, padded_sizes[idx][1] - sizes[idx][1], 0, padded_sizes[idx][0] - sizes[idx][0]))
+
+        samples = list(multithread_exec(_transform, order))
+        batches: List[torch.Tensor] = []
+        start = 0
+        for _, group in groupby(order, key=lambda idx: padded_sizes[idx]):
+            end = start + len(list(group))
+            batches.extend(
+                torch.stack(samples[idx: min(idx + self.batch_size, end)], dim=0)
+                for idx in range(start, end, self.batch_size)
+            )
+            start = end
+
+        # Batch transforms (normalize)
+        batches = list(multithread_exec(self.normalize, batches))
+
+        return batches, order, sizes
+
     def __call__(
         self,
         x: Union[torch.Tensor, np.ndarray, List[Union[torch.Tensor, np.ndarray]]]
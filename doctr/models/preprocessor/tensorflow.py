@@ -6,7 +6,8 @@
 import math
 import tensorflow as tf
 import numpy as np
-from typing import List, Tuple, Union, Any
+from itertools import groupby
+from typing import List, Tuple, Union, Any, Optional
 
 from doctr.utils.repr import NestedObject
 from doctr.transforms import Normalize, Resize
@@ -27,6 +28,8 @@ class PreProcessor(NestedObject):
     """
 
     _children_names: List[str] = ['resize', 'normalize']
+    # Value of the pixels added by the padding of the resizing, before normalization
+    pad_value: int = 0
 
     def __init__(
         self,
@@ -76,6 +79,64 @@ class PreProcessor(NestedObject):
 
         return x
 
+    def dynamic_batches(
+        self,
+        x: List[Union[np.ndarray, tf.Tensor]],
+        stride: int = 32,
+        long_sides: Optional[List[int]] = None,
+    ) -> Tuple[List[tf.Tensor], List[int], List[Tuple[int, int]]]:
+        """Resize samples with their aspect ratio preserved, their longest side matching the largest dimension of
+        the output size, pad them to a multiple of the stride, and batch the samples of identical padded size
+
+        Args:
+            x: list of images of shape (H, W, C)
+            stride: the padded sizes are multiples of it
+            long_sides: target size of the longest side of each sample, instead of the largest dimension of the
+                output size
+
+        Returns:
+            list of batches, the index in `x` of each batched sample, and the resized size of each sample of `x`
+        """
+
+        if long_sides is None:
+            long_sides = [max(self.resize.output_size)] * len(x)
+        sizes, padded_sizes = [], []
+        for sample, long_side in zip(x, long_sides):
+            scale = long_side / max(sample.shape[:2])
+            size = (max(1, round(sample.shape[0] * scale)), max(1, round(sample.shape[1] * scale)))
+            sizes.append(size)
+            padded_sizes.append((stride * math.ceil(size[0] / stride), stride * math.ceil(size[1] / stride)))
+        # Samples of the same padded size are batched together
+        order = sorted(range(len(x)), key=lambda idx: padded_sizes[idx])
+
+        def _transform(idx: int) -> tf.Tensor:
+            sample = x[idx]
+            if sample.ndim != 3:
+                raise AssertionError("expected list of 3D Tensors")
+            if isinstance(sample, np.ndarray):
+                sample = tf.convert_to_tensor(sample)
+            if sample.dtype == tf.uint8:
+                sample = tf.image.convert_image_dtype(sample, dtype=tf.float32)
+            sample = tf.image.resize(sample, sizes[idx], method=self.resize.method)
+            # Pad on the bottom & right sides
+            return tf.image.pad_to_bounding_box(sample, 0, 0, *padded_sizes[idx])
+
+        samples = list(multithread_exec(_transform, order))
+        batches: List[tf.Tensor] = []
+        start = 0
+        for _, group in groupby(order, key=lambda idx: padded_sizes[idx]):
+            end = start + len(list(group))
+            batches.extend(
+                tf.stack(samples[idx: min(idx + self.batch_size, end)], axis=0)
+                for idx in range(start, end, self.batch_size)
+            )
+            start = end
+
+        # Batch transforms (normalize)
+        batches = list(multithread_exec(self.normalize, batches))
+
+        return batches, order, sizes
+
     def __call__(
         self,
         x: Union[tf.Tensor, np.ndarray, List[Union[tf.Tensor, np.ndarray]]]
@@ -1,4 +1,5 @@
 from .core import *
+from .cache import *
 from .crnn import *
 from .master import *
 from .sar import *
@@ -0,0 +1,188 @@
+# Copyright (C) 2021, Mindee.
+
+# This program is licensed under the Apache License version 2.
+# See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
+
+import hashlib
+from collections import OrderedDict
+from typing import Tuple, Optional, Dict, List
+import numpy as np
+import cv2
+
+from doctr.utils.repr import NestedObject
+
+__all__ = ['RecognitionCache']
+
+
+class RecognitionCache(NestedObject):
+    """Implements a least-recently-used cache of recognized crops. Crops are compared on their normalized thumbnail
+    (grayscale, fixed height, stretched contrast), which is robust to small changes of size or lighting: a looked up
+    crop matches the closest cached one of the same bucket (model & thumbnail shape), if their thumbnails differ by
+    at most the tolerance.
+
+    Example::
+        >>> import numpy as np
+        >>> from doctr.models import recognition_predictor, RecognitionCache
+        >>> model = recognition_predictor(pretrained=True, cache=RecognitionCache(max_size=10000))
+        >>> input_crop = (255 * np.random.rand(32, 128, 3)).astype(np.uint8)
+        >>> out = model([input_crop, input_crop])
+        >>> model.cache.stats()
+        {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+    Args:
+        max_size: maximum number of predictions to keep
+        thumbnail_height: height of the thumbnails the crops are compared on
+        tolerance: maximum mean absolute difference between the thumbnails (in [0, 255]) of matching crops
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        thumbnail_height: int = 16,
+        tolerance: float = 4.,
+    ) -> None:
+
+        self.max_size = max_size
+        self.thumbnail_height = thumbnail_height
+        self.tolerance = tolerance
+        # Entries by id, from the least to the most recently used, and ids of the entries of each bucket
+        self._entries: 'OrderedDict[int, Tuple[bytes, Tuple[str, float], np.ndarray]]' = OrderedDict()
+        self._buckets: Dict[bytes, List[int]] = {}
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    def extra_repr(self) -> str:
+        return f"max_size={self.max_size}"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def thumbnail(self, crop: np.ndarray) -> np.ndarray:
+        """Computes the normalized thumbnail of a crop, which only depends on its aspect ratio and its relative
+        intensities
+
+        Args:
+            crop: image of shape (H, W, C)
+
+        Returns:
+            the grayscale thumbnail, of height `thumbnail_height`, as uint8
+        """
+        gray = crop.astype(np.float32).mean(axis=-1)
+        width = min(max(1, round(self.thumbnail_height * crop.shape[1] / crop.shape[0])), 16 * self.thumbnail_height)
+        thumb = cv2.resize(gray, (width, self.thumbnail_height), interpolation=cv2.INTER_AREA)
+        # Stretch the contrast
+        low, high = thumb.min(), thumb.max()
+        return np.round((thumb - low) * 255 / max(high - low, 1e-6)).astype(np.uint8)
+
+    @staticmethod
+    def key(thumbnail: np.ndarray, namespace: str = "") -> bytes:
+        """Computes the key of the bucket of a crop. It doesn't depend on the intensities of the thumbnail, so that
+        close thumbnails never fall on both sides of a quantization boundary, and only thumbnails of the same shape
+        can match anyway
+
+        Args:
+            thumbnail: normalized thumbnail of the crop, as returned by `thumbnail`
+            namespace: identifier of the model the prediction comes from
+
+        Returns:
+            the digest of the bucket
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{namespace}|{thumbnail.shape}".encode())
+        return digest.digest()
+
+    def _matches(self, thumbnail: np.ndarray, other: np.ndarray) -> bool:
+        return thumbnail.shape == other.shape and \
+            float(np.abs(thumbnail.astype(np.int16) - other).mean()) <= self.tolerance
+
+    def _closest(self, key: bytes, thumbnail: np.ndarray) -> Optional[int]:
+        """Id of the entry of the bucket whose thumbnail is the closest to the given one, within the tolerance"""
+        ids = self._buckets.get(key, [])
+        if len(ids) == 0:
+            return None
+        others = np.stack([self._entries[_id][2] for _id in ids])
+        diffs = np.abs(others.astype(np.int16) - thumbnail).mean(axis=(1, 2))
+        idx = int(diffs.argmin())
+        return ids[idx] if diffs[idx] <= self.tolerance else None
+
+    def get(self, key: bytes, thumbnail: np.ndarray) -> Optional[Tuple[str, float]]:
+        """Look up the prediction of a crop, and count the hit or miss
+
+        Args:
+            key: key of the bucket of the crop
+            thumbnail: normalized thumbnail of the crop
+
+        Returns:
+            the cached prediction, if any
+        """
+        _id = self._closest(key, thumbnail)
+        if _id is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(_id)
+        return self._entries[_id][1]
+
+    def lookup(
+        self,
+        keys: List[bytes],
+        thumbnails: List[np.ndarray],
+    ) -> Tuple[List[Optional[Tuple[str, float]]], List[List[int]]]:
+        """Look up the predictions of a set of crops, where the repetitions of a missing crop count as hits since it
+        only needs to be identified once
+
+        Args:
+            keys: key of the bucket of each crop
+            thumbnails: normalized thumbnail of each crop
+
+        Returns:
+            the cached prediction of each crop (if any), and the groups of indices of the missing crops sharing the
+            same prediction, the first one of each group being identified
+        """
+        preds: List[Optional[Tuple[str, float]]] = []
+        groups: List[List[int]] = []
+        pending: Dict[bytes, List[List[int]]] = {}
+        for idx, (key, thumbnail) in enumerate(zip(keys, thumbnails)):
+            group = next(
+                (group for group in pending.get(key, []) if self._matches(thumbnails[group[0]], thumbnail)), None
+            )
+            if group is not None:
+                self.hits += 1
+                group.append(idx)
+                preds.append(None)
+                continue
+            pred = self.get(key, thumbnail)
+            if pred is None:
+                groups.append([idx])
+                pending.setdefault(key, []).append(groups[-1])
+            preds.append(pred)
+        return preds, groups
+
+    def put(self, key: bytes, pred: Tuple[str, float], thumbnail: np.ndarray) -> None:
+        """Store the prediction of a crop, evicting the least recently used ones beyond the maximum size
+
+        Args:
+            key: key of the bucket of the crop
+            pred: predicted sequence & confidence
+            thumbnail: normalized thumbnail of the crop
+        """
+        self._entries[self._next_id] = (key, pred, thumbnail)
+        self._buckets.setdefault(key, []).append(self._next_id)
+        self._next_id += 1
+        while len(self._entries) > self.max_size:
+            _id, (_key, _, _) = self._entries.popitem(last=False)
+            self._buckets[_key].remove(_id)
+            if len(self._buckets[_key]) == 0:
+                del self._buckets[_key]
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics"""
+        self._entries.clear()
+        self._buckets.clear()
+        self.hits, self.misses = 0, 0
+
+    def stats(self) -> Dict[str, float]:
+        """Hit-rate statistics of the cache"""
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups > 0 else 0.}
@@ -3,15 +3,19 @@
 # This program is licensed under the Apache License version 2.
 # See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
 
-from typing import Tuple, List, Any
+import math
+from typing import Tuple, List, Any, Union, Optional, Dict
 import numpy as np
 
 from ..preprocessor import PreProcessor
+from doctr.file_utils import is_tf_available
 from doctr.utils.repr import NestedObject
+from doctr.utils.profiling import stage
 from doctr.datasets import encode_sequences
+from .cache import RecognitionCache
 
 
-__all__ = ['RecognitionPostProcessor', 'RecognitionModel', 'RecognitionPredictor']
+__all__ = ['RecognitionPostProcessor', 'RecognitionModel', 'RecognitionPredictor', 'CascadeRecognitionPredictor']
 
 
 class RecognitionModel(NestedObject):
@@ -19,6 +23,23 @@ class RecognitionModel(NestedObject):
 
     vocab: str
     max_length: int
+    # Whether the architecture can process inputs of variable width
+    dynamic_width: bool = False
+    # Whether the architecture can stop the decoding of each sample early, given the aspect ratio of the crop
+    step_caps: bool = False
+    # Width of the narrowest characters, relative to the crop height
+    min_char_ratio: float = .2
+
+    def max_steps(self, aspect_ratios: np.ndarray) -> np.ndarray:
+        """Upper bound of the number of characters of crops, given their aspect ratio
+
+        Args:
+            aspect_ratios: aspect ratio (width / height) of each crop
+
+        Returns:
+            the maximum number of characters of each crop
+        """
+        return np.minimum(np.ceil(aspect_ratios / self.min_char_ratio), self.max_length).astype(np.int64)
 
     def compute_target(
         self,
@@ -68,6 +89,11 @@ class RecognitionPredictor(NestedObject):
     Args:
         pre_processor: transform inputs for easier batched model inference
         model: core detection architecture
+        bucketing: whether crops should be batched by aspect ratio
+        width_step: granularity of the input width of a batch, for architectures that accept variable widths
+        step_caps: whether the decoding steps of each crop are capped given its aspect ratio, for architectures that
+            support it
+        cache: cache of the predictions of previously identified crops
     """
 
     _children_names: List[str] = ['pre_processor', 'model']
@@ -76,14 +102,88 @@ class RecognitionPredictor(NestedObject):
         self,
         pre_processor: PreProcessor,
         model: RecognitionModel,
+        bucketing: bool = False,
+        width_step: int = 16,
+        step_caps: bool = False,
+        cache: Optional[RecognitionCache] = None,
     ) -> None:
 
         self.pre_processor = pre_processor
         self.model = model
+        self.bucketing = bucketing
+        self.width_step = width_step
+        self.step_caps = step_caps
+        self.cache = cache
+
+    def extra_repr(self) -> str:
+        flags = [f"{name}=True" for name in ('bucketing', 'step_caps') if getattr(self, name)]
+        return ", ".join(flags + ([f"cache={self.cache}"] if self.cache is not None else []))
+
+    @property
+    def input_size(self) -> Tuple[int, int]:
+        """Size (H, W) of the samples fed to the model"""
+        if is_tf_available():
+            return self.pre_processor.resize.output_size
+        return self.pre_processor.resize.size  # type: ignore[attr-defined]
+
+    def _trim_batches(self, batches: List[Any], crops: List[np.ndarray]) -> List[Any]:
+        """Remove the right padding shared by all the samples of each batch
+
+        Args:
+            batches: list of batched crops, built from crops sorted by increasing aspect ratio
+            crops: the sorted crops
+
+        Returns:
+            list of batches, each with the narrowest width fitting all its samples
+        """
+        height, width = self.input_size
+        batch_size = self.pre_processor.batch_size
+
+        trimmed = []
+        for idx, batch in enumerate(batches):
+            # Crops are sorted, the last one of the batch is the widest
+            widest = crops[min((idx + 1) * batch_size, len(crops)) - 1]
+            batch_width = min(width, self.width_step * math.ceil(height * widest.shape[1] / widest.shape[0] /
+                                                                 self.width_step))
+            trimmed.append(batch[:, :, :batch_width] if is_tf_available() else batch[..., :batch_width])
+
+        return trimmed
 
     def __call__(
         self,
-        crops: List[np.ndarray],
+        crops: Union[List[np.ndarray], np.ndarray],
+        **kwargs: Any,
+    ) -> List[Tuple[str, float]]:
+
+        if self.cache is None:
+            return self._predict(crops, **kwargs)
+
+        with stage("recognition.cache", crops=len(crops)) as info:
+            thumbnails = [self.cache.thumbnail(crop) for crop in crops]
+            keys = [self.cache.key(thumbnail, self._cache_namespace) for thumbnail in thumbnails]
+            preds, groups = self.cache.lookup(keys, thumbnails)
+            info["hits"] = len(crops) - len(groups)
+
+        # Each group of similar crops missing from the cache is only identified once
+        if len(groups) > 0:
+            idxs = [group[0] for group in groups]
+            _crops = crops[idxs] if isinstance(crops, np.ndarray) else [crops[idx] for idx in idxs]
+            for group, pred in zip(groups, self._predict(_crops, **kwargs)):
+                self.cache.put(keys[group[0]], pred, thumbnails[group[0]])
+                for idx in group:
+                    preds[idx] = pred
+
+        return preds  # type: ignore[return-value]
+
+    @property
+    def _cache_namespace(self) -> str:
+        # Predictions of distinct models sharing a cache are kept apart
+        cfg = getattr(self.model, 'cfg', None) or {}
+        return f"{self.model.__class__.__name__}|{cfg.get('backbone', '')}|{self.model.vocab}"
+
+    def _predict(
+        self,
+        crops: Union[List[np.ndarray], np.ndarray],
         **kwargs: Any,
     ) -> List[Tuple[str, float]]:
 
@@ -93,16 +193,126 @@ class RecognitionPredictor(NestedObject):
             if any(crop.ndim != 3 for crop in crops):
                 raise ValueError("incorrect input shape: all crops are expected to be multi-channel 2D images.")
 
+            bucketing = self.bucketing and isinstance(crops, list)
+            if bucketing:
+                # Sort crops by aspect ratio to batch similar shapes together
+                order = np.argsort([crop.shape[1] / crop.shape[0] for crop in crops], kind='stable')
+                crops = [crops[idx] for idx in order]
+
             # Resize & batch them
-            processed_batches = self.pre_processor(crops)
+            with stage("recognition.preprocessing", crops=len(crops)) as info:
+                if isinstance(crops, np.ndarray):
+                    # Already resized crops (e.g. from `extract_crops_batch`)
+                    batch_size = self.pre_processor.batch_size
+                    processed_batches = [
+                        self.pre_processor(crops[idx: idx + batch_size])[0] for idx in range(0, len(crops), batch_size)
+                    ]
+                else:
+                    processed_batches = self.pre_processor(crops)
+                # Narrow buckets don't need the padding of the fixed input shape
+                resize = self.pre_processor.resize
+                if bucketing and getattr(self.model, 'dynamic_width', False) and resize.preserve_aspect_ratio and \
+                        not resize.symmetric_pad:
+                    processed_batches = self._trim_batches(processed_batches, crops)
+                info["batches"] = len(processed_batches)
+
+            # Aspect ratio of each crop, to cap its decoding steps
+            aspect_ratios = None
+            if self.step_caps and getattr(self.model, 'step_caps', False) and isinstance(crops, list):
+                aspect_ratios = np.array([crop.shape[1] / crop.shape[0] for crop in crops])
 
             # Forward it
-            raw = [
-                self.model(batch, return_preds=True, **kwargs)['preds']  # type: ignore[operator]
-                for batch in processed_batches
-            ]
+            raw = []
+            batch_size = self.pre_processor.batch_size
+            for idx, batch in enumerate(processed_batches):
+                if aspect_ratios is not None:
+                    kwargs['aspect_ratios'] = aspect_ratios[idx * batch_size: (idx + 1) * batch_size]
+                # Includes the decoding
+                with stage("recognition.forward", shape=batch.shape):
+                    raw.append(self.model(batch, return_preds=True, **kwargs)['preds'])  # type: ignore[operator]
 
             # Process outputs
             out = [charseq for batch in raw for charseq in batch]
 
+            if bucketing:
+                # Restore the original order
+                sorted_out = out.copy()
+                for pred, idx in zip(sorted_out, order):
+                    out[idx] = pred
+
         return out
+
+
+class CascadeRecognitionPredictor(RecognitionPredictor):
+    """Implements a cascade of recognition predictors: all crops are identified by a fast predictor, and only the
+    ones it is not confident about are identified again by a stronger one.
+
+    Example::
+        >>> import numpy as np
+        >>> from doctr.models import recognition_predictor, CascadeRecognitionPredictor
+        >>> model = CascadeRecognitionPredictor(
+        ...     recognition_predictor('crnn_vgg16_bn', pretrained=True),
+        ...     recognition_predictor('sar_resnet31', pretrained=True),
+        ... )
+        >>> input_page = (255 * np.random.rand(32, 128, 3)).astype(np.uint8)
+        >>> out = model([input_page])
+
+    Args:
+        fast_predictor: predictor run on all crops
+        strong_predictor: predictor run on the crops where the fast one has a low confidence
+        conf_thresh: minimum confidence of the fast predictor to keep its prediction
+    """
+
+    _children_names: List[str] = ['pre_processor', 'model', 'strong_predictor']
+
+    def __init__(
+        self,
+        fast_predictor: RecognitionPredictor,
+        strong_predictor: RecognitionPredictor,
+        conf_thresh: float = .8,
+    ) -> None:
+
+        super().__init__(
+            fast_predictor.pre_processor,
+            fast_predictor.model,
+            fast_predictor.bucketing,
+            fast_predictor.width_step,
+            fast_predictor.step_caps,
+            fast_predictor.cache,
+        )
+        self.strong_predictor = strong_predictor
+        self.conf_thresh = conf_thresh
+
+    def extra_repr(self) -> str:
+        return ", ".join(filter(None, [super().extra_repr(), f"conf_thresh={self.conf_thresh}"]))
+
+    def __call__(  # type: ignore[override]
+        self,
+        crops: Union[List[np.ndarray], np.ndarray],
+        return_stages: bool = False,
+        **kwargs: Any,
+    ) -> Union[List[Tuple[str, float]], Tuple[List[Tuple[str, float]], List[int]]]:
+        """Identify the character sequences of crops
+
+        Args:
+            crops: list of crops, or array of already resized crops
+            return_stages: whether the index of the stage that answered for each crop (0 for the fast predictor,
+                1 for the strong one) should be returned as well
+
+        Returns:
+            the predicted sequence & confidence of each crop, and optionally the stage that answered
+        """
+
+        out = super().__call__(crops, **kwargs)
+        stages = [0] * len(out)
+
+        # Crops the fast predictor is not confident about
+        idxs = [idx for idx, (_, conf) in enumerate(out) if conf < self.conf_thresh]
+        with stage("recognition.cascade", crops=len(idxs)):
+            if len(idxs) > 0:
+                _crops = crops[idxs] if isinstance(crops, np.ndarray) else [crops[idx] for idx in idxs]
+                for idx, pred in zip(idxs, self.strong_predictor(_crops, **kwargs)):
+                    out[idx] = pred
+                    stages[idx] = 1
+
+        return (out, stages) if return_stages else out
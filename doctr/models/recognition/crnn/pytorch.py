@@ -4,7 +4,8 @@
 # See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
 
 from copy import deepcopy
-from itertools import groupby
+from functools import lru_cache
+import numpy as np
 import torch
 from torch import nn
 from torch.nn import functional as F
@@ -13,6 +14,7 @@ from typing import Tuple, Dict, Any, Optional, List
 from ... import backbones
 from ..core import RecognitionModel, RecognitionPostProcessor
 from ....datasets import VOCABS
+from doctr.utils.profiling import stage
 
 __all__ = ['CRNN', 'crnn_vgg16_bn', 'crnn_resnet31', 'CTCPostProcessor']
 
@@ -36,6 +38,12 @@ default_cfgs: Dict[str, Dict[str, Any]] = {
 }
 
 
+@lru_cache(maxsize=8)
+def _vocab_table(vocab: str) -> np.ndarray:
+    # Characters of the vocab, followed by the null character for all dropped positions
+    return np.array(list(vocab) + [''], dtype='<U1')
+
+
 class CTCPostProcessor(RecognitionPostProcessor):
     """
     Postprocess raw prediction of the model (logits) to a list of words using CTC decoding
@@ -51,7 +59,7 @@ class CTCPostProcessor(RecognitionPostProcessor):
         <https://github.com/githubharald/CTCDecoder>`_.
 
         Args:
-            logits: model output, shape: N x C x T
+            logits: model output, shape: N x T x C
             vocab: vocabulary to use
             blank: index of blank label
 
@@ -61,17 +69,22 @@ class CTCPostProcessor(RecognitionPostProcessor):
         # compute softmax
         probs = F.softmax(logits, dim=-1)
         # get char indices along best path
-        best_path = torch.argmax(probs, dim=1)
+        best_path = torch.argmax(probs, dim=-1)
         # define word proba as min proba of sequence
-        probs, _ = torch.max(probs, dim=1)
+        probs, _ = torch.max(probs, dim=-1)
         probs, _ = torch.min(probs, dim=1)
 
-        words = []
-        for sequence in best_path:
-            # collapse best path (using itertools.groupby), map to chars, join char list to string
-            collapsed = [vocab[k] for k, _ in groupby(sequence) if k != blank]
-            res = ''.join(collapsed)
-            words.append(res)
+        # collapse best path: only keep the first step of each run, and drop blanks
+        keep = torch.ones_like(best_path, dtype=torch.bool)
+        keep[:, 1:] = best_path[:, 1:] != best_path[:, :-1]
+        keep &= best_path != blank
+        best_path, keep = best_path.cpu().numpy(), keep.cpu().numpy()
+        # move the kept steps to the front of each sequence, and map the others to the null character
+        order = np.argsort(~keep, axis=1, kind='stable')
+        idxs = np.where(np.take_along_axis(keep, order, axis=1), np.take_along_axis(best_path, order, axis=1), -1)
+        # map to chars, each row of chars is then read as a single (null-padded) string
+        chars = _vocab_table(vocab)[idxs]
+        words = chars.view(f"<U{chars.shape[1]}")[:, 0].tolist() if chars.size > 0 else [''] * len(chars)
 
         return list(zip(words, probs.tolist()))
 
@@ -84,7 +97,7 @@ class CTCPostProcessor(RecognitionPostProcessor):
         with label_to_idx mapping dictionnary
 
         Args:
-            logits: raw output of the model, shape (N, C + 1, seq_len)
+            logits: raw output of the model, shape (N, seq_len, C + 1)
 
         Returns:
             A tuple of 2 lists: a list of str (words) and a list of float (probs)
@@ -106,6 +119,7 @@ class CRNN(RecognitionModel, nn.Module):
     """
 
     _children_names: List[str] = ['feat_extractor', 'decoder', 'linear', 'postprocessor']
+    dynamic_width: bool = True
 
     def __init__(
         self,
@@ -188,7 +202,8 @@ class CRNN(RecognitionModel, nn.Module):
 
         if target is None or return_preds:
             # Post-process boxes
-            out["preds"] = self.postprocessor(logits)
+            with stage("recognition.decoding"):
+                out["preds"] = self.postprocessor(logits)
 
         if target is not None:
             out['loss'] = self.compute_loss(logits, target)
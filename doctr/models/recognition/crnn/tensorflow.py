@@ -12,6 +12,7 @@ from typing import Tuple, Dict, Any, Optional, List
 from ... import backbones
 from ...utils import load_pretrained_params
 from ..core import RecognitionModel, RecognitionPostProcessor
+from doctr.utils.profiling import stage
 
 __all__ = ['CRNN', 'crnn_vgg16_bn', 'crnn_resnet31', 'CTCPostProcessor']
 
@@ -95,6 +96,7 @@ class CRNN(RecognitionModel, Model):
     """
 
     _children_names: List[str] = ['feat_extractor', 'decoder', 'postprocessor']
+    dynamic_width: bool = True
 
     def __init__(
         self,
@@ -169,7 +171,8 @@ class CRNN(RecognitionModel, Model):
 
         if target is None or return_preds:
             # Post-process boxes
-            out["preds"] = self.postprocessor(logits)
+            with stage("recognition.decoding"):
+                out["preds"] = self.postprocessor(logits)
 
         if target is not None:
             out['loss'] = self.compute_loss(logits, target)
@@ -15,6 +15,7 @@ from ...utils import conv_sequence_pt, load_pretrained_params
 from ...backbones import resnet_stage
 from ..transformer import Decoder, positional_encoding
 from .base import _MASTER, _MASTERPostProcessor
+from doctr.utils.profiling import stage
 
 __all__ = ['MASTER', 'master', 'MASTERPostProcessor']
 
@@ -211,10 +212,11 @@ class MASTER(_MASTER, nn.Module):
 
     def make_mask(self, target: torch.Tensor) -> torch.Tensor:
         size = target.size(1)
-        look_ahead_mask = ~ (torch.triu(torch.ones(size, size, device=target.device)) == 1).transpose(0, 1)[:, None]
-        target_padding_mask = ~ torch.eq(target, self.vocab_size + 2)  # Pad symbol
-        combined_mask = target_padding_mask & look_ahead_mask
-        return torch.tile(combined_mask.permute(1, 0, 2), (self.num_heads, 1, 1))
+        # Boolean masks of the positions that can't be attended to: future & padding tokens
+        look_ahead_mask = torch.triu(torch.ones(size, size, dtype=torch.bool, device=target.device), diagonal=1)
+        target_padding_mask = torch.eq(target, self.vocab_size + 2)  # Pad symbol
+        combined_mask = look_ahead_mask[None] | target_padding_mask[:, None]
+        return combined_mask.repeat_interleave(self.num_heads, dim=0)
 
     def compute_loss(
         self,
@@ -299,7 +301,8 @@ class MASTER(_MASTER, nn.Module):
             out['out_map'] = logits
 
         if return_preds:
-            predictions = self.postprocessor(logits)
+            with stage("recognition.decoding"):
+                predictions = self.postprocessor(logits)
             out['preds'] = predictions
 
         return out
@@ -315,23 +318,27 @@ class MASTER(_MASTER, nn.Module):
         """
         b = encoded.size(0)
 
-        # Padding symbol
-        ys = torch.full((b, self.max_length - 1), self.vocab_size + 2, dtype=torch.long, device=encoded.device)
-        start_vector = torch.full((b, 1), self.vocab_size + 1, dtype=torch.long, device=encoded.device)  # SOS
-        ys = torch.cat((start_vector, ys), dim=-1)
-
-        # Final dimension include EOS/SOS/PAD
-        logits = torch.zeros((b, self.max_length - 1, self.vocab_size + 3), dtype=torch.long, device=encoded.device)
-        # max_len = len + 2
-        for i in range(self.max_length - 1):
-            ys_mask = self.make_mask(ys)
-            output = self.decoder(ys, encoded, ys_mask, None)
-            logits = self.linear(output)
-            prob = F.softmax(logits, dim=-1)
-            next_word = torch.max(prob, dim=-1).indices
-            ys[:, i + 1] = next_word[:, i]
-
-        # Shape (N, max_length, vocab_size + 1)
+        # Padding symbol, the last input token is always a padding one
+        ys = torch.full((b, self.max_length), self.vocab_size + 2, dtype=torch.long, device=encoded.device)
+        ys[:, 0] = self.vocab_size + 1  # SOS
+
+        # Final dimension include EOS/SOS/PAD, logits are left to zero once all sequences are over
+        logits = torch.zeros((b, self.max_length, self.vocab_size + 3), dtype=encoded.dtype, device=encoded.device)
+        ended = torch.zeros(b, dtype=torch.bool, device=encoded.device)
+        # Decode one token at a time, with cached keys & values of the previous ones
+        cache = self.decoder.init_cache(encoded, self.max_length)
+        for i in range(self.max_length):
+            output = self.decoder.decode_step(ys[:, i: i + 1], i, cache, ys[:, :i + 1] == self.vocab_size + 2)
+            logits[:, i] = self.linear(output[:, 0])
+            next_word = logits[:, i].argmax(dim=-1)
+            # Stop as soon as all sequences have an EOS
+            ended |= next_word == self.vocab_size
+            if bool(ended.all()):
+                break
+            if i + 1 < self.max_length - 1:
+                ys[:, i + 1] = next_word
+
+        # Shape (N, max_length, vocab_size + 3)
         return logits
 
 
@@ -347,8 +354,10 @@ class MASTERPostProcessor(_MASTERPostProcessor):
         out_idxs = logits.argmax(-1)
         # N x L
         probs = torch.gather(torch.softmax(logits, -1), -1, out_idxs.unsqueeze(-1)).squeeze(-1)
-        # Take the minimum confidence of the sequence
-        probs = probs.min(dim=1).values.detach().cpu()
+        # Take the minimum confidence of the sequence, up to its first EOS
+        is_eos = out_idxs == len(self.vocab)
+        after_eos = (torch.cumsum(is_eos, dim=1) - is_eos.to(dtype=torch.long)) > 0
+        probs = probs.masked_fill(after_eos, 1).min(dim=1).values.detach().cpu()
 
         # Manual decoding
         word_values = [
@@ -15,6 +15,7 @@ from ...utils import conv_sequence, load_pretrained_params
 from ..transformer import Decoder, positional_encoding, create_look_ahead_mask, create_padding_mask
 from ....datasets import VOCABS
 from .base import _MASTER, _MASTERPostProcessor
+from doctr.utils.profiling import stage
 
 
 __all__ = ['MASTER', 'master', 'MASTERPostProcessor']
@@ -315,7 +316,8 @@ class MASTER(_MASTER, Model):
             out['out_map'] = logits
 
         if return_preds:
-            predictions = self.postprocessor(logits)
+            with stage("recognition.decoding"):
+                predictions = self.postprocessor(logits)
             out['preds'] = predictions
 
         return out
@@ -330,30 +332,33 @@ class MASTER(_MASTER, Model):
             A Tuple of tf.Tensor: predictions, logits
         """
         b = tf.shape(encoded)[0]
-        max_len = tf.constant(self.max_length, dtype=tf.int32)
         start_symbol = tf.constant(self.vocab_size + 1, dtype=tf.int32)  # SOS
         padding_symbol = tf.constant(self.vocab_size + 2, dtype=tf.int32)  # PAD
 
-        ys = tf.fill(dims=(b, max_len - 1), value=padding_symbol)
+        # The last input token is always a padding one
+        ys = tf.fill(dims=(b, self.max_length - 1), value=padding_symbol)
         start_vector = tf.fill(dims=(b, 1), value=start_symbol)
         ys = tf.concat([start_vector, ys], axis=-1)
 
-        logits = tf.zeros(shape=(b, max_len - 1, self.vocab_size + 3), dtype=tf.float32)  # 3 symbols
-        # max_len = len + 2 (sos + eos)
-        for i in range(self.max_length - 1):
-            ys_mask = self.make_mask(ys)
-            output = self.decoder(ys, encoded, ys_mask, None, **kwargs)
-            logits = self.linear(output, **kwargs)
-            prob = tf.nn.softmax(logits, axis=-1)
-            next_word = tf.argmax(prob, axis=-1, output_type=ys.dtype)
-            # ys.shape = B, T
-            i_mesh, j_mesh = tf.meshgrid(tf.range(b), tf.range(max_len), indexing='ij')
-            indices = tf.stack([i_mesh[:, i + 1], j_mesh[:, i + 1]], axis=1)
-
-            ys = tf.tensor_scatter_nd_update(ys, indices, next_word[:, i + 1])
-
-        # final_logits of shape (N, max_length - 1, vocab_size + 1) (whithout sos)
-        return logits
+        logits = []
+        ended = tf.zeros((b,), dtype=tf.bool)
+        # Decode one token at a time, with cached keys & values of the previous ones
+        cache = self.decoder.init_cache(encoded, self.max_length, **kwargs)
+        for i in range(self.max_length):
+            ys_mask = create_padding_mask(ys, self.vocab_size + 2)
+            output = self.decoder.decode_step(ys[:, i: i + 1], i, cache, ys_mask, **kwargs)
+            logits.append(self.linear(output, **kwargs))
+            next_word = tf.argmax(logits[-1][:, 0], axis=-1, output_type=ys.dtype)
+            # Stop as soon as all sequences have an EOS
+            ended = tf.logical_or(ended, tf.equal(next_word, self.vocab_size))
+            if bool(tf.reduce_all(ended)):
+                break
+            if i + 1 < self.max_length - 1:
+                indices = tf.stack([tf.range(b), tf.fill((b,), i + 1)], axis=1)
+                ys = tf.tensor_scatter_nd_update(ys, indices, next_word)
+
+        # final_logits of shape (N, max_length, vocab_size + 3), left to zero once all sequences are over
+        return tf.pad(tf.concat(logits, axis=1), [[0, 0], [0, self.max_length - len(logits)], [0, 0]])
 
 
 class MASTERPostProcessor(_MASTERPostProcessor):
@@ -372,8 +377,9 @@ class MASTERPostProcessor(_MASTERPostProcessor):
         out_idxs = tf.math.argmax(logits, axis=2)
         # N x L
         probs = tf.gather(tf.nn.softmax(logits, axis=-1), out_idxs, axis=-1, batch_dims=2)
-        # Take the minimum confidence of the sequence
-        probs = tf.math.reduce_min(probs, axis=1)
+        # Take the minimum confidence of the sequence, up to its first EOS
+        after_eos = tf.math.cumsum(tf.cast(tf.equal(out_idxs, len(self.vocab)), tf.int32), axis=1, exclusive=True) > 0
+        probs = tf.math.reduce_min(tf.where(after_eos, tf.ones_like(probs), probs), axis=1)
 
         # decode raw output of the model with tf_label_to_idx
         out_idxs = tf.cast(out_idxs, dtype='int32')
@@ -4,6 +4,7 @@
 # See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
 
 from copy import deepcopy
+import numpy as np
 import torch
 from torch import nn
 from torch.nn import functional as F
@@ -13,6 +14,7 @@ from ... import backbones
 from ...utils import load_pretrained_params
 from ..core import RecognitionModel, RecognitionPostProcessor
 from ....datasets import VOCABS
+from doctr.utils.profiling import stage
 
 
 __all__ = ['SAR', 'sar_vgg16_bn', 'sar_resnet31']
@@ -46,9 +48,15 @@ class AttentionModule(nn.Module):
         self.state_conv = nn.Conv2d(state_chans, attention_units, 1, bias=False)
         self.attention_projector = nn.Conv2d(attention_units, 1, 1, bias=False)
 
-    def forward(self, features: torch.Tensor, hidden_state: torch.Tensor) -> torch.Tensor:
+    def forward(
+        self,
+        features: torch.Tensor,
+        hidden_state: torch.Tensor,
+        feat_projection: Optional[torch.Tensor] = None,
+    ) -> torch.Tensor:
         # shape (N, vgg_units, H, W) -> (N, attention_units, H, W)
-        feat_projection = self.feat_conv(features)
+        if feat_projection is None:
+            feat_projection = self.feat_conv(features)
         # shape (N, rnn_units, 1, 1) -> (N, attention_units, 1, 1)
         state_projection = self.state_conv(hidden_state)
         projection = torch.tanh(feat_projection + state_projection)
@@ -102,12 +110,21 @@ class SARDecoder(nn.Module):
         features: torch.Tensor,
         holistic: torch.Tensor,
         gt: Optional[torch.Tensor] = None,
+        max_steps: Optional[torch.Tensor] = None,
     ) -> torch.Tensor:
 
         # initialize states (each of shape (N, rnn_units))
         hx = [None, None]
         # Initialize with the index of virtual START symbol (placed after <eos>)
         symbol = torch.zeros((features.shape[0], self.vocab_size + 1), device=features.device)
+        # The features don't change across steps, nor does their projection
+        feat_projection = self.attention_module.feat_conv(features)
+        # Logits of a certain <eos>, for the steps after the end of a sequence
+        eos_logits = torch.full(
+            (self.vocab_size + 1,), torch.finfo(features.dtype).min, dtype=features.dtype, device=features.device
+        )
+        eos_logits[-1] = 0
+        ended = torch.zeros(features.shape[0], dtype=torch.bool, device=features.device)
         logits_list = []
         for t in range(self.max_length + 1):  # keep 1 step for <eos>
 
@@ -120,7 +137,7 @@ class SARDecoder(nn.Module):
             logits, _ = hx[1]  # type: ignore[misc]
 
             glimpse = self.attention_module(
-                features, logits.unsqueeze(-1).unsqueeze(-1),  # type: ignore[has-type]
+                features, logits.unsqueeze(-1).unsqueeze(-1), feat_projection,  # type: ignore[has-type]
             )
             # logits: shape (N, rnn_units), glimpse: shape (N, 1)
             logits = torch.cat([logits, glimpse], 1)  # type: ignore[has-type]
@@ -130,10 +147,22 @@ class SARDecoder(nn.Module):
             if gt is not None:
                 _symbol = gt[:, t]  # type: ignore[index]
             else:
+                # Sequences that are over, or that reached their step cap, only emit <eos>
+                if max_steps is not None:
+                    ended |= t >= max_steps
+                logits = torch.where(ended.unsqueeze(1), eos_logits, logits)
                 _symbol = logits.argmax(-1)
+                ended |= _symbol == self.vocab_size
             symbol = F.one_hot(_symbol, self.vocab_size + 1).to(dtype=torch.float32)
             logits_list.append(logits)
+            # Stop as soon as all sequences are over
+            if gt is None and bool(ended.all()):
+                break
         outputs = torch.stack(logits_list, 1)  # shape (N, max_length + 1, vocab_size + 1)
+        if outputs.shape[1] < self.max_length + 1:
+            outputs = torch.cat((
+                outputs, eos_logits.expand(outputs.shape[0], self.max_length + 1 - outputs.shape[1], -1)
+            ), dim=1)
 
         return outputs
 
@@ -154,6 +183,8 @@ class SAR(nn.Module, RecognitionModel):
         cfg: default setup dict of the model
     """
 
+    step_caps: bool = True
+
     def __init__(
         self,
         feature_extractor,
@@ -189,6 +220,7 @@ class SAR(nn.Module, RecognitionModel):
         target: Optional[List[str]] = None,
         return_model_output: bool = False,
         return_preds: bool = False,
+        aspect_ratios: Optional[np.ndarray] = None,
     ) -> Dict[str, Any]:
 
         features = self.feat_extractor(x)
@@ -199,7 +231,11 @@ class SAR(nn.Module, RecognitionModel):
             _gt, _seq_len = self.compute_target(target)
             gt, seq_len = torch.from_numpy(_gt).to(dtype=torch.long), torch.tensor(_seq_len)  # type: ignore[assignment]
             gt, seq_len = gt.to(x.device), seq_len.to(x.device)
-        decoded_features = self.decoder(features, encoded, gt=None if target is None else gt)
+        # Cap the decoding steps of each sample
+        max_steps = None
+        if aspect_ratios is not None and target is None:
+            max_steps = torch.from_numpy(self.max_steps(np.asarray(aspect_ratios))).to(x.device)
+        decoded_features = self.decoder(features, encoded, gt=None if target is None else gt, max_steps=max_steps)
 
         out: Dict[str, Any] = {}
         if return_model_output:
@@ -207,7 +243,8 @@ class SAR(nn.Module, RecognitionModel):
 
         if target is None or return_preds:
             # Post-process boxes
-            out["preds"] = self.postprocessor(decoded_features)
+            with stage("recognition.decoding"):
+                out["preds"] = self.postprocessor(decoded_features)
 
         if target is not None:
             out['loss'] = self.compute_loss(decoded_features, gt, seq_len)  # type: ignore[arg-type]
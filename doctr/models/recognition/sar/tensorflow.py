@@ -4,6 +4,7 @@
 # See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
 
 from copy import deepcopy
+import numpy as np
 import tensorflow as tf
 from tensorflow.keras import Sequential, layers, Model
 from typing import Tuple, Dict, List, Any, Optional
@@ -12,6 +13,7 @@ from ... import backbones
 from ...utils import load_pretrained_params
 from ..core import RecognitionModel, RecognitionPostProcessor
 from doctr.utils.repr import NestedObject
+from doctr.utils.profiling import stage
 
 __all__ = ['SAR', 'SARPostProcessor', 'sar_vgg16_bn', 'sar_resnet31']
 
@@ -65,6 +67,7 @@ class AttentionModule(layers.Layer, NestedObject):
         self,
         features: tf.Tensor,
         hidden_state: tf.Tensor,
+        features_projection: Optional[tf.Tensor] = None,
         **kwargs: Any,
     ) -> tf.Tensor:
 
@@ -72,7 +75,8 @@ class AttentionModule(layers.Layer, NestedObject):
         # shape (N, 1, 1, rnn_units) -> (N, 1, 1, attention_units)
         hidden_state_projection = self.hidden_state_projector(hidden_state, **kwargs)
         # shape (N, H, W, vgg_units) -> (N, H, W, attention_units)
-        features_projection = self.features_projector(features, **kwargs)
+        if features_projection is None:
+            features_projection = self.features_projector(features, **kwargs)
         projection = tf.math.tanh(hidden_state_projection + features_projection)
         # shape (N, H, W, attention_units) -> (N, H, W, 1)
         attention = self.attention_projector(projection, **kwargs)
@@ -129,6 +133,7 @@ class SARDecoder(layers.Layer, NestedObject):
         features: tf.Tensor,
         holistic: tf.Tensor,
         gt: Optional[tf.Tensor] = None,
+        max_steps: Optional[tf.Tensor] = None,
         **kwargs: Any,
     ) -> tf.Tensor:
 
@@ -141,6 +146,11 @@ class SARDecoder(layers.Layer, NestedObject):
         _, states = self.lstm_decoder(holistic, states, **kwargs)
         # Initialize with the index of virtual START symbol (placed after <eos>)
         symbol = tf.fill(features.shape[0], self.vocab_size + 1)
+        # The features don't change across steps, nor does their projection
+        features_projection = self.attention_module.features_projector(features, **kwargs)
+        # Logits of a certain <eos>, for the steps after the end of a sequence
+        eos_logits = tf.one_hot(self.vocab_size, self.vocab_size + 1, on_value=0., off_value=tf.float32.min)
+        ended = tf.zeros(features.shape[0], dtype=tf.bool)
         logits_list = []
         if kwargs.get('training') and gt is None:
             raise ValueError('Need to provide labels during training for teacher forcing')
@@ -150,7 +160,7 @@ class SARDecoder(layers.Layer, NestedObject):
             embeded_symbol = self.embed(tf.one_hot(symbol, depth=self.vocab_size + 1), **kwargs)
             logits, states = self.lstm_decoder(embeded_symbol, states, **kwargs)
             glimpse = self.attention_module(
-                features, tf.expand_dims(tf.expand_dims(logits, axis=1), axis=1), **kwargs,
+                features, tf.expand_dims(tf.expand_dims(logits, axis=1), axis=1), features_projection, **kwargs,
             )
             # logits: shape (N, rnn_units), glimpse: shape (N, 1)
             logits = tf.concat([logits, glimpse], axis=-1)
@@ -160,9 +170,23 @@ class SARDecoder(layers.Layer, NestedObject):
             if kwargs.get('training'):
                 symbol = gt[:, t]  # type: ignore[index]
             else:
+                if gt is None:
+                    # Sequences that are over, or that reached their step cap, only emit <eos>
+                    if max_steps is not None:
+                        ended = tf.logical_or(ended, t >= max_steps)
+                    logits = tf.where(ended[:, tf.newaxis], eos_logits, logits)
                 symbol = tf.argmax(logits, axis=-1)
+                ended = tf.logical_or(ended, tf.equal(symbol, self.vocab_size))
             logits_list.append(logits)
+            # Stop as soon as all sequences are over
+            if gt is None and bool(tf.reduce_all(ended)):
+                break
         outputs = tf.stack(logits_list, axis=1)  # shape (N, max_length + 1, vocab_size + 1)
+        if len(logits_list) < self.max_length + 1:
+            remaining = self.max_length + 1 - len(logits_list)
+            outputs = tf.concat([
+                outputs, tf.tile(eos_logits[tf.newaxis, tf.newaxis], [features.shape[0], remaining, 1])
+            ], axis=1)
 
         return outputs
 
@@ -183,6 +207,7 @@ class SAR(Model, RecognitionModel):
     """
 
     _children_names: List[str] = ['feat_extractor', 'encoder', 'decoder', 'postprocessor']
+    step_caps: bool = True
 
     def __init__(
         self,
@@ -258,6 +283,7 @@ class SAR(Model, RecognitionModel):
         target: Optional[List[str]] = None,
         return_model_output: bool = False,
         return_preds: bool = False,
+        aspect_ratios: Optional[np.ndarray] = None,
         **kwargs: Any,
     ) -> Dict[str, Any]:
 
@@ -267,7 +293,13 @@ class SAR(Model, RecognitionModel):
         if target is not None:
             gt, seq_len = self.compute_target(target)
             seq_len = tf.cast(seq_len, tf.int32)
-        decoded_features = self.decoder(features, encoded, gt=None if target is None else gt, **kwargs)
+        # Cap the decoding steps of each sample
+        max_steps = None
+        if aspect_ratios is not None and target is None:
+            max_steps = tf.constant(self.max_steps(np.asarray(aspect_ratios)))
+        decoded_features = self.decoder(
+            features, encoded, gt=None if target is None else gt, max_steps=max_steps, **kwargs
+        )
 
         out: Dict[str, tf.Tensor] = {}
         if return_model_output:
@@ -275,7 +307,8 @@ class SAR(Model, RecognitionModel):
 
         if target is None or return_preds:
             # Post-process boxes
-            out["preds"] = self.postprocessor(decoded_features)
+            with stage("recognition.decoding"):
+                out["preds"] = self.postprocessor(decoded_features)
 
         if target is not None:
             out['loss'] = self.compute_loss(decoded_features, gt, seq_len)
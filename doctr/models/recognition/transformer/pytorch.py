@@ -6,7 +6,8 @@
 import math
 import torch
 from torch import nn
-from typing import Optional
+from torch.nn import functional as F
+from typing import Optional, List, Dict, Tuple
 
 __all__ = ['Decoder', 'positional_encoding']
 
@@ -30,6 +31,37 @@ def positional_encoding(position: int, d_model: int = 512) -> torch.Tensor:
     return pe.unsqueeze(0)
 
 
+def _split_heads(x: torch.Tensor, num_heads: int) -> torch.Tensor:
+    # (batch_size, seq_len, d_model) --> (batch_size, num_heads, seq_len, depth)
+    b, seq_len, d_model = x.shape
+    return x.reshape(b, seq_len, num_heads, d_model // num_heads).transpose(1, 2)
+
+
+def _project_kv(attn: nn.MultiheadAttention, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+    # Keys & values projections of a batch-first input, split by head
+    d = attn.embed_dim
+    k = F.linear(x, attn.in_proj_weight[d: 2 * d], attn.in_proj_bias[d: 2 * d])
+    v = F.linear(x, attn.in_proj_weight[2 * d:], attn.in_proj_bias[2 * d:])
+    return _split_heads(k, attn.num_heads), _split_heads(v, attn.num_heads)
+
+
+def _attend(
+    attn: nn.MultiheadAttention,
+    x: torch.Tensor,
+    k: torch.Tensor,
+    v: torch.Tensor,
+    mask: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    # Attention of a batch-first input to already projected keys & values
+    d = attn.embed_dim
+    q = _split_heads(F.linear(x, attn.in_proj_weight[:d], attn.in_proj_bias[:d]), attn.num_heads)
+    scores = torch.matmul(q, k.transpose(-2, -1)) / math.sqrt(d // attn.num_heads)
+    if mask is not None:
+        scores = scores + mask
+    out = torch.matmul(scores.softmax(dim=-1), v)
+    return attn.out_proj(out.transpose(1, 2).reshape(x.shape))
+
+
 class Decoder(nn.Module):
 
     pos_encoding: torch.Tensor
@@ -81,11 +113,67 @@ class Decoder(nn.Module):
 
         # Batch first = False in decoder
         x = x.permute(1, 0, 2)
+        memory = enc_output.permute(1, 0, 2)
         for i in range(self.num_layers):
             x = self.dec_layers[i](
-                tgt=x, memory=enc_output, tgt_mask=look_ahead_mask, memory_mask=padding_mask
+                tgt=x, memory=memory, tgt_mask=look_ahead_mask, memory_mask=padding_mask
             )
 
         # shape (batch_size, target_seq_len, d_model)
         x = x.permute(1, 0, 2)
         return x
+
+    def init_cache(self, enc_output: torch.Tensor, max_length: int) -> List[Dict[str, torch.Tensor]]:
+        """Initialize the state of incremental decoding, where the encoder output is projected once for all steps
+
+        Args:
+            enc_output: encoded features of shape (batch_size, input_seq_len, d_model)
+            max_length: maximum length of the decoded sequences
+
+        Returns:
+            the keys & values of each decoder layer
+        """
+        cache = []
+        for layer in self.dec_layers:
+            mem_k, mem_v = _project_kv(layer.multihead_attn, enc_output)
+            # Keys & values of the sequences are preallocated, and filled step by step
+            b, num_heads, _, depth = mem_k.shape
+            k, v = (mem_k.new_zeros((b, num_heads, max_length, depth)) for _ in range(2))
+            cache.append(dict(k=k, v=v, mem_k=mem_k, mem_v=mem_v))
+        return cache
+
+    def decode_step(
+        self,
+        x: torch.Tensor,
+        position: int,
+        cache: List[Dict[str, torch.Tensor]],
+        padding_mask: torch.Tensor,
+    ) -> torch.Tensor:
+        """Decode the latest token of the sequences, which only attends to the cached keys & values of the previous
+        ones. This is equivalent to the forward on the whole sequences at inference time, for the latest position.
+
+        Args:
+            x: latest tokens of shape (batch_size, 1)
+            position: position of the latest tokens in the sequences
+            cache: state of the decoding, as returned by `init_cache`, updated in place
+            padding_mask: boolean mask of padding tokens among the sequences so far, of shape (batch_size, position + 1)
+
+        Returns:
+            the decoded latest tokens, of shape (batch_size, 1, d_model)
+        """
+
+        x = self.embedding(x) * math.sqrt(self.d_model)
+        x = x + self.pos_encoding[:, position: position + 1, :]
+        # Padding tokens can't be attended to
+        mask = torch.zeros(padding_mask.shape, dtype=x.dtype, device=x.device)
+        mask = mask.masked_fill(padding_mask, float('-inf'))[:, None, None, :]
+
+        for layer, state in zip(self.dec_layers, cache):
+            new_k, new_v = _project_kv(layer.self_attn, x)
+            state['k'][:, :, position: position + 1], state['v'][:, :, position: position + 1] = new_k, new_v
+            k, v = state['k'][:, :, :position + 1], state['v'][:, :, :position + 1]
+            x = layer.norm1(x + _attend(layer.self_attn, x, k, v, mask))
+            x = layer.norm2(x + _attend(layer.multihead_attn, x, state['mem_k'], state['mem_v']))
+            x = layer.norm3(x + layer.linear2(layer.activation(layer.linear1(x))))
+
+        return x
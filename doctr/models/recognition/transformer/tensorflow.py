@@ -7,7 +7,7 @@
 # https://www.tensorflow.org/text/tutorials/transformer
 
 
-from typing import Tuple, Any
+from typing import Tuple, Any, List, Dict, Optional
 
 import tensorflow as tf
 import numpy as np
@@ -124,24 +124,35 @@ class MultiHeadAttention(tf.keras.layers.Layer):
         x = tf.reshape(x, (batch_size, -1, self.num_heads, self.depth))
         return tf.transpose(x, perm=[0, 2, 1, 3])
 
-    def call(
+    def project_kv(
         self,
-        v: tf.Tensor,
         k: tf.Tensor,
-        q: tf.Tensor,
-        mask: tf.Tensor,
+        v: tf.Tensor,
         **kwargs: Any,
     ) -> Tuple[tf.Tensor, tf.Tensor]:
+        """Project keys & values, split by head, so that they can be reused across several queries"""
+
+        batch_size = tf.shape(k)[0]
+
+        k = self.split_heads(self.wk(k, **kwargs), batch_size)  # (batch_size, num_heads, seq_len_k, depth)
+        v = self.split_heads(self.wv(v, **kwargs), batch_size)  # (batch_size, num_heads, seq_len_v, depth)
+
+        return k, v
+
+    def attend(
+        self,
+        q: tf.Tensor,
+        k: tf.Tensor,
+        v: tf.Tensor,
+        mask: Optional[tf.Tensor],
+        **kwargs: Any,
+    ) -> tf.Tensor:
+        """Attention of the queries to already projected keys & values"""
 
         batch_size = tf.shape(q)[0]
 
         q = self.wq(q, **kwargs)  # (batch_size, seq_len, d_model)
-        k = self.wk(k, **kwargs)  # (batch_size, seq_len, d_model)
-        v = self.wv(v, **kwargs)  # (batch_size, seq_len, d_model)
-
         q = self.split_heads(q, batch_size)  # (batch_size, num_heads, seq_len_q, depth)
-        k = self.split_heads(k, batch_size)  # (batch_size, num_heads, seq_len_k, depth)
-        v = self.split_heads(v, batch_size)  # (batch_size, num_heads, seq_len_v, depth)
 
         # scaled_attention.shape == (batch_size, num_heads, seq_len_q, depth)
         # attention_weights.shape == (batch_size, num_heads, seq_len_q, seq_len_k)
@@ -156,6 +167,19 @@ class MultiHeadAttention(tf.keras.layers.Layer):
 
         return output
 
+    def call(
+        self,
+        v: tf.Tensor,
+        k: tf.Tensor,
+        q: tf.Tensor,
+        mask: tf.Tensor,
+        **kwargs: Any,
+    ) -> Tuple[tf.Tensor, tf.Tensor]:
+
+        k, v = self.project_kv(k, v, **kwargs)
+
+        return self.attend(q, k, v, mask, **kwargs)
+
 
 def point_wise_feed_forward_network(d_model: int = 512, dff: int = 2048) -> tf.keras.Sequential:
     return tf.keras.Sequential([
@@ -214,6 +238,31 @@ class DecoderLayer(tf.keras.layers.Layer):
 
         return out3
 
+    def decode_step(
+        self,
+        x: tf.Tensor,
+        state: Dict[str, tf.Tensor],
+        slot: tf.Tensor,
+        mask: tf.Tensor,
+        **kwargs: Any,
+    ) -> tf.Tensor:
+        # x.shape == (batch_size, 1, d_model), state holds the keys & values of the layer, updated in place
+
+        k, v = self.mha1.project_kv(x, x, **kwargs)
+        state['k'] += slot * k
+        state['v'] += slot * v
+
+        attn1 = self.mha1.attend(x, state['k'], state['v'], mask, **kwargs)
+        out1 = self.layernorm1(attn1 + x, **kwargs)
+
+        attn2 = self.mha2.attend(out1, state['mem_k'], state['mem_v'], None, **kwargs)
+        out2 = self.layernorm2(attn2 + out1, **kwargs)
+
+        ffn_output = self.ffn(out2, **kwargs)
+        out3 = self.layernorm3(ffn_output + out2, **kwargs)  # (batch_size, 1, d_model)
+
+        return out3
+
 
 class Decoder(tf.keras.layers.Layer):
 
@@ -264,3 +313,59 @@ class Decoder(tf.keras.layers.Layer):
 
         # x.shape == (batch_size, target_seq_len, d_model)
         return x
+
+    def init_cache(
+        self,
+        enc_output: tf.Tensor,
+        max_length: int,
+        **kwargs: Any,
+    ) -> List[Dict[str, tf.Tensor]]:
+        """Initialize the state of incremental decoding, where the encoder output is projected once for all steps
+
+        Args:
+            enc_output: encoded features of shape (batch_size, input_seq_len, d_model)
+            max_length: maximum length of the decoded sequences
+
+        Returns:
+            the keys & values of each decoder layer
+        """
+        cache = []
+        for layer in self.dec_layers:
+            mem_k, mem_v = layer.mha2.project_kv(enc_output, enc_output, **kwargs)
+            # Keys & values of the sequences have a static shape, and are filled step by step
+            empty = tf.zeros((tf.shape(enc_output)[0], layer.mha1.num_heads, max_length, layer.mha1.depth))
+            cache.append(dict(k=empty, v=empty, mem_k=mem_k, mem_v=mem_v))
+        return cache
+
+    def decode_step(
+        self,
+        x: tf.Tensor,
+        position: int,
+        cache: List[Dict[str, tf.Tensor]],
+        padding_mask: tf.Tensor,
+        **kwargs: Any,
+    ) -> tf.Tensor:
+        """Decode the latest token of the sequences, which only attends to the cached keys & values of the previous
+        ones. This is equivalent to the call on the whole sequences at inference time, for the latest position.
+
+        Args:
+            x: latest tokens of shape (batch_size, 1)
+            position: position of the latest tokens in the sequences
+            cache: state of the decoding, as returned by `init_cache`, updated in place
+            padding_mask: padding mask of the sequences (tokens after the latest one being padding ones), of shape
+                (batch_size, 1, 1, max_length)
+
+        Returns:
+            the decoded latest tokens, of shape (batch_size, 1, d_model)
+        """
+
+        x = self.embedding(x, **kwargs)  # (batch_size, 1, d_model)
+        x *= tf.math.sqrt(tf.cast(self.d_model, tf.float32))
+        x += self.pos_encoding[:, position: position + 1, :]
+
+        # Slot of the latest position in the cached keys & values
+        slot = tf.one_hot(position, tf.shape(cache[0]['k'])[2])[tf.newaxis, tf.newaxis, :, tf.newaxis]
+        for layer, state in zip(self.dec_layers, cache):
+            x = layer.decode_step(x, state, slot, padding_mask, **kwargs)
+
+        return x
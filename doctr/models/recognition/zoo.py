@@ -26,10 +26,16 @@ def _predictor(arch: str, pretrained: bool, **kwargs: Any) -> RecognitionPredict
     kwargs['mean'] = kwargs.get('mean', _model.cfg['mean'])
     kwargs['std'] = kwargs.get('std', _model.cfg['std'])
     kwargs['batch_size'] = kwargs.get('batch_size', 32)
+    bucketing = kwargs.pop('bucketing', False)
+    step_caps = kwargs.pop('step_caps', False)
+    cache = kwargs.pop('cache', None)
     input_shape = _model.cfg['input_shape'][:2] if is_tf_available() else _model.cfg['input_shape'][-2:]
     predictor = RecognitionPredictor(
         PreProcessor(input_shape, preserve_aspect_ratio=True, **kwargs),
-        _model
+        _model,
+        bucketing=bucketing,
+        step_caps=step_caps,
+        cache=cache,
     )
 
     return predictor
@@ -48,6 +54,9 @@ def recognition_predictor(arch: str = 'crnn_vgg16_bn', pretrained: bool = False,
     Args:
         arch: name of the architecture to use ('crnn_vgg16_bn', 'crnn_resnet31', 'sar_vgg16_bn', 'sar_resnet31')
         pretrained: If True, returns a model pre-trained on our text recognition dataset
+        bucketing: If True, crops are batched by aspect ratio
+        step_caps: If True, the decoding steps of each crop are capped given its aspect ratio (for SAR)
+        cache: If specified, caches the predictions of crops across calls
 
     Returns:
         Recognition predictor
@@ -4,14 +4,16 @@
 # See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
 
 import logging
+import numpy as np
 import torch
 from torch import nn
-from typing import Optional, List, Any
+from torch.nn import functional as F
+from typing import Optional, List, Any, Tuple
 
 from ..data_utils import download_from_url
 
 
-__all__ = ['load_pretrained_params', 'conv_sequence_pt']
+__all__ = ['load_pretrained_params', 'conv_sequence_pt', 'binarize_prob_maps']
 
 
 def load_pretrained_params(
@@ -82,3 +84,40 @@ def conv_sequence_pt(
         conv_seq.append(nn.ReLU(inplace=True))
 
     return conv_seq
+
+
+def binarize_prob_maps(
+    prob_map: torch.Tensor,
+    bin_thresh: float,
+    quantize: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Binarize a batch of probability maps and perform a morphological opening on the device, so that only
+    compact maps are moved to the host
+
+    Example::
+        >>> import torch
+        >>> from doctr.models.utils import binarize_prob_maps
+        >>> proba, bitmaps = binarize_prob_maps(torch.rand(2, 1, 512, 512), .3, quantize=True)
+
+    Args:
+        prob_map: probability maps of shape (N, 1, H, W)
+        bin_thresh: binarization threshold
+        quantize: whether the probability maps should be moved as uint8 rather than float32
+
+    Returns:
+        the probability maps and the uint8 bitmaps, both of shape (N, H, W)
+    """
+    prob_map = prob_map.detach()
+    bitmap = (prob_map > bin_thresh).to(dtype=torch.float32)
+    # Kernel for opening, empirical law for ksize
+    k_size = 1 + int(prob_map.shape[-2] / 512)
+    if k_size > 1:
+        # Same anchor as OpenCV, and borders that leave the result unchanged
+        _pad = (k_size // 2, k_size - 1 - k_size // 2) * 2
+        # Erosion then dilation
+        bitmap = 1 - F.max_pool2d(F.pad(1 - bitmap, _pad), k_size, stride=1)
+        bitmap = F.max_pool2d(F.pad(bitmap, _pad), k_size, stride=1)
+    if quantize:
+        prob_map = (255 * prob_map).round().to(dtype=torch.uint8)
+
+    return prob_map.squeeze(1).cpu().numpy(), bitmap.squeeze(1).to(dtype=torch.uint8).cpu().numpy()
@@ -5,16 +5,18 @@
 
 import logging
 import os
+import numpy as np
+import tensorflow as tf
 from zipfile import ZipFile
 from tensorflow.keras import layers, Model
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Tuple
 
 from ..data_utils import download_from_url
 
 logging.getLogger("tensorflow").setLevel(logging.DEBUG)
 
 
-__all__ = ['load_pretrained_params', 'conv_sequence', 'IntermediateLayerGetter']
+__all__ = ['load_pretrained_params', 'conv_sequence', 'IntermediateLayerGetter', 'binarize_prob_maps']
 
 
 def load_pretrained_params(
@@ -119,3 +121,39 @@ class IntermediateLayerGetter(Model):
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}()"
+
+
+def binarize_prob_maps(
+    prob_map: tf.Tensor,
+    bin_thresh: float,
+    quantize: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Binarize a batch of probability maps and perform a morphological opening on the device, so that only
+    compact maps are moved to the host
+
+    Example::
+        >>> import tensorflow as tf
+        >>> from doctr.models.utils import binarize_prob_maps
+        >>> proba, bitmaps = binarize_prob_maps(tf.random.uniform((2, 512, 512, 1)), .3, quantize=True)
+
+    Args:
+        prob_map: probability maps of shape (N, H, W, 1)
+        bin_thresh: binarization threshold
+        quantize: whether the probability maps should be moved as uint8 rather than float32
+
+    Returns:
+        the probability maps and the uint8 bitmaps, both of shape (N, H, W)
+    """
+    bitmap = tf.cast(prob_map > bin_thresh, dtype=tf.float32)
+    # Kernel for opening, empirical law for ksize
+    k_size = 1 + int(prob_map.shape[1] / 512)
+    if k_size > 1:
+        # Same anchor as OpenCV, and borders that leave the result unchanged
+        _pad = [[0, 0], [k_size // 2, k_size - 1 - k_size // 2], [k_size // 2, k_size - 1 - k_size // 2], [0, 0]]
+        # Erosion then dilation
+        bitmap = 1 - tf.nn.max_pool2d(tf.pad(1 - bitmap, _pad), k_size, strides=1, padding='VALID')
+        bitmap = tf.nn.max_pool2d(tf.pad(bitmap, _pad), k_size, strides=1, padding='VALID')
+    if quantize:
+        prob_map = tf.cast(tf.round(255 * prob_map), dtype=tf.uint8)
+
+    return tf.squeeze(prob_map, axis=-1).numpy(), tf.squeeze(tf.cast(bitmap, dtype=tf.uint8), axis=-1).numpy()
@@ -12,7 +12,14 @@ from .recognition.zoo import recognition_predictor
 __all__ = ["ocr_predictor"]
 
 
-def _predictor(det_arch: str, reco_arch: str, pretrained: bool, det_bs=2, reco_bs=128) -> OCRPredictor:
+def _predictor(
+    det_arch: str,
+    reco_arch: str,
+    pretrained: bool,
+    det_bs: int = 2,
+    reco_bs: int = 128,
+    **kwargs: Any,
+) -> OCRPredictor:
 
     # Detection
     det_predictor = detection_predictor(det_arch, pretrained=pretrained, batch_size=det_bs)
@@ -20,7 +27,7 @@ def _predictor(det_arch: str, reco_arch: str, pretrained: bool, det_bs=2, reco_b
     # Recognition
     reco_predictor = recognition_predictor(reco_arch, pretrained=pretrained, batch_size=reco_bs)
 
-    return OCRPredictor(det_predictor, reco_predictor)
+    return OCRPredictor(det_predictor, reco_predictor, **kwargs)
 
 
 def ocr_predictor(
@@ -41,6 +48,11 @@ def ocr_predictor(
     Args:
         arch: name of the architecture to use ('db_sar_vgg', 'db_sar_resnet', 'db_crnn_vgg', 'db_crnn_resnet')
         pretrained: If True, returns a model pre-trained on our OCR dataset
+        pipelined: If True, overlaps the detection of a page batch with the recognition of the previous one
+        fuse_crops: If True, crops are resized straight into the recognition batch, with a single warp per crop
+        columnar: If True, predictions are stored in a `ColumnarDocument` rather than as a tree of elements
+        blank_page_detector: If specified (e.g. `BlankPageDetector()`), the pages it classifies as blank skip
+            detection and recognition
 
     Returns:
         OCR predictor
@@ -11,7 +11,7 @@ from scipy.optimize import linear_sum_assignment
 from doctr.utils.geometry import rbbox_to_polygon
 
 __all__ = ['TextMatch', 'box_iou', 'box_ioa', 'mask_iou', 'rbox_to_mask',
-           'nms', 'LocalizationConfusion', 'OCRMetric']
+           'nms', 'rbox_nms', 'LocalizationConfusion', 'OCRMetric']
 
 
 def string_match(word1: str, word2: str) -> Tuple[bool, bool, bool, bool]:
@@ -235,7 +235,7 @@ def nms(boxes: np.ndarray, thresh: float = .5) -> List[int]:
 
     Args:
         boxes: np array of straight boxes: (*, 5), (xmin, ymin, xmax, ymax, score)
-        thresh: iou threshold to perform box suppression.
+        thresh: iou threshold to perform box suppression, boxes reaching it are suppressed.
 
     Returns:
         A list of box indexes to keep
@@ -263,7 +263,50 @@ def nms(boxes: np.ndarray, thresh: float = .5) -> List[int]:
         inter = w * h
         ovr = inter / (areas[i] + areas[order[1:]] - inter)
 
-        inds = np.where(ovr <= thresh)[0]
+        inds = np.where(ovr < thresh)[0]
+        order = order[inds + 1]
+    return keep
+
+
+def rbox_nms(boxes: np.ndarray, thresh: float = .5) -> List[int]:
+    """Perform non-max suppression on rotated boxes
+
+    Args:
+        boxes: np array of rotated boxes in absolute coordinates: (*, 6), (x, y, w, h, alpha, score)
+        thresh: iou threshold to perform box suppression, boxes reaching it are suppressed.
+
+    Returns:
+        A list of box indexes to keep
+    """
+    rects = [((float(x), float(y)), (float(w), float(h)), float(alpha)) for x, y, w, h, alpha in boxes[:, :5]]
+    areas = boxes[:, 2] * boxes[:, 3]
+    # Axis-aligned bounds of the boxes, to skip the exact intersection of the pairs that can't reach the threshold
+    cos, sin = np.abs(np.cos(np.deg2rad(boxes[:, 4]))), np.abs(np.sin(np.deg2rad(boxes[:, 4])))
+    half_w = (boxes[:, 2] * cos + boxes[:, 3] * sin) / 2
+    half_h = (boxes[:, 2] * sin + boxes[:, 3] * cos) / 2
+    x1, x2 = boxes[:, 0] - half_w, boxes[:, 0] + half_w
+    y1, y2 = boxes[:, 1] - half_h, boxes[:, 1] + half_h
+    order = boxes[:, 5].argsort()[::-1]
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        others = order[1:]
+        # The overlap of the axis-aligned bounds caps the intersection, and hence the IoU
+        bound_inter = np.minimum(
+            np.maximum(0., np.minimum(x2[i], x2[others]) - np.maximum(x1[i], x1[others])) *
+            np.maximum(0., np.minimum(y2[i], y2[others]) - np.maximum(y1[i], y1[others])),
+            np.minimum(areas[i], areas[others]),
+        )
+        inter = np.zeros(others.size)
+        for idx in np.where(bound_inter >= thresh * (areas[i] + areas[others] - bound_inter))[0]:
+            _, pts = cv2.rotatedRectangleIntersection(rects[i], rects[others[idx]])
+            if pts is not None and len(pts) > 2:
+                inter[idx] = cv2.contourArea(cv2.convexHull(pts))
+        ovr = inter / (areas[i] + areas[others] - inter)
+
+        inds = np.where(ovr < thresh)[0]
         order = order[inds + 1]
     return keep
 
@@ -0,0 +1,148 @@
+# Copyright (C) 2021, Mindee.
+
+# This program is licensed under the Apache License version 2.
+# See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
+
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+__all__ = ['stage', 'register_hook', 'remove_hook', 'StageProfiler', 'profile']
+
+# Hooks are called with the stage name, its wall time, its CPU time (both in seconds), and its info
+StageHook = Callable[[str, float, float, Dict[str, Any]], None]
+
+_hooks: List[StageHook] = []
+# Per-thread CPU clock (Python 3.7+), falling back on the process-wide one
+_cpu_time: Callable[[], float] = getattr(time, 'thread_time', time.process_time)
+
+
+def register_hook(hook: StageHook) -> None:
+    """Register a function called at the end of each pipeline stage
+
+    Args:
+        hook: function taking the stage name, its wall time, its CPU time (in seconds) and its info
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook: StageHook) -> None:
+    """Remove a hook registered with `register_hook`
+
+    Args:
+        hook: the hook to remove
+    """
+    _hooks.remove(hook)
+
+
+@contextmanager
+def stage(name: str, **info: Any) -> Iterator[Dict[str, Any]]:
+    """Time a stage of the pipeline and pass the measurements to the registered hooks.
+    Without any registered hook, this is a no-op.
+
+    Example::
+        >>> from doctr.utils.profiling import stage
+        >>> with stage("detection.forward", batches=1) as info:
+        ...     info["shape"] = (2, 1024, 1024, 3)
+
+    Args:
+        name: name of the stage
+        info: item counts (integers), or the batch shape under the "shape" key. The yielded dict can be
+            updated within the stage
+
+    Returns:
+        the info of the stage
+    """
+    if len(_hooks) == 0:
+        yield info
+        return
+
+    wall_start, cpu_start = time.perf_counter(), _cpu_time()
+    yield info
+    wall_time, cpu_time = time.perf_counter() - wall_start, _cpu_time() - cpu_start
+    for hook in list(_hooks):
+        hook(name, wall_time, cpu_time, info)
+
+
+class StageProfiler:
+    """In-memory aggregator of the stage measurements, meant to be registered as a hook
+
+    Example::
+        >>> from doctr.utils.profiling import StageProfiler, register_hook
+        >>> profiler = StageProfiler()
+        >>> register_hook(profiler)
+        >>> print(profiler.render())
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __call__(self, name: str, wall_time: float, cpu_time: float, info: Dict[str, Any]) -> None:
+        with self._lock:
+            if name not in self.stats:
+                self.stats[name] = dict(calls=0, wall_time=0., cpu_time=0., counts=Counter(), shapes=Counter())
+            stats = self.stats[name]
+            stats['calls'] += 1
+            stats['wall_time'] += wall_time
+            stats['cpu_time'] += cpu_time
+            for key, value in info.items():
+                if key == 'shape':
+                    stats['shapes'][tuple(value)] += 1
+                else:
+                    stats['counts'][key] += value
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Computes the aggregated measurements
+
+        Returns:
+            a dictionary mapping each stage (in order of first completion) to its number of calls, total wall time
+            and CPU time (in seconds), total item counts and number of calls per batch shape
+        """
+        with self._lock:
+            return {
+                name: dict(stats, counts=dict(stats['counts']), shapes=dict(stats['shapes']))
+                for name, stats in self.stats.items()
+            }
+
+    def render(self) -> str:
+        """Renders the aggregated measurements as a table"""
+
+        lines = [f"{'stage':<32}{'calls':>8}{'wall (ms)':>12}{'cpu (ms)':>12}  items"]
+        for name, stats in self.summary().items():
+            items = ", ".join(f"{key}={value}" for key, value in stats['counts'].items())
+            if len(stats['shapes']) > 0:
+                items += (", " if items else "") + "shapes=" + ", ".join(
+                    f"{'x'.join(map(str, shape))} ({count})" for shape, count in stats['shapes'].items()
+                )
+            lines.append(f"{name:<32}{stats['calls']:>8}{1000 * stats['wall_time']:>12.1f}"
+                         f"{1000 * stats['cpu_time']:>12.1f}  {items}")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+
+@contextmanager
+def profile() -> Iterator[StageProfiler]:
+    """Aggregate the measurements of all the stages run within the context
+
+    Example::
+        >>> from doctr.models import ocr_predictor
+        >>> from doctr.utils.profiling import profile
+        >>> model = ocr_predictor(pretrained=True)
+        >>> with profile() as profiler:
+        ...     out = model(pages)
+        >>> print(profiler.render())
+
+    Returns:
+        the profiler aggregating the measurements
+    """
+    profiler = StageProfiler()
+    register_hook(profiler)
+    try:
+        yield profiler
+    finally:
+        remove_hook(profiler)
@@ -0,0 +1,72 @@
+# Copyright (C) 2021, Mindee.
+
+# This program is licensed under the Apache License version 2.
+# See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
+
+import os
+import time
+from itertools import groupby
+import numpy as np
+import torch
+from torch.nn import functional as F
+
+# The vectorized decoder is specific to the PyTorch backend
+os.environ["USE_TORCH"] = "1"
+
+from doctr.datasets import VOCABS
+from doctr.models.recognition import CTCPostProcessor
+
+
+def groupby_best_path(logits, vocab, blank):
+    # Reference implementation: collapse of each sequence with itertools.groupby
+    probs = F.softmax(logits, dim=-1)
+    best_path = torch.argmax(probs, dim=-1)
+    probs, _ = torch.max(probs, dim=-1)
+    probs, _ = torch.min(probs, dim=1)
+    words = [''.join(vocab[k] for k, _ in groupby(sequence.tolist()) if k != blank) for sequence in best_path]
+    return list(zip(words, probs.tolist()))
+
+
+def main(args):
+
+    vocab = VOCABS[args.vocab]
+    torch.manual_seed(args.seed)
+    # Peaky logits, with blanks on half of the steps as on trained models
+    logits = torch.randn(args.batch_size, args.seq_len, len(vocab) + 1)
+    logits[..., -1] += 3 * (torch.rand(args.batch_size, args.seq_len) < .5)
+
+    decoders = {
+        'groupby': lambda x: groupby_best_path(x, vocab, len(vocab)),
+        'vectorized': lambda x: CTCPostProcessor.ctc_best_path(x, vocab, len(vocab)),
+    }
+    assert [w for w, _ in decoders['groupby'](logits)] == [w for w, _ in decoders['vectorized'](logits)]
+
+    for name, decoder in decoders.items():
+        # Warmup
+        decoder(logits)
+        timings = []
+        for _ in range(args.it):
+            start_ts = time.perf_counter()
+            decoder(logits)
+            timings.append(time.perf_counter() - start_ts)
+        print(f"CTC decoding ({name}): {1000 * np.median(timings):.2f}ms per batch of {args.batch_size}")
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DocTR CTC decoding benchmark',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--vocab', type=str, default='french', help='Vocab of the logits')
+    parser.add_argument('-b', '--batch-size', dest='batch_size', type=int, default=128, help='Batch size')
+    parser.add_argument('--seq-len', dest='seq_len', type=int, default=32, help='Number of time steps')
+    parser.add_argument('--it', type=int, default=100, help='Number of timed iterations')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the logits')
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args)
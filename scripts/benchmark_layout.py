@@ -0,0 +1,93 @@
+# Copyright (C) 2021, Mindee.
+
+# This program is licensed under the Apache License version 2.
+# See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
+
+import os
+import time
+import numpy as np
+
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+
+from doctr.models import DocumentBuilder
+
+
+def synthetic_page(num_words, rotated_bbox, rng):
+    """Dense page of jittered words laid out on a grid, like a table or an invoice"""
+    num_cols = max(1, int(np.sqrt(num_words / 2)))
+    num_rows = int(np.ceil(num_words / num_cols))
+    col_w, row_h = 1 / num_cols, 1 / num_rows
+    rows, cols = np.divmod(np.arange(num_words), num_cols)
+    w = col_w * rng.uniform(.4, .9, size=num_words)
+    h = row_h * rng.uniform(.5, .7, size=num_words)
+    x = (cols + .5) * col_w + rng.uniform(-.02, .02, size=num_words) * col_w
+    y = (rows + .5) * row_h + rng.uniform(-.05, .05, size=num_words) * row_h
+    scores = rng.rand(num_words)
+    if rotated_bbox:
+        return np.stack((x, y, w, h, np.zeros(num_words), scores), axis=1)
+    return np.stack((x - w / 2, y - h / 2, x + w / 2, y + h / 2, scores), axis=1)
+
+
+def synthetic_lines(num_lines, rng):
+    """Lines of a multi-column page, split into paragraphs"""
+    num_cols = max(1, int(np.sqrt(num_lines) / 8))
+    lines_per_col = int(np.ceil(num_lines / num_cols))
+    col_w, line_h = 1 / num_cols, 1 / (1.2 * lines_per_col)
+    cols, rows = np.divmod(np.arange(num_lines), lines_per_col)
+    # Leave an empty line every few lines to form paragraphs
+    rows = rows + rows // rng.randint(5, 15)
+    ymin = rows * line_h / (1 + lines_per_col // 5)
+    xmin = (cols + .05) * col_w
+    xmax = xmin + col_w * rng.uniform(.6, .9, size=num_lines)
+    return np.stack((xmin, ymin, xmax, ymin + .8 * line_h), axis=1)
+
+
+def main(args):
+
+    rng = np.random.RandomState(args.seed)
+    for rotated_bbox in (False, True):
+        doc_builder = DocumentBuilder(resolve_lines=True, rotated_bbox=rotated_bbox)
+        for num_words in args.num_words:
+            boxes = synthetic_page(num_words, rotated_bbox, rng)
+            word_preds = [('word', 1.)] * num_words
+            timings = []
+            for _ in range(args.it):
+                start_ts = time.perf_counter()
+                doc_builder([boxes], word_preds, [(1024, 1024)])
+                timings.append(time.perf_counter() - start_ts)
+            mode = "rotated" if rotated_bbox else "straight"
+            print(f"{num_words} words ({mode} boxes): {1000 * np.median(timings):.2f} ms/page")
+
+    # Block resolution
+    for num_lines in args.num_lines:
+        boxes = synthetic_lines(num_lines, rng)
+        lines = [[idx] for idx in range(num_lines)]
+        for block_resolver in DocumentBuilder.block_resolvers:
+            doc_builder = DocumentBuilder(resolve_lines=True, resolve_blocks=True, block_resolver=block_resolver)
+            timings = []
+            for _ in range(args.it):
+                start_ts = time.perf_counter()
+                doc_builder._resolve_blocks(boxes, lines)
+                timings.append(time.perf_counter() - start_ts)
+            print(f"{num_lines} lines ({block_resolver}): {1000 * np.median(timings):.2f} ms/page")
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DocTR layout analysis benchmark',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--num-words', dest='num_words', type=int, nargs='+', default=[100, 1000, 5000],
+                        help='Number of words per synthetic page')
+    parser.add_argument('--num-lines', dest='num_lines', type=int, nargs='+', default=[10, 50, 200, 1000, 3000],
+                        help='Number of lines per synthetic page for block resolution')
+    parser.add_argument('--it', type=int, default=10, help='Number of timed iterations')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic pages')
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args)
@@ -0,0 +1,53 @@
+# Copyright (C) 2021, Mindee.
+
+# This program is licensed under the Apache License version 2.
+# See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
+
+import os
+import time
+import numpy as np
+
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+
+from doctr.models import recognition_predictor
+
+
+def main(args):
+
+    rng = np.random.RandomState(args.seed)
+    # Synthetic word crops with a realistic spread of aspect ratios (from 1 to 12 characters)
+    widths = (args.height * rng.uniform(.6, 8, size=args.num_crops)).astype(int)
+    crops = [(255 * rng.rand(args.height, width, 3)).astype(np.uint8) for width in widths]
+
+    for bucketing in (False, True):
+        predictor = recognition_predictor(args.arch, pretrained=False, batch_size=args.batch_size, bucketing=bucketing)
+        # Warmup
+        predictor(crops[:args.batch_size])
+        timings = []
+        for _ in range(args.it):
+            start_ts = time.perf_counter()
+            predictor(crops)
+            timings.append(time.perf_counter() - start_ts)
+        mode = "bucketed" if bucketing else "fixed-shape"
+        print(f"{args.arch} ({mode}): {args.num_crops / np.median(timings):.1f} crops/s")
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DocTR recognition batching benchmark',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('arch', type=str, nargs='?', default='crnn_vgg16_bn', help='Recognition model to use')
+    parser.add_argument('--num-crops', dest='num_crops', type=int, default=512, help='Number of crops per call')
+    parser.add_argument('--height', type=int, default=32, help='Height of the synthetic crops')
+    parser.add_argument('-b', '--batch-size', dest='batch_size', type=int, default=128, help='Recognition batch size')
+    parser.add_argument('--it', type=int, default=5, help='Number of timed iterations')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic crops')
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args)
@@ -0,0 +1,75 @@
+# Copyright (C) 2021, Mindee.
+
+# This program is licensed under the Apache License version 2.
+# See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0.txt> for full license details.
+
+import os
+import io
+import json
+import time
+import numpy as np
+
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+
+from doctr.documents import Document
+from doctr.models import DocumentBuilder
+
+
+def synthetic_document(num_pages, words_per_page, columnar, rng):
+    """Document of jittered words laid out on a grid"""
+    boxes = []
+    for _ in range(num_pages):
+        xmin, ymin = rng.rand(words_per_page) * .9, rng.rand(words_per_page) * .95
+        boxes.append(np.stack((xmin, ymin, xmin + .08, ymin + .02, rng.rand(words_per_page)), axis=1))
+    word_preds = [(f"word{idx % 1000}", float(conf)) for idx, conf in enumerate(rng.rand(num_pages * words_per_page))]
+    doc_builder = DocumentBuilder(resolve_lines=True, columnar=columnar)
+    return doc_builder(boxes, word_preds, [(1024, 768)] * num_pages)
+
+
+def timeit(fn, it):
+    timings = []
+    for _ in range(it):
+        start_ts = time.perf_counter()
+        out = fn()
+        timings.append(time.perf_counter() - start_ts)
+    return out, 1000 * np.median(timings)
+
+
+def main(args):
+
+    rng = np.random.RandomState(args.seed)
+    for columnar in (False, True):
+        doc = synthetic_document(args.num_pages, args.words_per_page, columnar, rng)
+        mode = "columnar" if columnar else "elements"
+
+        out, duration = timeit(lambda: json.dumps(doc.export()), args.it)
+        print(f"{mode} - export + json.dumps: {duration:.1f} ms ({len(out) / 1e6:.2f} MB)")
+        out, duration = timeit(lambda: doc.to_json(io.StringIO()), args.it)
+        print(f"{mode} - to_json (stream): {duration:.1f} ms")
+        data, duration = timeit(doc.to_bytes, args.it)
+        print(f"{mode} - to_bytes: {duration:.1f} ms ({len(data) / 1e6:.2f} MB)")
+        loaded, duration = timeit(lambda: Document.from_bytes(data), args.it)
+        print(f"{mode} - from_bytes: {duration:.1f} ms")
+
+        # Round-trip
+        assert loaded.render() == doc.render()
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DocTR document serialization benchmark',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--num-pages', dest='num_pages', type=int, default=20, help='Number of pages of the document')
+    parser.add_argument('--words-per-page', dest='words_per_page', type=int, default=500,
+                        help='Number of words per page')
+    parser.add_argument('--it', type=int, default=5, help='Number of timed iterations')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic document')
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args)
@@ -1,3 +1,6 @@
+import io
+import json
+import pytest
 import numpy as np
 from doctr.documents import elements
 
@@ -195,3 +198,104 @@ def test_document():
 
     # Show
     doc.show([np.zeros((256, 256, 3), dtype=np.uint8) for _ in range(len(pages))], block=False)
+
+
+def test_columnar_document():
+    doc = elements.ColumnarDocument(
+        values=["hello", "world", "!", "bye"],
+        confidences=np.array([.5, .75, .25, .125]),
+        geometry=np.array([[0, 0, .5, .5], [.5, .5, 1, 1], [0, .625, .125, .75], [0, 0, .25, .25]]),
+        word_lines=np.array([0, 0, 1, 2]),
+        line_blocks=np.array([0, 1, 2]),
+        block_pages=np.array([0, 0, 2]),
+        dimensions=[(300, 200), (300, 200), (500, 1000)],
+    )
+    ref_doc = elements.Document([
+        elements.Page([
+            elements.Block([elements.Line([
+                elements.Word("hello", .5, ((0., 0.), (.5, .5))),
+                elements.Word("world", .75, ((.5, .5), (1., 1.))),
+            ])]),
+            elements.Block([elements.Line([
+                elements.Word("!", .25, ((0., .625), (.125, .75))),
+            ])]),
+        ], 0, (300, 200)),
+        elements.Page([], 1, (300, 200)),
+        elements.Page([
+            elements.Block([elements.Line([
+                elements.Word("bye", .125, ((0., 0.), (.25, .25))),
+            ])]),
+        ], 2, (500, 1000)),
+    ])
+
+    assert isinstance(doc, elements.Document)
+    assert len(doc.pages) == 3
+    assert isinstance(doc.pages[0].blocks[0].lines[0].words[0], elements.Word)
+    assert doc.pages[0].blocks[0].geometry == ((0., 0.), (1., 1.))
+    assert doc.render() == ref_doc.render()
+    assert doc.export() == ref_doc.export()
+    assert repr(doc) == repr(ref_doc)
+    # Page index can be updated
+    doc.pages[2].page_idx = 5
+    assert doc.pages[2].page_idx == 5
+    # Word attributes are written through to the columns
+    word = doc.pages[0].blocks[0].lines[0].words[0]
+    word.value, word.confidence, word.geometry = "greetings", .625, ((0., 0.), (.375, .5))
+    assert doc.pages[0].blocks[0].lines[0].words[0].export() == dict(
+        value="greetings", confidence=.625, geometry=((0., 0.), (.375, .5))
+    )
+    assert doc.pages[0].blocks[0].lines[0].words[1].value == "world"
+    with pytest.raises(AttributeError):
+        doc.pages[0].blocks[0].lines[0].geometry = ((0., 0.), (1., 1.))
+
+    # Rotated boxes
+    r_doc = elements.ColumnarDocument(["hello"], np.array([.5]), np.array([[.5, .5, .25, .125, 10]]), np.array([0]),
+                                      np.array([0]), np.array([0]), [(300, 200)])
+    assert r_doc.pages[0].blocks[0].lines[0].geometry == (.5, .5, .25, .125, 10.)
+
+    # Unsorted elements
+    with pytest.raises(ValueError):
+        elements.ColumnarDocument(["hello", "world"], np.array([.9, .8]), np.zeros((2, 4)), np.array([1, 0]),
+                                  np.array([0, 0]), np.array([0, 0]), [(300, 200)])
+
+
+def test_document_serialization():
+    doc = elements.Document(_mock_pages())
+    # JSON
+    assert doc.to_json() == json.dumps(doc.export())
+    stream = io.StringIO()
+    assert doc.to_json(stream) is None
+    assert stream.getvalue() == json.dumps(doc.export())
+    # Artefacts are not supported by the binary format
+    with pytest.raises(ValueError):
+        doc.to_bytes()
+
+    # Binary
+    doc = elements.Document([
+        elements.Page([elements.Block(_mock_lines()), elements.Block(_mock_lines((.5, .5)))], 0, (300, 200),
+                      {"value": 0., "confidence": 1.}, {"value": "EN", "confidence": 0.8}),
+        elements.Page([], 1, (500, 1000)),
+    ])
+    data = doc.to_bytes()
+    assert isinstance(data, bytes)
+    loaded = elements.Document.from_bytes(data)
+    assert isinstance(loaded, elements.ColumnarDocument)
+    assert loaded.render() == doc.render()
+    assert loaded.to_json() == json.dumps(loaded.export())
+    assert [page.export()["orientation"] for page in loaded.pages] == [page.orientation for page in doc.pages]
+    assert np.all(np.asarray(loaded.pages[0].blocks[1].lines[0].words[1].geometry) ==
+                  np.asarray(doc.pages[0].blocks[1].lines[0].words[1].geometry))
+    assert loaded.to_bytes() == data
+    with pytest.raises(ValueError):
+        elements.Document.from_bytes(b"NOPE" + data[4:])
+
+    # The storage of the words doesn't depend on the longest one
+    def _columnar(values):
+        return elements.ColumnarDocument(
+            values, np.ones(len(values)), np.zeros((len(values), 4)), np.zeros(len(values), dtype=np.int64),
+            np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64), [(300, 200)],
+        )
+    short_doc, long_doc = _columnar(["a"] * 100), _columnar(["a"] * 99 + ["a" * 1000])
+    assert len(long_doc._text) - len(short_doc._text) == 999
+    assert len(long_doc.to_bytes()) - len(short_doc.to_bytes()) == 999
+    assert elements.Document.from_bytes(long_doc.to_bytes()).values == long_doc.values
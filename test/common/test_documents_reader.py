@@ -113,6 +113,13 @@ def test_pdf(mock_pdf):
     pages = doc.as_images()
     _check_doc_content(pages, 8)
 
+    # Lazy page iteration
+    lazy_pages = doc.iter_images()
+    assert not isinstance(lazy_pages, list)
+    lazy_pages = list(lazy_pages)
+    _check_doc_content(lazy_pages, 8)
+    assert all(np.all(page == lazy_page) for page, lazy_page in zip(pages, lazy_pages))
+
     # Get words
     words = doc.get_words()
     assert isinstance(words, list) and len(words) == 8
@@ -6,7 +6,7 @@ import cv2
 
 from doctr.documents import reader
 from doctr import models
-from doctr.documents import Document, DocumentFile
+from doctr.documents import Document, DocumentFile, ColumnarDocument
 
 
 def test_extract_crops(mock_pdf):  # noqa: F811
@@ -63,6 +63,127 @@ def test_extract_rcrops(mock_pdf):  # noqa: F811
     assert models.extract_crops(doc_img, np.zeros((0, 5))) == []
 
 
+def test_extract_crops_batch(mock_pdf):  # noqa: F811
+    doc_img = DocumentFile.from_pdf(mock_pdf).as_images()[0]
+    boxes = np.array([[.1, .1, .5, .12], [.5, .5, .55, .6], [.2, .2, .2, .3]], dtype=np.float32)
+    rboxes = np.array([[.2, .2, .2, .05, 0], [.5, .5, .1, .02, 10]], dtype=np.float32)
+
+    with pytest.raises(AssertionError):
+        models.extract_crops_batch(doc_img, np.zeros((1, 6)), (32, 128))
+    with pytest.raises(AssertionError):
+        models.extract_crops_batch(doc_img, boxes, (32, 128), out=np.zeros((3, 32, 128, 3), dtype=np.float32))
+
+    for _boxes in (boxes, rboxes):
+        batch = models.extract_crops_batch(doc_img, _boxes, (32, 128))
+        assert isinstance(batch, np.ndarray) and batch.dtype == np.uint8
+        assert batch.shape == (_boxes.shape[0], 32, 128, 3)
+    # Wide crop is resized with deformation-free scaling and padded at the bottom
+    batch = models.extract_crops_batch(doc_img, boxes, (32, 128))
+    crop = models.extract_crops(doc_img, boxes[:1])[0]
+    assert np.all(batch[0, int(128 * crop.shape[0] / crop.shape[1]) + 1:] == 0)
+    # Narrow crop is padded on the right
+    assert np.all(batch[1, :, 64:] == 0)
+    # Degenerate box
+    assert np.all(batch[2] == 0)
+    # Deformation
+    batch = models.extract_crops_batch(doc_img, boxes[:2], (32, 128), preserve_aspect_ratio=False)
+    assert np.any(batch[1, :, 64:] != 0)
+    # Identity
+    identity = models.extract_crops_batch(doc_img, np.array([[0, 0, 1, 1]], dtype=np.float32), doc_img.shape[:2],
+                                          preserve_aspect_ratio=False)
+    assert np.all(identity[0] == doc_img)
+    # Preallocated buffer
+    out = np.zeros((4, 32, 128, 3), dtype=np.uint8)
+    batch = models.extract_crops_batch(doc_img, boxes[:2], (32, 128), out=out[1:3])
+    assert np.shares_memory(batch, out) and np.all(out[0] == 0) and np.all(out[1:3] == batch)
+
+    # No box
+    assert models.extract_crops_batch(doc_img, np.zeros((0, 4)), (32, 128)).shape == (0, 32, 128, 3)
+
+
+def test_blank_page_detector(mock_pdf):  # noqa: F811
+    detector = models.BlankPageDetector()
+    assert repr(detector) == "BlankPageDetector(thumbnail_size=256, ink_thresh=40, min_ink_ratio=0.001)"
+
+    blank = np.full((1100, 850, 3), 255, dtype=np.uint8)
+    # Scanning noise
+    noisy = (blank - np.random.randint(0, 20, blank.shape)).astype(np.uint8)
+    # A single line of text
+    text = blank.copy()
+    cv2.putText(text, "Hello world", (100, 500), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 3)
+    assert detector([blank, noisy, text]) == [True, True, False]
+    assert detector.ink_ratio(blank) == 0
+    # Every page of the paper has text
+    assert not any(detector(DocumentFile.from_pdf(mock_pdf).as_images()))
+
+
+def test_recognition_cache():
+    cache = models.RecognitionCache(max_size=2)
+    assert repr(cache) == "RecognitionCache(max_size=2)"
+
+    crops = []
+    for word in ("hello", "world", "!"):
+        crop = np.full((32, 128, 3), 255, dtype=np.uint8)
+        cv2.putText(crop, word, (4, 24), cv2.FONT_HERSHEY_SIMPLEX, .8, (0, 0, 0), 2)
+        crops.append(crop)
+    thumbnails = [cache.thumbnail(crop) for crop in crops]
+    assert all(thumbnail.shape == (16, 64) and thumbnail.dtype == np.uint8 for thumbnail in thumbnails)
+    keys = [cache.key(thumbnail) for thumbnail in thumbnails]
+    # Crops are bucketed by thumbnail shape
+    assert len(set(keys)) == 1
+    assert cache.key(cache.thumbnail(crops[0][:, :64])) != keys[0]
+    # Same crop, at a different scale
+    assert np.abs(cache.thumbnail(crops[0].repeat(2, axis=0).repeat(2, axis=1)).astype(int) - thumbnails[0]).max() <= 1
+    # Distinct models
+    assert cache.key(thumbnails[0], "CRNN") != keys[0]
+
+    # Repetitions of a missing crop only need to be identified once
+    preds, groups = cache.lookup([keys[0], keys[1], keys[0]], [thumbnails[0], thumbnails[1], thumbnails[0]])
+    assert preds == [None, None, None] and groups == [[0, 2], [1]]
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'hit_rate': 1 / 3}
+    cache.put(keys[0], ('hello', .9), thumbnails[0])
+    cache.put(keys[1], ('world', .8), thumbnails[1])
+    assert cache.get(keys[0], thumbnails[0]) == ('hello', .9)
+    # Same crop, with a lower contrast
+    assert cache.get(keys[0], cache.thumbnail(crops[0] // 2 + 64)) == ('hello', .9)
+    # Hits are confirmed by the thumbnails
+    assert cache.get(keys[0], 255 - thumbnails[0]) is None
+    # Least recently used entries are evicted
+    cache.put(keys[2], ('!', .7), thumbnails[2])
+    assert len(cache) == 2
+    assert cache.get(keys[1], thumbnails[1]) is None and cache.get(keys[2], thumbnails[2]) == ('!', .7)
+    assert cache.stats() == {'hits': 4, 'misses': 4, 'hit_rate': .5}
+    cache.clear()
+    assert len(cache) == 0 and cache.stats() == {'hits': 0, 'misses': 0, 'hit_rate': 0.}
+
+    # Intensities perturbed by a grey level across a quantization boundary still match
+    crop = np.full((32, 128, 3), 255, dtype=np.uint8)
+    crop[:, :16] = 0
+    crop[8: 24, 96:] = 95
+    perturbed = crop.copy()
+    perturbed[8: 24, 96:] = 96
+    thumbnail, perturbed_thumbnail = cache.thumbnail(crop), cache.thumbnail(perturbed)
+    assert np.any(thumbnail >> 5 != perturbed_thumbnail >> 5)
+    cache.put(cache.key(thumbnail), ('hello', .9), thumbnail)
+    assert cache.get(cache.key(perturbed_thumbnail), perturbed_thumbnail) == ('hello', .9)
+
+
+def test_estimate_text_height():
+    heights = []
+    for font_scale in (1, 2):
+        page = np.full((1600, 1200, 3), 255, dtype=np.uint8)
+        for y in range(200, 1400, 100 * font_scale):
+            cv2.putText(page, "Hello world", (100, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), 2 * font_scale)
+        (_, text_height), _ = cv2.getTextSize("Hello world", cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2 * font_scale)
+        heights.append(models.estimate_text_height(page))
+        assert .4 * text_height <= heights[-1] <= 1.5 * text_height
+    # The estimate scales with the font, downscaled pages included
+    assert 1.6 <= heights[1] / heights[0] <= 2.4
+    assert abs(models.estimate_text_height(page, max_size=800) - heights[1]) <= .25 * heights[1]
+    # Blank page
+    assert models.estimate_text_height(np.full((512, 512, 3), 255, dtype=np.uint8)) == 0
+
+
 def test_documentbuilder():
 
     words_per_page = 10
@@ -84,6 +205,16 @@ def test_documentbuilder():
     doc_builder = models.DocumentBuilder(resolve_lines=True, resolve_blocks=True)
     out = doc_builder([boxes, boxes], [('hello', 1.0)] * (num_pages * words_per_page), [(100, 200), (100, 200)])
 
+    # Columnar storage
+    c_builder = models.DocumentBuilder(resolve_lines=True, resolve_blocks=True, columnar=True)
+    word_preds = [(f"w{idx}", 1.0) for idx in range(num_pages * words_per_page)]
+    c_out = c_builder([boxes, boxes], word_preds, [(100, 200), (100, 200)])
+    assert isinstance(c_out, ColumnarDocument)
+    assert c_out.render() == doc_builder([boxes, boxes], word_preds, [(100, 200), (100, 200)]).render()
+    assert [len(block.lines) for page in c_out.pages for block in page.blocks] == \
+        [len(block.lines) for page in out.pages for block in page.blocks]
+    assert len(c_builder([np.zeros((0, 5))], [], [(100, 200)]).pages[0].blocks) == 0
+
     # No detection
     boxes = np.zeros((0, 5))
     out = doc_builder([boxes, boxes], [], [(100, 200), (100, 200)])
@@ -92,6 +223,20 @@ def test_documentbuilder():
     # Repr
     assert repr(doc_builder) == "DocumentBuilder(resolve_lines=True, resolve_blocks=True, paragraph_break=0.035)"
 
+    # XY-cut block resolution
+    with pytest.raises(ValueError):
+        models.DocumentBuilder(block_resolver='unknown')
+    doc_builder = models.DocumentBuilder(resolve_lines=True, resolve_blocks=True, block_resolver='xy_cut')
+    # Two columns and a footer
+    boxes = np.array([
+        [.05, .1, .4, .12], [.6, .1, .95, .12], [.05, .13, .4, .15], [.6, .13, .95, .15],
+        [.05, .16, .4, .18], [.6, .16, .95, .18], [.05, .8, .95, .82],
+    ])
+    lines = [[idx] for idx in range(boxes.shape[0])]
+    assert doc_builder._resolve_blocks(boxes, lines) == [[[0], [2], [4]], [[1], [3], [5]], [[6]]]
+    assert repr(doc_builder) == ("DocumentBuilder(resolve_lines=True, resolve_blocks=True, paragraph_break=0.035, "
+                                 "block_resolver='xy_cut')")
+
 
 @pytest.mark.parametrize(
     "input_boxes, sorted_idxs",
@@ -119,6 +264,8 @@ def test_sort_boxes(input_boxes, sorted_idxs):
         [[[0, 0.5, 0.18, 0.6], [0.2, 0.48, 0.35, 0.58], [0.8, 0.52, 0.9, 0.63]], [[0, 1], [2]]],  # ~same line
         [[[0, 0.3, 0.48, 0.45], [0.5, 0.28, 0.75, 0.42], [0, 0.45, 0.1, 0.55]], [[0, 1], [2]]],  # 2 lines
         [[[0, 0.3, 0.4, 0.35], [0.75, 0.28, 0.95, 0.42], [0, 0.45, 0.1, 0.55]], [[0], [1], [2]]],  # 2 lines
+        # Words are compared to the first word of the line, a staircase of close words isn't chained in a single line
+        [[[0, .45, .1, .55], [.11, .49, .21, .59], [.22, .53, .32, .63], [.33, .57, .43, .67]], [[0, 1], [2, 3]]],
     ],
 )
 def test_resolve_lines(input_boxes, lines):
@@ -127,6 +274,15 @@ def test_resolve_lines(input_boxes, lines):
     assert doc_builder._resolve_lines(np.asarray(input_boxes)) == lines
 
 
+def test_resolve_lines_rotated():
+
+    doc_builder = models.DocumentBuilder(rotated_bbox=True)
+    boxes = np.array([[.1, .5, .1, .1, 0], [.22, .51, .1, .1, 0], [.6, .5, .1, .1, 0], [.1, .3, .1, .1, 0]])
+    assert doc_builder._resolve_lines(boxes) == [[3], [0, 1], [2]]
+    # Single box
+    assert doc_builder._resolve_lines(boxes[:1]) == [[0]]
+
+
 @pytest.fixture(scope="function")
 def mock_image(tmpdir_factory):
     url = 'https://github.com/mindee/doctr/releases/download/v0.2.1/bitmap30.png'
@@ -157,3 +313,26 @@ def test_estimate_orientation(mock_image):
 def test_rotate_page(mock_bitmap):
     rotated = models.rotate_page(mock_bitmap, -30.)
     assert abs(models.get_bitmap_angle(rotated) - 0.) < 1.
+
+
+def test_extract_crops_deskew(mock_image):
+    boxes = np.array([[.2, .3, .5, .4], [.4, .5, .6, .55]], dtype=np.float32)
+    rboxes = np.array([[.3, .3, .2, .05, 0], [.5, .6, .1, .05, 5]], dtype=np.float32)
+    deskewed = models.rotate_page(mock_image, -30.)
+
+    # Crops are taken from the skewed page as if it had been rotated beforehand
+    for crops, ref_crops in (
+        (models.extract_crops(mock_image, boxes, angle=-30.), models.extract_crops(deskewed, boxes)),
+        (models.extract_rcrops(mock_image, rboxes, angle=-30.), models.extract_rcrops(deskewed, rboxes)),
+        (models.extract_crops_batch(mock_image, boxes, (32, 128), angle=-30.),
+         models.extract_crops_batch(deskewed, boxes, (32, 128))),
+    ):
+        assert len(crops) == len(ref_crops)
+        for crop, ref_crop in zip(crops, ref_crops):
+            assert crop.shape == ref_crop.shape
+            assert np.mean(np.abs(crop.astype(np.float32) - ref_crop.astype(np.float32))) < 10
+
+    # Small angles are ignored
+    assert all(np.all(crop == ref_crop) for crop, ref_crop in zip(
+        models.extract_crops(mock_image, boxes, angle=.5), models.extract_crops(mock_image, boxes)
+    ))
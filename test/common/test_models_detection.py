@@ -1,4 +1,5 @@
 import numpy as np
+import cv2
 
 from doctr.models import detection
 
@@ -53,6 +54,59 @@ def test_dbpostprocessor():
     assert isinstance(r_out, tuple) and len(r_out) == 5
 
 
+def test_unclip_rectangles():
+    postprocessor = detection.DBPostProcessor()
+    rng = np.random.RandomState(0)
+    xy = rng.randint(0, 500, (50, 2))
+    rects = np.concatenate((xy, xy + rng.randint(2, 200, (50, 2))), axis=1)
+    out = postprocessor.unclip_rectangles(rects)
+    assert out.shape == (50, 4)
+    # Same boxes as the polygon offset
+    for rect, box in zip(rects, out):
+        xmin, ymin, xmax, ymax = rect
+        points = np.array([[xmin, ymin], [xmin, ymax], [xmax, ymax], [xmax, ymin]])
+        assert tuple(box.astype(int)) == postprocessor.polygon_to_box(points)
+
+
+def test_box_scores():
+    pred = np.random.rand(64, 128).astype(np.float32)
+    boxes = np.array([[0, 0, 127, 63], [10, 5, 20, 15], [120.5, 60.2, 140, 70], [3, 4, 3, 4]])
+    scores = detection.DBPostProcessor.box_scores(pred, boxes)
+    assert scores.shape == (4,)
+    for box, score in zip(boxes, scores):
+        points = np.array([[box[0], box[1]], [box[0], box[3]], [box[2], box[3]], [box[2], box[1]]])
+        assert abs(score - detection.DBPostProcessor.box_score(pred, points)) < 1e-5
+    assert detection.DBPostProcessor.box_scores(pred, np.zeros((0, 4))).shape == (0,)
+
+
+def test_box_score_rotated():
+    pred = np.random.rand(64, 128).astype(np.float32)
+    for polygon in (
+        np.array([[10, 10], [40, 5], [42, 15], [12, 20]]),
+        # Partially out of the page
+        np.array([[[100, 50]], [[140, 55]], [[138, 70]], [[98, 65]]]),
+    ):
+        # Scoring on the whole page
+        mask = np.zeros(pred.shape, np.int32)
+        cv2.fillPoly(mask, [polygon.reshape(-1, 2).astype(np.int32)], 1.0)
+        product = pred * mask
+        ref_score = np.sum(product) / np.count_nonzero(product)
+        assert abs(detection.DBPostProcessor.box_score(pred, polygon, rotated_bbox=True) - ref_score) < 1e-6
+
+
+def test_postprocessor_skewed_page():
+    # Skewed lines of text
+    proba_map = np.zeros((512, 512), dtype=np.float32)
+    for y in range(100, 450, 50):
+        cv2.fillPoly(proba_map, [cv2.boxPoints(((256, y), (200, 20), -10)).astype(np.int32)], 1.)
+    for postprocessor in (detection.DBPostProcessor(), detection.LinkNetPostProcessor()):
+        out, angles = postprocessor(proba_map[None, ...])
+        assert abs(abs(angles[0]) - 10) < 1
+        # Boxes are straight on the deskewed page
+        assert out[0].shape[0] == 7
+        assert np.all(out[0][:, 2] - out[0][:, 0] > 3 * (out[0][:, 3] - out[0][:, 1]))
+
+
 def test_linknet_postprocessor():
     postprocessor = detection.LinkNetPostProcessor()
     r_postprocessor = detection.LinkNetPostProcessor(rotated_bbox=True)
@@ -67,3 +121,62 @@ def test_linknet_postprocessor():
     assert all(sample.shape[1] == 6 for sample in r_out)
     # Relative coords
     assert all(np.all(np.logical_and(sample[:4] >= 0, sample[:4] <= 1)) for sample in out)
+
+
+def test_parallel_postprocessing():
+    mock_batch = np.random.rand(3, 256, 256).astype(np.float32)
+    for postprocessor_cls in (detection.DBPostProcessor, detection.LinkNetPostProcessor):
+        ref_out, ref_angles = postprocessor_cls()(mock_batch)
+        postprocessor = postprocessor_cls()
+        postprocessor.num_workers = 2
+        out, angles = postprocessor(mock_batch)
+        # Pages are returned in order
+        assert len(out) == 3
+        assert all(np.array_equal(boxes, ref_boxes) for boxes, ref_boxes in zip(out, ref_out))
+        assert angles == ref_angles
+        assert repr(postprocessor).endswith("num_workers=2)")
+        postprocessor.close()
+        assert postprocessor._executor is None
+        # The pool is released when leaving the context
+        with postprocessor_cls() as postprocessor:
+            postprocessor.num_workers = 2
+            postprocessor(mock_batch)
+            assert postprocessor._executor is not None
+        assert postprocessor._executor is None and len(postprocessor._shared_blocks) == 0
+
+
+def test_postprocessing_padding():
+    # A word on the valid region, and noise on the padding
+    proba_map = np.zeros((2, 256, 256), dtype=np.float32)
+    proba_map[:, 100: 120, 50: 150] = 1.
+    proba_map[:, :, 200:] = 1.
+    sizes = [(256, 200), (160, 200)]
+    for postprocessor in (detection.DBPostProcessor(), detection.LinkNetPostProcessor()):
+        out, _ = postprocessor(proba_map, sizes)
+        for boxes, (h, w) in zip(out, sizes):
+            assert boxes.shape[0] == 1
+            # Relative to the valid region
+            assert abs((boxes[0, 0] + boxes[0, 2]) / 2 - 100 / w) < .02
+            assert abs((boxes[0, 1] + boxes[0, 3]) / 2 - 110 / h) < .02
+        postprocessor.num_workers = 2
+        parallel_out, _ = postprocessor(proba_map, sizes)
+        assert all(np.array_equal(boxes, ref_boxes) for boxes, ref_boxes in zip(parallel_out, out))
+        postprocessor.close()
+
+
+def test_postprocessing_compact_maps():
+    proba_map = np.zeros((2, 512, 512), dtype=np.float32)
+    proba_map[:, 100: 120, 50: 150] = .8
+    proba_map[1, 300: 330, 200: 400] = .6
+    kernel = np.ones((2, 2), np.uint8)
+    for postprocessor in (detection.DBPostProcessor(), detection.LinkNetPostProcessor()):
+        bitmaps = np.stack([
+            cv2.morphologyEx((p_ > postprocessor.bin_thresh).astype(np.uint8), cv2.MORPH_OPEN, kernel)
+            for p_ in proba_map
+        ])
+        ref_out, ref_angles = postprocessor(proba_map)
+        # Quantized maps & precomputed bitmaps
+        out, angles = postprocessor((255 * proba_map).round().astype(np.uint8), bitmaps=bitmaps)
+        assert [boxes.shape for boxes in out] == [boxes.shape for boxes in ref_out]
+        assert all(np.allclose(boxes, ref_boxes, atol=1 / 255) for boxes, ref_boxes in zip(out, ref_out))
+        assert angles == ref_angles
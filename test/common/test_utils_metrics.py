@@ -190,6 +190,19 @@ def test_nms():
     ]
     to_keep = metrics.nms(np.asarray(boxes), thresh=0.2)
     assert to_keep == [0, 2]
+    # Boxes reaching the threshold are suppressed
+    assert metrics.nms(np.asarray([[0, 0, 2, 1, .9], [1, 0, 3, 1, .8]]), thresh=1 / 3) == [0]
+
+
+def test_rbox_nms():
+    boxes = [
+        [50, 50, 40, 20, 0, 0.95],
+        [52, 50, 40, 20, 10, 0.90],  # to suppress
+        [200, 200, 40, 20, 30, 0.92],
+        [300, 300, 10, 10, 0, 0.5],
+    ]
+    to_keep = metrics.rbox_nms(np.asarray(boxes, dtype=np.float32), thresh=0.3)
+    assert to_keep == [0, 2, 3]
 
 
 def test_box_ioa():
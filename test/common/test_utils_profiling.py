@@ -0,0 +1,52 @@
+import pytest
+
+from doctr.utils import profiling
+
+
+def test_stage():
+    # No hook: no-op
+    with profiling.stage("test", items=2) as info:
+        info["other"] = 1
+    assert info == {"items": 2, "other": 1}
+
+    records = []
+
+    def hook(name, wall_time, cpu_time, info):
+        records.append((name, wall_time, cpu_time, info))
+
+    profiling.register_hook(hook)
+    with profiling.stage("test", items=2):
+        pass
+    profiling.remove_hook(hook)
+    with profiling.stage("test", items=2):
+        pass
+    assert len(records) == 1
+    assert records[0][0] == "test" and records[0][1] >= 0 and records[0][2] >= 0
+    assert records[0][3] == {"items": 2}
+
+    with pytest.raises(ValueError):
+        profiling.remove_hook(hook)
+
+
+def test_profile():
+    with profiling.profile() as profiler:
+        for _ in range(3):
+            with profiling.stage("outer", pages=2):
+                with profiling.stage("inner", shape=(2, 32, 128, 3)) as info:
+                    info["crops"] = 5
+    # Stages that complete after the context are not recorded
+    with profiling.stage("outer", pages=2):
+        pass
+
+    summary = profiler.summary()
+    assert list(summary.keys()) == ["inner", "outer"]
+    assert summary["outer"]["calls"] == 3 and summary["outer"]["counts"] == {"pages": 6}
+    assert summary["inner"]["counts"] == {"crops": 15}
+    assert summary["inner"]["shapes"] == {(2, 32, 128, 3): 3}
+    assert summary["outer"]["wall_time"] >= summary["inner"]["wall_time"]
+
+    rendered = profiler.render()
+    assert "outer" in rendered and "2x32x128x3 (3)" in rendered
+
+    profiler.reset()
+    assert profiler.summary() == {}
@@ -40,6 +40,11 @@ def test_detection_models(arch_name, input_shape, output_size, out_prob):
         assert np.all(boxes[:, :4] >= 0) and np.all(boxes[:, :4] <= 1)
     # Check loss
     assert isinstance(out['loss'], torch.Tensor)
+    # Inference only returns tensors, the postprocessing is left to the predictor
+    with torch.no_grad():
+        out = model(input_tensor)
+    assert set(out.keys()) == {'out_map'}
+    assert isinstance(out['out_map'], torch.Tensor)
 
 
 @pytest.mark.parametrize(
@@ -39,3 +39,24 @@ def test_preprocessor(batch_size, output_size, input_tensor, expected_batches, e
     assert all(b.shape[-2:] == output_size for b in out)
     assert all(torch.all(b == expected_value) for b in out)
     assert len(repr(processor).split('\n')) == 4
+
+
+def test_preprocessor_dynamic_batches():
+
+    processor = PreProcessor((512, 512), 2)
+    pages = [np.full((1100, 850, 3), 255, dtype=np.uint8)] * 3 + [np.full((400, 1000, 3), 255, dtype=np.uint8)]
+    batches, order, sizes = processor.dynamic_batches(pages)
+    # Aspect ratio is preserved, up to the rounding
+    assert sizes == [(512, 396)] * 3 + [(205, 512)]
+    # Samples are grouped by padded size
+    assert order == [3, 0, 1, 2]
+    assert [tuple(b.shape) for b in batches] == [(1, 3, 224, 512), (2, 3, 512, 416), (1, 3, 512, 416)]
+    assert all(b.dtype == torch.float32 for b in batches)
+    # Padding on the bottom & right sides
+    assert torch.all(batches[1][..., :396] == .5) and torch.all(batches[1][..., 396:] == -.5)
+    assert torch.all(batches[0][..., :205, :] == .5) and torch.all(batches[0][..., 205:, :] == -.5)
+
+    # Per-sample resolution
+    batches, order, sizes = processor.dynamic_batches(pages[2:], long_sides=[256, 1024])
+    assert sizes == [(256, 198), (410, 1024)]
+    assert [tuple(b.shape) for b in batches] == [(1, 3, 256, 224), (1, 3, 416, 1024)]
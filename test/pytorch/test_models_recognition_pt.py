@@ -1,7 +1,8 @@
 import pytest
+import numpy as np
 import torch
 
-from doctr.models import recognition
+from doctr.models import recognition, PreProcessor
 
 
 @pytest.mark.parametrize(
@@ -51,6 +52,90 @@ def test_reco_postprocessors(post_processor, input_shape, mock_vocab):
     assert repr(processor) == f'{post_processor}(vocab_size={len(mock_vocab)})'
 
 
+def test_ctc_best_path():
+    vocab = 'abc'
+    blank = len(vocab)
+    # Best paths: "a a - a b b", "- - - - - -", "c - c c a -"
+    paths = torch.tensor([[0, 0, 3, 0, 1, 1], [3, 3, 3, 3, 3, 3], [2, 3, 2, 2, 0, 3]])
+    logits = 10 * torch.nn.functional.one_hot(paths, num_classes=len(vocab) + 1).to(dtype=torch.float32)
+    decoded = recognition.CTCPostProcessor.ctc_best_path(logits, vocab, blank)
+    assert [word for word, _ in decoded] == ['aab', '', 'cca']
+    assert all(abs(conf - decoded[0][1]) < 1e-6 for _, conf in decoded)
+    # Empty batch
+    assert recognition.CTCPostProcessor.ctc_best_path(logits[:0], vocab, blank) == []
+
+
+def test_master_incremental_decoding(mock_vocab):
+    model = recognition.master(vocab=mock_vocab, d_model=64, dff=128, num_heads=4, num_layers=2).eval()
+    sos, pad = len(mock_vocab) + 1, len(mock_vocab) + 2
+    ys = torch.randint(0, len(mock_vocab) + 3, (2, 10))
+    ys[:, 0] = sos
+    ys[:, -3:] = pad
+    encoded = torch.rand(2, 20, 64)
+    with torch.no_grad():
+        full = model.decoder(ys, encoded, model.make_mask(ys))
+        cache = model.decoder.init_cache(encoded, 10)
+        steps = [model.decoder.decode_step(ys[:, i: i + 1], i, cache, ys[:, :i + 1] == pad) for i in range(10)]
+    # Same output as the decoding of the whole sequences
+    assert torch.allclose(torch.cat(steps, dim=1), full, atol=1e-5)
+
+    # Same logits as the greedy decoding running the whole decoder at each step
+    with torch.no_grad():
+        ref_ys = torch.full((2, model.max_length), pad, dtype=torch.long)
+        ref_ys[:, 0] = sos
+        ref_logits = torch.zeros((2, model.max_length, len(mock_vocab) + 3))
+        for i in range(model.max_length):
+            output = model.decoder(ref_ys[:, :i + 1], encoded, model.make_mask(ref_ys[:, :i + 1]))
+            ref_logits[:, i] = model.linear(output[:, -1])
+            if bool((ref_logits[:, :i + 1].argmax(-1) == len(mock_vocab)).any(dim=1).all()):
+                break
+            if i + 1 < model.max_length - 1:
+                ref_ys[:, i + 1] = ref_logits[:, i].argmax(-1)
+        logits = model.decode(encoded)
+    assert logits.shape == ref_logits.shape
+    assert torch.allclose(logits, ref_logits, atol=1e-5)
+
+    # Decoding stops as soon as all sequences are over
+    with torch.no_grad():
+        model.linear.bias[len(mock_vocab)] = 1e4
+        logits = model.decode(encoded)
+    assert logits.shape == (2, model.max_length, len(mock_vocab) + 3)
+    assert torch.all(logits[:, 1:] == 0)
+    assert model.postprocessor(logits) == [('', 1.), ('', 1.)]
+
+
+def test_sar_decoding(mock_vocab):
+    model = recognition.sar_vgg16_bn(vocab=mock_vocab, rnn_units=64, pretrained=False).eval()
+    input_tensor = torch.rand((3, 3, 32, 128))
+    eos = len(mock_vocab)
+    with torch.no_grad():
+        out = model(input_tensor, return_model_output=True)
+        capped = model(input_tensor, return_model_output=True, aspect_ratios=np.array([.1, .5, 100.]))
+    assert out['out_map'].shape == (3, model.max_length, len(mock_vocab) + 1)
+    # Sequences only emit <eos> after the first one
+    out_idxs = out['out_map'].argmax(-1)
+    after_eos = (torch.cumsum(out_idxs == eos, dim=1) > 0)
+    assert torch.all(out_idxs[after_eos] == eos)
+    # Step caps from the aspect ratio
+    assert model.max_steps(np.array([.1, .5, 100.])).tolist() == [1, 3, model.max_length]
+    assert [word for word, _ in capped['preds']] == [word[:cap] for (word, _), cap in zip(out['preds'], [1, 3, 31])]
+
+    # Decoding stops as soon as all sequences are over
+    with torch.no_grad():
+        model.decoder.output_dense.bias[eos] = 1e4
+        out = model(input_tensor, return_model_output=True)
+    assert torch.all(out['out_map'].argmax(-1) == eos)
+    assert out['preds'] == [('', 1.)] * 3
+
+    predictor = recognition.RecognitionPredictor(
+        PreProcessor(output_size=(32, 128), batch_size=2, preserve_aspect_ratio=True), model, step_caps=True
+    )
+    crops = [(255 * np.random.rand(32, width, 3)).astype(np.uint8) for width in (8, 64, 200)]
+    with torch.no_grad():
+        assert len(predictor(crops)) == len(crops)
+    assert repr(predictor).startswith("RecognitionPredictor(\n  step_caps=True")
+
+
 @pytest.mark.parametrize(
     "arch_name",
     [
@@ -78,3 +163,89 @@ def test_recognition_zoo(arch_name):
     out = predictor(input_tensor)
     assert isinstance(out, list) and len(out) == batch_size
     assert all(isinstance(word, str) and isinstance(conf, float) for word, conf in out)
+
+
+def test_recognitionpredictor_bucketing(mock_vocab):
+    model = recognition.crnn_vgg16_bn(vocab=mock_vocab, pretrained=False).eval()
+    crops = [(255 * np.random.rand(32, width, 3)).astype(np.uint8) for width in (200, 16, 64, 110, 32)]
+
+    # Without trimming, bucketing only changes the processing order
+    predictor = recognition.RecognitionPredictor(PreProcessor(output_size=(32, 128), batch_size=2), model)
+    b_predictor = recognition.RecognitionPredictor(
+        PreProcessor(output_size=(32, 128), batch_size=2), model, bucketing=True
+    )
+    with torch.no_grad():
+        out = predictor(crops)
+        b_out = b_predictor(crops)
+    assert [word for word, _ in b_out] == [word for word, _ in out]
+
+    # Variable width batches
+    b_predictor = recognition.RecognitionPredictor(
+        PreProcessor(output_size=(32, 128), batch_size=2, preserve_aspect_ratio=True), model, bucketing=True
+    )
+    with torch.no_grad():
+        b_out = b_predictor(crops)
+    assert len(b_out) == len(crops)
+    assert all(isinstance(word, str) and isinstance(conf, float) for word, conf in b_out)
+    # Sorted crops are split into batches of increasing width
+    sorted_crops = sorted(crops, key=lambda crop: crop.shape[1] / crop.shape[0])
+    batches = b_predictor._trim_batches(b_predictor.pre_processor(sorted_crops), sorted_crops)
+    assert [batch.shape[-1] for batch in batches] == [32, 112, 128]
+    assert repr(b_predictor).startswith("RecognitionPredictor(\n  bucketing=True")
+
+
+def test_cascade_recognitionpredictor(mock_vocab):
+    fast_predictor = recognition.RecognitionPredictor(
+        PreProcessor(output_size=(32, 128), batch_size=2), recognition.crnn_vgg16_bn(vocab=mock_vocab).eval()
+    )
+    strong_predictor = recognition.RecognitionPredictor(
+        PreProcessor(output_size=(32, 128), batch_size=2), recognition.crnn_resnet31(vocab=mock_vocab).eval()
+    )
+    crops = [(255 * np.random.rand(32, width, 3)).astype(np.uint8) for width in (200, 16, 64, 110, 32)]
+    with torch.no_grad():
+        fast_out = fast_predictor(crops)
+        strong_out = strong_predictor(crops)
+
+        # Only the crops below the confidence threshold go through the strong predictor
+        thresh = sorted(conf for _, conf in fast_out)[2]
+        predictor = recognition.CascadeRecognitionPredictor(fast_predictor, strong_predictor, conf_thresh=thresh)
+        out, stages = predictor(crops, return_stages=True)
+        assert stages == [int(conf < thresh) for _, conf in fast_out]
+        assert out == [strong if stage else fast for fast, strong, stage in zip(fast_out, strong_out, stages)]
+        assert predictor(crops) == out
+        # Already resized crops
+        assert len(predictor(np.stack([np.zeros((32, 128, 3), dtype=np.uint8)] * 3))) == 3
+
+        # Nothing to escalate
+        predictor = recognition.CascadeRecognitionPredictor(fast_predictor, strong_predictor, conf_thresh=0.)
+        assert predictor(crops, return_stages=True) == (fast_out, [0] * len(crops))
+    assert repr(predictor).split('\n')[1] == "  conf_thresh=0.0"
+
+
+def test_recognitionpredictor_cache(mock_vocab):
+    model = recognition.crnn_vgg16_bn(vocab=mock_vocab).eval()
+    predictor = recognition.RecognitionPredictor(PreProcessor(output_size=(32, 128), batch_size=2), model)
+    cache = recognition.RecognitionCache()
+    c_predictor = recognition.RecognitionPredictor(
+        PreProcessor(output_size=(32, 128), batch_size=2), model, cache=cache
+    )
+    crops = [(255 * np.random.rand(32, width, 3)).astype(np.uint8) for width in (200, 16, 64)]
+    crops = crops + [crops[1].copy(), crops[0]]
+    with torch.no_grad():
+        out = predictor(crops)
+        # Identical crops are only identified once
+        c_out = c_predictor(crops)
+        assert [word for word, _ in c_out] == [word for word, _ in out]
+        assert c_out[3] == c_out[1] and c_out[4] == c_out[0]
+        assert len(cache) == 3 and cache.stats()['hits'] == 2
+        # Cached predictions are reused across calls
+        assert c_predictor(crops[:2]) == c_out[:2]
+        assert cache.stats() == {'hits': 4, 'misses': 3, 'hit_rate': 4 / 7}
+        # Predictions of another model sharing the cache are kept apart
+        other_predictor = recognition.RecognitionPredictor(
+            PreProcessor(output_size=(32, 128), batch_size=2), recognition.crnn_vgg16_bn(vocab=mock_vocab[::-1]).eval(),
+            cache=cache,
+        )
+        other_predictor(crops[:2])
+    assert cache.stats() == {'hits': 4, 'misses': 5, 'hit_rate': 4 / 9}
+    assert repr(c_predictor).split('\n')[1] == "  cache=RecognitionCache(max_size=10000)"
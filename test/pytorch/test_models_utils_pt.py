@@ -1,5 +1,8 @@
 import pytest
 import os
+import cv2
+import numpy as np
+import torch
 
 from torch import nn
 from doctr.models import utils
@@ -27,3 +30,19 @@ def test_conv_sequence():
     assert len(utils.conv_sequence_pt(3, 8, True, kernel_size=3)) == 2
     assert len(utils.conv_sequence_pt(3, 8, False, True, kernel_size=3)) == 2
     assert len(utils.conv_sequence_pt(3, 8, True, True, kernel_size=3)) == 3
+
+
+@pytest.mark.parametrize("size", [256, 512, 1024])
+def test_binarize_prob_maps(size):
+    prob_map = np.random.rand(2, size, size).astype(np.float32)
+    proba, bitmaps = utils.binarize_prob_maps(torch.from_numpy(prob_map).unsqueeze(1), .5, quantize=True)
+    assert proba.dtype == np.uint8 and bitmaps.dtype == np.uint8
+    assert proba.shape == bitmaps.shape == (2, size, size)
+    assert np.all(np.abs(proba / 255 - prob_map) <= 1 / 255)
+    # Same result as OpenCV
+    k_size = 1 + int(size / 512)
+    for p_, bitmap in zip(prob_map, bitmaps):
+        ref = cv2.morphologyEx((p_ > .5).astype(np.uint8), cv2.MORPH_OPEN, np.ones((k_size, k_size), np.uint8))
+        assert np.array_equal(bitmap, ref)
+    proba, _ = utils.binarize_prob_maps(torch.from_numpy(prob_map).unsqueeze(1), .5)
+    assert proba.dtype == np.float32 and np.array_equal(proba, prob_map)
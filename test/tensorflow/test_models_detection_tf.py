@@ -1,9 +1,11 @@
 import pytest
 import numpy as np
+import cv2
 import tensorflow as tf
 
 from doctr.models import detection, PreProcessor
 from doctr.documents import DocumentFile
+from doctr.utils.profiling import profile
 
 
 @pytest.mark.parametrize(
@@ -38,6 +40,10 @@ def test_detection_models(arch_name, input_shape, output_size, out_prob):
         assert np.all(boxes[:, :4] >= 0) and np.all(boxes[:, :4] <= 1)
     # Check loss
     assert isinstance(out['loss'], tf.Tensor)
+    # Inference only returns tensors, the postprocessing is left to the predictor
+    out = model(input_tensor, training=False)
+    assert set(out.keys()) == {'out_map'}
+    assert isinstance(out['out_map'], tf.Tensor)
     # Target checks
     target = [
         dict(boxes=np.array([[0, 0, 1, 1]], dtype=np.uint8), flags=[True, False]),
@@ -64,6 +70,7 @@ def test_detectionpredictor(mock_pdf):  # noqa: F811
     )
 
     pages = DocumentFile.from_pdf(mock_pdf).as_images()
+    assert predictor.post_processor is predictor.model.postprocessor
     out = predictor(pages)
     out, _ = zip(*out)
     # The input PDF has 8 pages
@@ -100,6 +107,129 @@ def test_rotated_detectionpredictor(mock_pdf):  # noqa: F811
     return predictor
 
 
+@pytest.mark.parametrize("rotated_bbox", [False, True])
+def test_tiled_detectionpredictor(rotated_bbox):
+
+    predictor = detection.DetectionPredictor(
+        PreProcessor(output_size=(256, 256), batch_size=2),
+        detection.db_resnet50(rotated_bbox=rotated_bbox, input_shape=(256, 256, 3)),
+        tiled=True,
+        tile_overlap=.25,
+    )
+    # The last tile is aligned on the page border
+    assert predictor._tile_starts(600, 256) == [0, 192, 344]
+    assert predictor._tile_starts(200, 256) == [0]
+    tiles, ys, xs = predictor._split_page(np.zeros((600, 200, 3), dtype=np.uint8))
+    assert ys == [0, 192, 344] and xs == [0]
+    assert len(tiles) == 3 and all(tile.shape == (256, 256, 3) for tile in tiles)
+    # Edge tiles are padded like the preprocessor pads the pages
+    tiles, _, _ = predictor._split_page(np.full((600, 200, 3), 255, dtype=np.uint8))
+    assert np.all(tiles[0][:, 200:] == predictor.pre_processor.pad_value) and np.all(tiles[0][:, :200] == 255)
+
+    # Large pages are tiled, small ones are processed as usual
+    pages = [
+        (255 * np.random.rand(600, 200, 3)).astype(np.uint8),
+        (255 * np.random.rand(128, 128, 3)).astype(np.uint8),
+    ]
+    out = predictor(pages)
+    assert len(out) == 2
+    for boxes, _ in out:
+        assert boxes.shape[1] == (6 if rotated_bbox else 5)
+        assert np.all(boxes[:, :4] >= 0) and np.all(boxes[:, :4] <= 1)
+
+    if not rotated_bbox:
+        # The same word seen by two neighbouring tiles is only kept once
+        tile_preds = [
+            (np.array([[10 / 256, 200 / 256, 60 / 256, 220 / 256, .9]], dtype=np.float32), 0.),
+            (np.array([[10 / 256, 8 / 256, 60 / 256, 28 / 256, .8]], dtype=np.float32), 0.),
+            (np.zeros((0, 5), dtype=np.float32), 0.),
+        ]
+        boxes, angle = predictor._merge_tiles(tile_preds, (600, 200), ys, xs)
+        assert angle == 0
+        assert boxes.shape == (1, 5)
+        assert np.allclose(boxes[0], [10 / 200, 200 / 600, 60 / 200, 220 / 600, .9])
+        # Only the boxes around the seams go through the suppression
+        tile_preds[0] = (np.concatenate((tile_preds[0][0], np.array([
+            [10 / 256, 20 / 256, 60 / 256, 40 / 256, .7], [12 / 256, 20 / 256, 60 / 256, 40 / 256, .6],
+        ], dtype=np.float32))), 0.)
+        boxes, _ = predictor._merge_tiles(tile_preds, (600, 200), ys, xs)
+        assert boxes.shape == (3, 5)
+        # A word straddling the seam is cut by the first tile, and overlaps its full box with an IoU of exactly .5
+        tile_preds = [
+            (np.array([[10 / 256, 200 / 256, 60 / 256, 224 / 256, .8]], dtype=np.float32), 0.),
+            (np.array([[10 / 256, 8 / 256, 60 / 256, 56 / 256, .9]], dtype=np.float32), 0.),
+            (np.zeros((0, 5), dtype=np.float32), 0.),
+        ]
+        boxes, _ = predictor._merge_tiles(tile_preds, (600, 200), ys, xs)
+        assert boxes.shape == (1, 5)
+        assert np.allclose(boxes[0], [10 / 200, 200 / 600, 60 / 200, 248 / 600, .9])
+
+
+def test_dynamic_detectionpredictor():
+
+    predictor = detection.DetectionPredictor(
+        PreProcessor(output_size=(256, 256), batch_size=2),
+        detection.db_resnet50(input_shape=(256, 256, 3)),
+        dynamic_shapes=True,
+    )
+    assert repr(predictor).split('\n')[1] == "  dynamic_shapes=True"
+    pages = [
+        (255 * np.random.rand(300, 200, 3)).astype(np.uint8),
+        (255 * np.random.rand(100, 400, 3)).astype(np.uint8),
+        (255 * np.random.rand(300, 200, 3)).astype(np.uint8),
+    ]
+    out = predictor(pages)
+    assert len(out) == 3
+    for boxes, _ in out:
+        assert boxes.shape[1] == 5
+        assert np.all(boxes[:, :4] >= 0) and np.all(boxes[:, :4] <= 1)
+
+
+def test_device_binarization(test_detectionpredictor):  # noqa: F811
+
+    predictor = detection.DetectionPredictor(
+        test_detectionpredictor.pre_processor,
+        test_detectionpredictor.model,
+        binarize_on_device=True,
+        quantize_maps=False,
+    )
+    pages = [(255 * np.random.rand(512, 512, 3)).astype(np.uint8) for _ in range(2)]
+    ref_out = test_detectionpredictor(pages)
+    out = predictor(pages)
+    assert len(out) == 2
+    # The opening of the framework matches the one of OpenCV
+    assert all(np.allclose(boxes, ref_boxes) for (boxes, _), (ref_boxes, _) in zip(out, ref_out))
+    predictor.quantize_maps = True
+    assert all(boxes.shape[1] == 5 for boxes, _ in predictor(pages))
+
+
+def test_adaptive_detectionpredictor():
+
+    predictor = detection.DetectionPredictor(
+        PreProcessor(output_size=(256, 256), batch_size=2),
+        detection.db_resnet50(input_shape=(256, 256, 3)),
+        min_text_height=10,
+        long_side_range=(128, 512),
+    )
+    large_print = np.full((800, 600, 3), 255, dtype=np.uint8)
+    for y in range(150, 700, 150):
+        cv2.putText(large_print, "Hello", (50, y), cv2.FONT_HERSHEY_SIMPLEX, 4, (0, 0, 0), 8)
+    small_print = np.full((800, 600, 3), 255, dtype=np.uint8)
+    for y in range(50, 750, 25):
+        cv2.putText(small_print, "Hello world", (50, y), cv2.FONT_HERSHEY_SIMPLEX, .5, (0, 0, 0), 1)
+    # Large print is processed at a lower resolution
+    assert predictor._adaptive_long_side(large_print) < predictor._adaptive_long_side(small_print)
+    assert predictor._adaptive_long_side(np.full((800, 600, 3), 255, dtype=np.uint8)) == 256
+
+    with profile() as profiler:
+        out = predictor([large_print, small_print])
+    assert "detection.text_height_estimation" in profiler.summary()
+    assert len(out) == 2
+    for boxes, _ in out:
+        assert boxes.shape[1] == 5
+        assert np.all(boxes[:, :4] >= 0) and np.all(boxes[:, :4] <= 1)
+
+
 @pytest.mark.parametrize(
     "arch_name",
     [
@@ -5,6 +5,7 @@ import tensorflow as tf
 from doctr.models import recognition, PreProcessor
 from doctr.documents import DocumentFile
 from doctr.models import extract_crops
+from doctr.models.recognition.transformer import create_padding_mask
 
 
 @pytest.mark.parametrize(
@@ -53,6 +54,78 @@ def test_reco_postprocessors(post_processor, input_shape, mock_vocab):
     assert repr(processor) == f'{post_processor}(vocab_size={len(mock_vocab)})'
 
 
+def test_master_incremental_decoding(mock_vocab):
+    model = recognition.master(vocab=mock_vocab, d_model=64, dff=128, num_heads=4, num_layers=2)
+    sos, pad = len(mock_vocab) + 1, len(mock_vocab) + 2
+    ys = np.random.randint(0, len(mock_vocab) + 3, (2, 10))
+    ys[:, 0] = sos
+    ys[:, -3:] = pad
+    ys = tf.constant(ys, dtype=tf.int32)
+    encoded = tf.random.uniform((2, 20, 64))
+    full = model.decoder(ys, encoded, model.make_mask(ys), None, training=False)
+    cache = model.decoder.init_cache(encoded, 10)
+    steps = []
+    for i in range(10):
+        # Tokens after the latest one are padding ones
+        mask = create_padding_mask(tf.concat([ys[:, :i + 1], tf.fill((2, 9 - i), pad)], axis=1), pad)
+        steps.append(model.decoder.decode_step(ys[:, i: i + 1], i, cache, mask, training=False))
+    # Same output as the decoding of the whole sequences
+    assert np.allclose(tf.concat(steps, axis=1).numpy(), full.numpy(), atol=1e-5)
+
+    # Same logits as the greedy decoding running the whole decoder at each step
+    ref_ys = np.full((2, model.max_length), pad, dtype=np.int32)
+    ref_ys[:, 0] = sos
+    ref_logits = np.zeros((2, model.max_length, len(mock_vocab) + 3), dtype=np.float32)
+    for i in range(model.max_length):
+        _ys = tf.constant(ref_ys[:, :i + 1])
+        output = model.decoder(_ys, encoded, model.make_mask(_ys), None, training=False)
+        ref_logits[:, i] = model.linear(output[:, -1], training=False).numpy()
+        if np.all(np.any(ref_logits[:, :i + 1].argmax(-1) == len(mock_vocab), axis=1)):
+            break
+        if i + 1 < model.max_length - 1:
+            ref_ys[:, i + 1] = ref_logits[:, i].argmax(-1)
+    logits = model.decode(encoded, training=False)
+    assert logits.shape == ref_logits.shape
+    assert np.allclose(logits.numpy(), ref_logits, atol=1e-5)
+
+    # Decoding stops as soon as all sequences are over
+    model.linear.bias.assign(tf.tensor_scatter_nd_update(model.linear.bias, [[len(mock_vocab)]], [1e4]))
+    logits = model.decode(encoded, training=False)
+    assert logits.shape == (2, model.max_length, len(mock_vocab) + 3)
+    assert np.all(logits[:, 1:].numpy() == 0)
+    assert model.postprocessor(logits) == [('', 1.), ('', 1.)]
+
+
+def test_sar_decoding(mock_vocab):
+    model = recognition.sar_vgg16_bn(vocab=mock_vocab, rnn_units=64, input_shape=(32, 128, 3))
+    input_tensor = tf.random.uniform(shape=[3, 32, 128, 3], minval=0, maxval=1)
+    eos = len(mock_vocab)
+    out = model(input_tensor, return_model_output=True, training=False)
+    capped = model(input_tensor, return_model_output=True, aspect_ratios=np.array([.1, .5, 100.]), training=False)
+    assert out['out_map'].shape == (3, model.max_length, len(mock_vocab) + 1)
+    # Sequences only emit <eos> after the first one
+    out_idxs = tf.math.argmax(out['out_map'], axis=-1).numpy()
+    after_eos = np.cumsum(out_idxs == eos, axis=1) > 0
+    assert np.all(out_idxs[after_eos] == eos)
+    # Step caps from the aspect ratio
+    assert model.max_steps(np.array([.1, .5, 100.])).tolist() == [1, 3, model.max_length]
+    assert [word for word, _ in capped['preds']] == [word[:cap] for (word, _), cap in zip(out['preds'], [1, 3, 31])]
+
+    # Decoding stops as soon as all sequences are over
+    bias = model.decoder.output_dense.bias
+    bias.assign(tf.tensor_scatter_nd_update(bias, [[eos]], [1e4]))
+    out = model(input_tensor, return_model_output=True, training=False)
+    assert np.all(tf.math.argmax(out['out_map'], axis=-1).numpy() == eos)
+    assert out['preds'] == [('', 1.)] * 3
+
+    predictor = recognition.RecognitionPredictor(
+        PreProcessor(output_size=(32, 128), batch_size=2, preserve_aspect_ratio=True), model, step_caps=True
+    )
+    crops = [(255 * np.random.rand(32, width, 3)).astype(np.uint8) for width in (8, 64, 200)]
+    assert len(predictor(crops)) == len(crops)
+    assert repr(predictor).startswith("RecognitionPredictor(\n  step_caps=True")
+
+
 @pytest.fixture(scope="session")
 def test_recognitionpredictor(mock_pdf, mock_vocab):  # noqa: F811
 
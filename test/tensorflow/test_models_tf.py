@@ -5,6 +5,7 @@ import tensorflow as tf
 
 from doctr import models
 from doctr.documents import Document, DocumentFile
+from doctr.utils.profiling import profile
 from test_models_detection_tf import test_detectionpredictor, test_rotated_detectionpredictor
 from test_models_recognition_tf import test_recognitionpredictor
 
@@ -34,6 +35,69 @@ def test_ocrpredictor(
 
     # The input PDF has 8 pages
     assert len(out.pages) == 8
+
+    # Stage timings
+    with profile() as profiler:
+        predictor(doc)
+    summary = profiler.summary()
+    assert all(name in summary for name in (
+        "detection.preprocessing", "detection.forward", "detection.postprocessing", "crop_extraction",
+        "recognition.preprocessing", "recognition.forward", "recognition.decoding", "document_builder",
+    ))
+    assert summary["detection.preprocessing"]["counts"]["pages"] == 8
+
+    # Streaming mode
+    streamed = list(predictor.stream(iter(doc), window=3))
+    assert len(streamed) == 8
+    assert [page.page_idx for page in streamed] == list(range(8))
+    assert all(s_page.render() == page.render() for s_page, page in zip(streamed, out.pages))
+    with pytest.raises(ValueError):
+        next(predictor.stream(iter(doc), window=0))
+
+    # Overlapped detection & recognition
+    p_predictor = models.OCRPredictor(
+        test_detectionpredictor,
+        test_recognitionpredictor,
+        pipelined=True,
+    )
+    p_out = p_predictor(doc)
+    assert len(p_out.pages) == 8
+    assert all(p_page.render() == page.render() for p_page, page in zip(p_out.pages, out.pages))
+    assert len(p_predictor([]).pages) == 0
+
+    # Crops resized straight into the recognition batch
+    for rotated_bbox, det_predictor in ((False, test_detectionpredictor), (True, test_rotated_detectionpredictor)):
+        f_predictor = models.OCRPredictor(
+            det_predictor,
+            test_recognitionpredictor,
+            rotated_bbox=rotated_bbox,
+            fuse_crops=True,
+        )
+        f_out = f_predictor(doc)
+        assert len(f_out.pages) == 8
+        assert sum(len(line.words) for page in f_out.pages for block in page.blocks for line in block.lines) == \
+            sum(len(line.words) for page in (r_out if rotated_bbox else out).pages
+                for block in page.blocks for line in block.lines)
+
+    # Blank pages skip detection & recognition
+    for pipelined in (False, True):
+        b_predictor = models.OCRPredictor(
+            test_detectionpredictor,
+            test_recognitionpredictor,
+            pipelined=pipelined,
+            blank_page_detector=models.BlankPageDetector(),
+        )
+        blank = np.full(doc[0].shape, 255, dtype=np.uint8)
+        with profile() as profiler:
+            b_out = b_predictor([blank, doc[0], blank])
+        assert profiler.summary()["blank_page_detection"]["counts"] == {"pages": 3, "skipped": 2}
+        assert b_predictor.skipped_pages == 2
+        assert len(b_out.pages) == 3
+        assert len(b_out.pages[0].blocks) == 0 and len(b_out.pages[2].blocks) == 0
+        assert b_out.pages[1].render() == out.pages[0].render()
+        assert len(b_predictor([blank]).pages[0].blocks) == 0
+        assert b_predictor.skipped_pages == 3
+
     # Dimension check
     with pytest.raises(ValueError):
         input_page = (255 * np.random.rand(1, 256, 512, 3)).astype(np.uint8)
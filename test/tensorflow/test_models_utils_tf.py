@@ -1,5 +1,7 @@
 import pytest
 import os
+import cv2
+import numpy as np
 import tensorflow as tf
 from tensorflow.keras import layers, Sequential
 from tensorflow.keras.applications import ResNet50
@@ -43,3 +45,19 @@ def test_intermediate_layer_getter():
 
     # Repr
     assert repr(feat_extractor) == "IntermediateLayerGetter()"
+
+
+@pytest.mark.parametrize("size", [256, 512, 1024])
+def test_binarize_prob_maps(size):
+    prob_map = np.random.rand(2, size, size).astype(np.float32)
+    proba, bitmaps = utils.binarize_prob_maps(tf.convert_to_tensor(prob_map[..., None]), .5, quantize=True)
+    assert proba.dtype == np.uint8 and bitmaps.dtype == np.uint8
+    assert proba.shape == bitmaps.shape == (2, size, size)
+    assert np.all(np.abs(proba / 255 - prob_map) <= 1 / 255)
+    # Same result as OpenCV
+    k_size = 1 + int(size / 512)
+    for p_, bitmap in zip(prob_map, bitmaps):
+        ref = cv2.morphologyEx((p_ > .5).astype(np.uint8), cv2.MORPH_OPEN, np.ones((k_size, k_size), np.uint8))
+        assert np.array_equal(bitmap, ref)
+    proba, _ = utils.binarize_prob_maps(tf.convert_to_tensor(prob_map[..., None]), .5)
+    assert proba.dtype == np.float32 and np.array_equal(proba, prob_map)